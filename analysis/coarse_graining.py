@@ -24,6 +24,9 @@ class GaussianCG:
         self.sigma = sigma  # length scale of Gaussian function
         self.r_cut = r_cut  # coarse-graining cut-off radius
 
+        self.Dg = 2*np.pi*(self.sigma**2)*(1 -
+            np.exp(-0.5*((self.r_cut/self.sigma)**2)))  # normalisation factor
+
     def function(self, r):
         """
         Parameters
@@ -38,10 +41,7 @@ class GaussianCG:
         """
 
         if r > self.r_cut: return 0 # coarse-graining function is zero after cut-off
-
-        Dg = 2*np.pi*(self.sigma**2)*(1 -
-            np.exp(-0.5*((self.r_cut/self.sigma)**2)))  # normalisation factor
-        return np.exp(-0.5*((r/self.sigma)**2))/Dg      # coarse-graining factor
+        return np.exp(-0.5*((r/self.sigma)**2))/self.Dg # coarse-graining factor
 
     def factors(self, positions):
         """
@@ -56,10 +56,9 @@ class GaussianCG:
             Coarse-graining factors at positions.
         """
 
-        return np.array(list(map(
-            lambda r: self.function(r),
-            np.sqrt(np.sum(positions**2, axis=-1))
-            ))) # coarse graining factors at positions
+        r = np.sqrt(np.sum(np.array(positions)**2, axis=-1))  # radii
+        return np.where(r > self.r_cut, 0,
+            np.exp(-0.5*((r/self.sigma)**2))/self.Dg)   # coarse graining factors at positions
 
 class SquareUniformCG:
     """
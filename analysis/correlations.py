@@ -2,18 +2,162 @@
 Module correlations provides functions to calculate 2D fields
 auto-correlations.
 
+Fast Fourier transforms are computed with the backend set with
+active_particles.analysis.correlations.set_fft_backend, which is initialised
+from environment parameters.
+
+Correlations of fields carried by particles are computed directly from pairs
+of particles within a maximum distance, found with a (periodic) k-d tree, with
+active_particles.analysis.correlations.corPairs.
+
+Environment parameters
+----------------------
+FFT_BACKEND : string
+    Fast Fourier transform backend.
+    _____________________________________________________________
+    | Backend | Library                                         |
+    |_________|_________________________________________________|
+    | numpy   | numpy.fft                                       |
+    | scipy   | scipy.fft (scipy >= 1.4)                        |
+    | pyfftw  | pyfftw.interfaces.numpy_fft, with cached plans  |
+    |_________|_________________________________________________|
+    DEFAULT: numpy
+FFT_WORKERS : int
+    Number of threads used by scipy and pyfftw backends.
+    DEFAULT: None
+
 A brief description of the algorithm can be found at:
 https://yketa.github.io/UBC_2018_Wiki/#Discrete%20field%20auto-correlation
 """
 
 import numpy as np
 
+from active_particles.init import get_env, lazy_import
 from active_particles.maths import Grid
+from active_particles.analysis.neighbours import wrap
+
+cKDTree = lazy_import('scipy.spatial', 'cKDTree')
+
+_trapezoid = getattr(np, 'trapezoid', None) or np.trapz  # trapezoidal rule integration (numpy.trapz was removed from numpy 2.4)
+
+# DEFAULT VARIABLES
+
+_pairs_chunk = 2**20    # number of pairs of particles binned at once in active_particles.analysis.correlations.corPairs
+
+def set_fft_backend(backend='numpy', workers=None):
+    """
+    Sets fast Fourier transform backend used by
+    active_particles.analysis.correlations.fft2,
+    active_particles.analysis.correlations.rfft2 and
+    active_particles.analysis.correlations.irfft2.
+
+    Parameters
+    ----------
+    backend : string
+        Fast Fourier transform backend: 'numpy', 'scipy' or 'pyfftw'.
+        (see active_particles.analysis.correlations)
+        DEFAULT: numpy
+    workers : int
+        Number of threads used by scipy and pyfftw backends.
+        NOTE: if workers == None, the backend default is used.
+        DEFAULT: None
+    """
+
+    global _fft, _fft_kwargs
+
+    if backend == 'numpy':
+        _fft = np.fft
+        _fft_kwargs = {}
+    elif backend == 'scipy':
+        import scipy.fft
+        _fft = scipy.fft
+        _fft_kwargs = {} if workers == None else {'workers': workers}
+    elif backend == 'pyfftw':
+        import pyfftw.interfaces.numpy_fft, pyfftw.interfaces.cache
+        pyfftw.interfaces.cache.enable()    # keeps FFTW plans between calls
+        _fft = pyfftw.interfaces.numpy_fft
+        _fft_kwargs = {} if workers == None else {'threads': workers}
+    else: raise ValueError('Unknown FFT backend %s.' % backend)
+
+def fft2(array, axes=(-2, -1)):
+    """
+    Returns 2D fast Fourier transform of array over axes, computed with the
+    fast Fourier transform backend.
+
+    Parameters
+    ----------
+    array : array like
+        Array to transform.
+    axes : 2-uple of int
+        Axes over which to compute the transform.
+        DEFAULT: (-2, -1)
+
+    Returns
+    -------
+    FFT : complex Numpy array
+        Fast Fourier transform.
+    """
+
+    return _fft.fft2(array, axes=axes, **_fft_kwargs)
+
+def rfft2(array, axes=(-2, -1)):
+    """
+    Returns 2D fast Fourier transform of real array over axes, computed with
+    the fast Fourier transform backend.
+
+    Parameters
+    ----------
+    array : real array like
+        Array to transform.
+    axes : 2-uple of int
+        Axes over which to compute the transform.
+        DEFAULT: (-2, -1)
+
+    Returns
+    -------
+    FFT : complex Numpy array
+        Fast Fourier transform, of which only non-negative frequencies are
+        kept in the last axis of axes.
+    """
+
+    return _fft.rfft2(array, axes=axes, **_fft_kwargs)
+
+def irfft2(array, s, axes=(-2, -1)):
+    """
+    Returns 2D inverse fast Fourier transform of array over axes, which is the
+    fast Fourier transform of a real array, computed with the fast Fourier
+    transform backend.
+
+    Parameters
+    ----------
+    array : complex array like
+        Array to transform.
+        (see active_particles.analysis.correlations.rfft2)
+    s : 2-uple of int
+        Shape of the real output over axes.
+    axes : 2-uple of int
+        Axes over which to compute the transform.
+        DEFAULT: (-2, -1)
+
+    Returns
+    -------
+    IFFT : real Numpy array
+        Inverse fast Fourier transform.
+    """
+
+    return _fft.irfft2(array, s=s, axes=axes, **_fft_kwargs)
+
+set_fft_backend(get_env('FFT_BACKEND', default='numpy'),
+    workers=get_env('FFT_WORKERS', default=None, vartype=int))  # fast Fourier transform backend
 
 def corField2D_scalar(field):
     """
     2D correlation field of a scalar field. Correlations are calculated with
-    use of Fast Fourier Transform.
+    use of Fast Fourier Transform of real fields.
+
+    NOTE: A (*, n, m) stack of fields can be passed, in which case correlation
+          fields and norms of all fields are computed in one batched
+          transform.
 
     Parameters
     ----------
@@ -30,9 +174,12 @@ def corField2D_scalar(field):
         Norm of correlation field.
     """
 
-    FFT = np.fft.fft2(field)                       # FFT of scalar field
-    C = np.real(np.fft.ifft2(np.conj(FFT)*FFT))    # Unnormalised correlation field
-    Norm = np.sum(field**2)                        # Norm of correlation field
+    field = np.array(field, dtype=float)
+
+    FFT = rfft2(field)                          # FFT of scalar field
+    C = irfft2(FFT.real**2 + FFT.imag**2,
+        s=field.shape[-2:])                     # Unnormalised correlation field
+    Norm = np.sum(field**2, axis=(-2, -1))      # Norm of correlation field
 
     return C, Norm
 
@@ -43,7 +190,7 @@ def corField2D_scalar_average(field_list):
 
     Parameters
     ----------
-    field_list : list of 2D array like
+    field_list : iterable of 2D array like
         List of scalar fields to extract correlations from.
         Points are supposed to be uniformly distributed.
 
@@ -54,15 +201,37 @@ def corField2D_scalar_average(field_list):
         C[0, 0] is the origin, points are uniformly distributed.
     """
 
-    C = (lambda c, Norm: c/Norm)(*tuple(
-        np.sum(list(map(corField2D_scalar, field_list)), axis=0)
-        ))  # normalised averaged correlation field
+    C = CorField2DScalar().add_fields(field_list).correlation()    # normalised averaged correlation field
     return C
 
+def corField2D_scalar_normalise(C, Norm):
+    """
+    Normalises sum of 2D correlation fields of scalar fields.
+    (see active_particles.analysis.correlations.corField2D_scalar)
+
+    Parameters
+    ----------
+    C : 2D array like
+        Sum of unnormalised correlation fields.
+    Norm : float
+        Sum of norms of correlation fields.
+
+    Returns
+    -------
+    C : 2D numpy array
+        Normalised averaged correlation field.
+        C[0, 0] is the origin, points are uniformly distributed.
+    """
+
+    return np.array(C)/Norm
+
 def corField2D_vector(field):
     """
     2D correlation field of a vector field. Correlations are calculated with
-    use of Fast Fourier Transform.
+    use of Fast Fourier Transform of real fields.
+
+    NOTE: A (*, n, n, 2) stack of fields can be passed, in which case
+          correlations of all fields are computed in one batched transform.
 
     Parameters
     ----------
@@ -91,16 +260,13 @@ def corField2D_vector(field):
         Norm of correlation field.
     """
 
-    xfield = field[:, :, 0]                 # projection of field on the first direction of space
-    xC, xNorm = corField2D_scalar(xfield)   # unnormalised correlation field and its norm associated to field projection on the first direction of space
-
-    yfield = field[:, :, 1]                 # projection of field on the second direction of space
-    yC, yNorm = corField2D_scalar(yfield)   # unnormalised correlation field and its norm associated to field projection on the second direction of space
+    field = np.moveaxis(np.array(field, dtype=float), -1, 0)   # projections of field on directions of space
+    (xC, yC), (xNorm, yNorm) = corField2D_scalar(field)         # unnormalised correlation fields and their norms associated to field projections on the first and second directions of space
 
-    C = xC + yC                    # correlation field of field
-    xCL, yCL = xC[0, 1], yC[1, 0]  # longitudinal correlations in first and second directions of space
-    xCT, yCT = xC[1, 0], yC[0, 1]  # transversal correlations in first and second directions of space
-    Norm = xNorm + yNorm           # norm of correlation field
+    C = xC + yC                                # correlation field of field
+    xCL, yCL = xC[..., 0, 1], yC[..., 1, 0]    # longitudinal correlations in first and second directions of space
+    xCT, yCT = xC[..., 1, 0], yC[..., 0, 1]    # transversal correlations in first and second directions of space
+    Norm = xNorm + yNorm                       # norm of correlation field
 
     return C, xCL, yCL, xCT, yCT, Norm
 
@@ -111,7 +277,7 @@ def corField2D_vector_average(field_list):
 
     Parameters
     ----------
-    field_list : list of (n, n, 2) shaped array like
+    field_list : iterable of (n, n, 2) shaped array like
         List of vector fields to extract correlations from.
         Points are supposed to be uniformly distributed.
 
@@ -128,11 +294,7 @@ def corField2D_vector_average(field_list):
         to field grid spacing.
     """
 
-    C, CL, CT = (lambda c, xCL, yCL, xCT, yCT, Norm: (
-        c/Norm,
-        (xCL + yCL)/(2*Norm),
-        (xCT + yCT)/(2*Norm)
-        ))(*tuple(np.sum(list(map(corField2D_vector, field_list)), axis=0)))    # normalised averaged correlation field, longitudinal and transversal correlations
+    C, CL, CT = CorField2DVector().add_fields(field_list).correlation()   # normalised averaged correlation field, longitudinal and transversal correlations
 
     return C, CL, CT
 
@@ -150,7 +312,7 @@ def corField2D_vector_average_Cnn(field_list, Cnn):
 
     Parameters
     ----------
-    field_list : list of (n, n, 2) shaped array like
+    field_list : iterable of (n, n, 2) shaped array like
         List of vector fields to extract correlations from.
         Points are supposed to be uniformly distributed.
     Cnn : (n, n) shaped array like
@@ -169,14 +331,490 @@ def corField2D_vector_average_Cnn(field_list, Cnn):
         to field grid spacing, corrected with density correlation.
     """
 
-    C, CL, CT = (lambda c, xCL, yCL, xCT, yCT, Norm: (
-        c/Norm,
-        (xCL/Cnn[0, 1] + yCL/Cnn[1, 0])/(2*Norm),
-        (xCT/Cnn[1, 0] + yCT/Cnn[0, 1])/(2*Norm)
-        ))(*tuple(np.sum(list(map(corField2D_vector, field_list)), axis=0)))    # normalised averaged correlation field, longitudinal and transversal correlations
+    C, CL, CT = CorField2DVector().add_fields(field_list).correlation(
+        Cnn=Cnn)    # normalised averaged correlation field, longitudinal and transversal correlations
 
     return C, CL, CT
 
+def corField2D_vector_normalise(C, xCL, yCL, xCT, yCT, Norm, Cnn=None):
+    """
+    Normalises sums of 2D correlation fields and of longitudinal and
+    transversal correlations of vector fields.
+    (see active_particles.analysis.correlations.corField2D_vector)
+
+    Parameters
+    ----------
+    C : 2D array like
+        Sum of unnormalised correlation fields.
+    xCL : float
+        Sum of unnormalised longitudinal correlations in the first direction
+        of space.
+    yCL : float
+        Sum of unnormalised longitudinal correlations in the second direction
+        of space.
+    xCT : float
+        Sum of unnormalised transversal correlations in the first direction
+        of space.
+    yCT : float
+        Sum of unnormalised transversal correlations in the second direction
+        of space.
+    Norm : float
+        Sum of norms of correlation fields.
+    Cnn : (n, n) shaped array like
+        Normalised density correlation, by which longitudinal and transversal
+        correlations are divided in each direction of space.
+        (see active_particles.analysis.correlations.corField2D_vector_average_Cnn)
+        NOTE: if Cnn == None, no correction is applied.
+        DEFAULT: None
+
+    Returns
+    -------
+    C : 2D numpy array
+        Normalised averaged correlation field.
+        C[0, 0] is the origin, points are uniformly distributed.
+    CL : float
+        Normalised averaged longitudinal correlation of field at distance equal
+        to field grid spacing.
+    CT : float
+        Normalised averaged transversal correlation of field at distance equal
+        to field grid spacing.
+    """
+
+    if Cnn is None: Cnn = np.ones((2, 2))
+
+    return (np.array(C)/Norm,
+        (xCL/Cnn[0, 1] + yCL/Cnn[1, 0])/(2*Norm),
+        (xCT/Cnn[1, 0] + yCT/Cnn[0, 1])/(2*Norm))
+
+def corPairs(positions, r_max, Nbins, *fields, box_size=None):
+    """
+    Sums over pairs of distinct particles of products of values of fields
+    carried by particles, binned by distance between particles up to r_max.
+
+    Pairs of particles within r_max are found with a (periodic) k-d tree
+    (scipy.spatial.cKDTree.query_pairs), so that cost scales as the number of
+    particles times the number of neighbours within r_max, and products are
+    summed in bins with numpy.bincount over chunks of pairs.
+
+    Parameters
+    ----------
+    positions : (N, 2) array like
+        Positions of particles.
+    r_max : float
+        Maximum distance between particles.
+        NOTE: with periodic boundary conditions, r_max should not exceed
+              box_size/2.
+    Nbins : int
+        Number of bins of distance, of width r_max/Nbins.
+
+    Optional positional arguments
+    -----------------------------
+    fields : (N,) or (N, *) array like
+        Scalar or vector fields carried by particles.
+
+    Optional keyword arguments
+    --------------------------
+    box_size : float
+        Length of the square periodic box.
+        NOTE: if box_size == None, boundary conditions are not periodic.
+        DEFAULT: None
+
+    Returns
+    -------
+    C : (len(fields), Nbins) float Numpy array
+        Unnormalised correlations: sums over pairs of particles in each bin of
+        scalar products of fields.
+    counts : (Nbins,) float Numpy array
+        Numbers of pairs of particles in each bin.
+    Norm : (len(fields),) float Numpy array
+        Norms of correlations: sums over particles of squared fields.
+    """
+
+    positions = np.array(positions, dtype=float)[:, :2]
+    if box_size != None: positions = wrap(positions, box_size)  # positions in periodic box
+    fields = [np.reshape(np.array(field, dtype=float), (len(positions), -1))
+        for field in fields]
+
+    pairs = cKDTree(positions, boxsize=box_size).query_pairs(r_max,
+        output_type='ndarray')  # pairs of particles within r_max
+
+    C = np.zeros((len(fields), Nbins))
+    counts = np.zeros(Nbins)
+    for start in range(0, len(pairs), _pairs_chunk):
+        i, j = np.transpose(pairs[start:start + _pairs_chunk])
+
+        d = positions[j] - positions[i]                         # separations
+        if box_size != None: d -= box_size*np.round(d/box_size) # minimum image convention
+        bins = np.minimum(
+            (np.sqrt(np.sum(d**2, axis=-1))*Nbins/r_max).astype(int),
+            Nbins - 1)  # bins of distance
+
+        counts += np.bincount(bins, minlength=Nbins)
+        for f, field in enumerate(fields):
+            C[f] += np.bincount(bins,
+                weights=np.sum(field[i]*field[j], axis=-1), minlength=Nbins)
+    Norm = np.array([np.sum(field**2) for field in fields])
+
+    return C, counts, Norm
+
+def corPairs_normalise(C, counts, Norm, Npoints, r_max):
+    """
+    Normalises sums of correlations of fields carried by particles.
+    (see active_particles.analysis.correlations.corPairs)
+
+    Parameters
+    ----------
+    C : (*, Nbins) array like
+        Sums of unnormalised correlations.
+    counts : (Nbins,) array like
+        Sums of numbers of pairs of particles in each bin.
+    Norm : (*,) array like
+        Sums of norms of correlations.
+    Npoints : int
+        Number of particles summed over in norms.
+    r_max : float
+        Maximum distance between particles.
+
+    Returns
+    -------
+    C : (*, Nbins, 2) float Numpy array
+        Normalised averaged correlations, of the form (r, C(r)) with r the
+        centres of bins.
+        NOTE: C(r) = 0 in bins without pairs of particles.
+    """
+
+    C, counts = np.array(C, dtype=float), np.array(counts, dtype=float)
+    Norm = np.reshape(Norm, np.shape(Norm) + (1,))/Npoints
+
+    r = (np.arange(counts.shape[-1]) + 1/2)*r_max/counts.shape[-1] # centres of bins
+    C = np.divide(C, counts*Norm, out=np.zeros(C.shape),
+        where=(counts*Norm)!=0)
+
+    return np.stack(np.broadcast_arrays(r, C), axis=-1)
+
+class CorField2DScalar:
+    """
+    Accumulates 2D correlation fields of scalar fields, one field at a time,
+    to compute their normalised average.
+    (see active_particles.analysis.correlations.corField2D_scalar_average)
+
+    Only running sums of unnormalised correlation fields and of their norms are
+    kept, so that memory does not depend on the number of fields.
+    Accumulators can be added together.
+    """
+
+    def __init__(self):
+        """
+        Initialises empty sums.
+        """
+
+        self.C = 0      # sum of unnormalised correlation fields
+        self.Norm = 0   # sum of norms of correlation fields
+        self.Nfields = 0    # number of accumulated fields
+
+    def add(self, field):
+        """
+        Adds correlation field of scalar field to sums.
+
+        Parameters
+        ----------
+        field : 2D array like
+            Scalar field to extract correlations from.
+            Points are supposed to be uniformly distributed.
+            NOTE: A (*, n, m) stack of fields can be passed, in which case
+                  all fields are transformed in one batched call and added.
+
+        Returns
+        -------
+        self : active_particles.analysis.correlations.CorField2DScalar
+            Accumulator.
+        """
+
+        C, Norm = corField2D_scalar(field)
+        stack_axes = tuple(range(len(C.shape) - 2)) # axes of stack of fields
+        self.C = self.C + np.sum(C, axis=stack_axes)
+        self.Norm += np.sum(Norm)
+        self.Nfields += int(np.prod(C.shape[:-2]))
+
+        return self
+
+    def add_fields(self, field_list):
+        """
+        Adds correlation fields of scalar fields to sums.
+
+        Parameters
+        ----------
+        field_list : iterable of 2D array like
+            Scalar fields to extract correlations from.
+            NOTE: if field_list is a Numpy array, all fields are transformed
+                  in one batched call.
+
+        Returns
+        -------
+        self : active_particles.analysis.correlations.CorField2DScalar
+            Accumulator.
+        """
+
+        if isinstance(field_list, np.ndarray): return self.add(field_list)
+        for field in field_list: self.add(field)
+        return self
+
+    def __add__(self, accumulator):
+        """
+        Returns accumulator of sums of both accumulators.
+
+        Parameters
+        ----------
+        accumulator : active_particles.analysis.correlations.CorField2DScalar
+            Other accumulator.
+
+        Returns
+        -------
+        sum : active_particles.analysis.correlations.CorField2DScalar
+            Accumulator.
+        """
+
+        sum = CorField2DScalar()
+        sum.C = self.C + accumulator.C
+        sum.Norm = self.Norm + accumulator.Norm
+        sum.Nfields = self.Nfields + accumulator.Nfields
+        return sum
+
+    def correlation(self):
+        """
+        Returns normalised averaged correlation field.
+
+        Returns
+        -------
+        C : 2D numpy array
+            Normalised averaged correlation field.
+            C[0, 0] is the origin, points are uniformly distributed.
+        """
+
+        return corField2D_scalar_normalise(self.C, self.Norm)
+
+class CorField2DVector:
+    """
+    Accumulates 2D correlation fields and longitudinal and transversal
+    correlations of vector fields, one field at a time, to compute their
+    normalised average.
+    (see active_particles.analysis.correlations.corField2D_vector_average and
+    active_particles.analysis.correlations.corField2D_vector_average_Cnn)
+
+    Only running sums of unnormalised correlation fields, of longitudinal and
+    transversal correlations and of norms are kept, so that memory does not
+    depend on the number of fields.
+    Accumulators can be added together.
+    """
+
+    def __init__(self):
+        """
+        Initialises empty sums.
+        """
+
+        self.sums = (0,)*6  # sums of unnormalised correlation fields, xCL, yCL, xCT, yCT and norms (see active_particles.analysis.correlations.corField2D_vector)
+        self.Nfields = 0    # number of accumulated fields
+
+    def add(self, field):
+        """
+        Adds correlations of vector field to sums.
+
+        Parameters
+        ----------
+        field : (n, n, 2) shaped array like
+            Vector field to extract correlations from.
+            Points are supposed to be uniformly distributed.
+            NOTE: A (*, n, n, 2) stack of fields can be passed, in which case
+                  all fields are transformed in one batched call and added.
+
+        Returns
+        -------
+        self : active_particles.analysis.correlations.CorField2DVector
+            Accumulator.
+        """
+
+        terms = corField2D_vector(field)
+        stack_axes = tuple(range(len(terms[0].shape) - 2))  # axes of stack of fields
+        self.sums = tuple(map(lambda sum, term:
+            sum + np.sum(term, axis=stack_axes), self.sums, terms))
+        self.Nfields += int(np.prod(terms[0].shape[:-2]))
+
+        return self
+
+    def add_fields(self, field_list):
+        """
+        Adds correlations of vector fields to sums.
+
+        Parameters
+        ----------
+        field_list : iterable of (n, n, 2) shaped array like
+            Vector fields to extract correlations from.
+            NOTE: if field_list is a Numpy array, all fields are transformed
+                  in one batched call.
+
+        Returns
+        -------
+        self : active_particles.analysis.correlations.CorField2DVector
+            Accumulator.
+        """
+
+        if isinstance(field_list, np.ndarray): return self.add(field_list)
+        for field in field_list: self.add(field)
+        return self
+
+    def __add__(self, accumulator):
+        """
+        Returns accumulator of sums of both accumulators.
+
+        Parameters
+        ----------
+        accumulator : active_particles.analysis.correlations.CorField2DVector
+            Other accumulator.
+
+        Returns
+        -------
+        sum : active_particles.analysis.correlations.CorField2DVector
+            Accumulator.
+        """
+
+        sum = CorField2DVector()
+        sum.sums = tuple(map(lambda sum0, sum1: sum0 + sum1,
+            self.sums, accumulator.sums))
+        sum.Nfields = self.Nfields + accumulator.Nfields
+        return sum
+
+    def correlation(self, Cnn=None):
+        """
+        Returns normalised averaged correlation field, longitudinal and
+        transversal correlations.
+
+        Parameters
+        ----------
+        Cnn : (n, n) shaped array like
+            Normalised density correlation, by which longitudinal and
+            transversal correlations are divided.
+            NOTE: if Cnn == None, no correction is applied.
+            DEFAULT: None
+
+        Returns
+        -------
+        C : 2D numpy array
+            Normalised averaged correlation field.
+            C[0, 0] is the origin, points are uniformly distributed.
+        CL : float
+            Normalised averaged longitudinal correlation of field at distance
+            equal to field grid spacing.
+        CT : float
+            Normalised averaged transversal correlation of field at distance
+            equal to field grid spacing.
+        """
+
+        return corField2D_vector_normalise(*self.sums, Cnn=Cnn)
+
+class CorPairs:
+    """
+    Accumulates correlations of fields carried by particles, computed from
+    pairs of particles, one configuration at a time, to compute their
+    normalised average as functions of distance.
+    (see active_particles.analysis.correlations.corPairs)
+
+    Only running sums of binned unnormalised correlations, of numbers of pairs
+    and of norms are kept. Accumulators can be added together.
+    """
+
+    def __init__(self, r_max, Nbins):
+        """
+        Initialises empty sums.
+
+        Parameters
+        ----------
+        r_max : float
+            Maximum distance between particles.
+        Nbins : int
+            Number of bins of distance.
+        """
+
+        self.r_max = r_max
+        self.Nbins = Nbins
+
+        self.C = 0          # sums of unnormalised correlations
+        self.counts = 0     # sums of numbers of pairs
+        self.Norm = 0       # sums of norms of correlations
+        self.Npoints = 0    # number of accumulated particles
+
+    def add(self, positions, *fields, box_size=None):
+        """
+        Adds correlations of fields carried by particles to sums.
+
+        Parameters
+        ----------
+        positions : (N, 2) array like
+            Positions of particles.
+
+        Optional positional arguments
+        -----------------------------
+        fields : (N,) or (N, *) array like
+            Scalar or vector fields carried by particles.
+            NOTE: The same fields have to be passed at every call.
+
+        Optional keyword arguments
+        --------------------------
+        box_size : float
+            Length of the square periodic box.
+            NOTE: if box_size == None, boundary conditions are not periodic.
+            DEFAULT: None
+
+        Returns
+        -------
+        self : active_particles.analysis.correlations.CorPairs
+            Accumulator.
+        """
+
+        C, counts, Norm = corPairs(positions, self.r_max, self.Nbins, *fields,
+            box_size=box_size)
+        self.C = self.C + C
+        self.counts = self.counts + counts
+        self.Norm = self.Norm + Norm
+        self.Npoints += len(positions)
+
+        return self
+
+    def __add__(self, accumulator):
+        """
+        Returns accumulator of sums of both accumulators.
+
+        Parameters
+        ----------
+        accumulator : active_particles.analysis.correlations.CorPairs
+            Other accumulator.
+
+        Returns
+        -------
+        sum : active_particles.analysis.correlations.CorPairs
+            Accumulator.
+        """
+
+        sum = CorPairs(self.r_max, self.Nbins)
+        sum.C = self.C + accumulator.C
+        sum.counts = self.counts + accumulator.counts
+        sum.Norm = self.Norm + accumulator.Norm
+        sum.Npoints = self.Npoints + accumulator.Npoints
+        return sum
+
+    def correlation(self):
+        """
+        Returns normalised averaged correlations.
+
+        Returns
+        -------
+        C : (number of fields, Nbins, 2) float Numpy array
+            Normalised averaged correlations, of the form (r, C(r)) with r the
+            centres of bins.
+        """
+
+        return corPairs_normalise(self.C, self.counts, self.Norm,
+            self.Npoints, self.r_max)
+
 class CorGrid:
     """
     Manipulate 2D correlation grids.
@@ -207,6 +845,8 @@ class CorGrid:
             self.display_size = self.box_size
         else: self.display_size = np.array(display_size, ndmin=1)
 
+        self.samplers = {}  # polar samplers with radii, number of angles and interpolation as keys
+
         self.middle_cases = np.array(self.shape/2, dtype=int)   # number of boxes correspond to half of the grid in all directions
         self.half_display_size_cases = np.array(
             self.display_size*(np.array(self.shape)/self.box_size)/2,
@@ -228,34 +868,45 @@ class CorGrid:
         Returns intergration of values of display grid over all angles,
         projected on projection, at radius r.
 
+        Values at all angles, and all radii, are sampled at once, with polar
+        samplers which are kept for later calls with the same radii, number
+        of angles and interpolation.
+        (see active_particles.analysis.correlations.PolarSampler)
+
         Parameters
         ----------
-        r : float
-            Radius.
+        r : float or float array-like
+            Radius or radii.
         projection : function of angle
-            Projector. (default: 1)
+            Projector, which has to accept arrays of angles. (default: 1)
         points_theta : int
             Number of values of angles for integration.
         linear_interpolation : bool
-            Get value by linear interpolation of neighbouring grid boxes.
+            Get value by bilinear interpolation of neighbouring grid boxes.
             (default: False)
 
         Returns
         -------
-        integration : float
-            Integration of display grid.
+        integration : float or float Numpy array
+            Integration of display grid, or integrations at all radii.
+            NOTE: if r is a float outside of the display grid, None is
+                  returned, and integrations at radii of r outside of the
+                  display grid are NaN.
         """
 
-        if r > np.min(self.display_size): return None   # integration over regions not in display grid
+        if np.isscalar(r) and r > np.min(self.display_size): return None  # integration over regions not in display grid
+
+        key = (tuple(np.array(r, ndmin=1, dtype=float)), points_theta,
+            linear_interpolation)   # key of polar sampler
+        if not(key in self.samplers):
+            self.samplers[key] = PolarSampler(self.shape, self.box_size, r,
+                np.linspace(0, 2*np.pi, points_theta),
+                display_size=self.display_size,
+                linear_interpolation=linear_interpolation)  # polar sampler of radii and angles for integration
 
-        theta = np.linspace(0, 2*np.pi, points_theta)   # angles for integration
-        return np.trapz(
-            list(map(
-                lambda angle: (self.display_grid.get_value_polar(r, angle,
-                    linear_interpolation=linear_interpolation)
-                    *projection(angle)),
-                theta)),
-            theta)
+        integrations = self.samplers[key].integrate_over_angles(
+            np.moveaxis(self.grid, (0, 1), (-2, -1)), projection=projection)
+        return integrations[..., 0] if np.isscalar(r) else integrations
 
     def get_value_cartesian(self, x, y, linear_interpolation=False):
         """
@@ -306,3 +957,127 @@ class CorGrid:
 
         return self.display_grid.get_value_polar(r, angle, centre=(0, 0),
             linear_interpolation=linear_interpolation)
+
+class PolarSampler:
+    """
+    Samples 2D correlation grids, with [0, 0] as origin and periodic boundary
+    conditions, on a mesh of polar coordinates (r, theta).
+
+    Indexes of grid boxes and interpolation weights of all points of the mesh
+    are computed once, so that values of any number of grids with the same
+    shape are then sampled, and integrated over angles, with array
+    operations.
+
+    Points are located on the display grid of
+    active_particles.analysis.correlations.CorGrid. Without interpolation, the
+    value at a point is the value of the box it is in, as with
+    active_particles.maths.Grid.get_value_cartesian. With interpolation, it
+    is the bilinear interpolation of the values of the 4 nearest box centres.
+    """
+
+    def __init__(self, shape, box_size, r, theta, display_size=None,
+        linear_interpolation=False):
+        """
+        Computes indexes and weights of grid boxes at points of the mesh.
+
+        Parameters
+        ----------
+        shape : int 2-uple
+            Shape of grids.
+        box_size : float or float array-like
+            Length of grids in one or all dimensions.
+        r : float or float array-like
+            Radii of the mesh.
+        theta : float or float array-like
+            Angles from x-direction of the mesh.
+        display_size : float
+            Length of display grid in one or all dimensions. (default: None)
+            NOTE: None correponds to original grid size.
+        linear_interpolation : bool
+            Get values by bilinear interpolation of neighbouring grid boxes.
+            (default: False)
+        """
+
+        self.shape = tuple(np.array(shape[:2], dtype=int))
+        self.r = np.array(r, ndmin=1, dtype=float)
+        self.theta = np.array(theta, ndmin=1, dtype=float)
+        self.linear_interpolation = linear_interpolation
+
+        display_grid = CorGrid(np.arange(np.prod(self.shape)).reshape(
+            self.shape), box_size, display_size=display_size).display_grid  # display grid of indexes of flattened grid boxes
+        left, right, bottom, top = display_grid.extent
+        sep_x, sep_y = display_grid.sep_boxes
+
+        r, theta = np.meshgrid(self.r, self.theta, indexing='ij')
+        x, y = r*np.cos(theta), r*np.sin(theta) # cartesian coordinates of the mesh
+
+        self.in_grid = ((x >= left) & (x <= right)
+            & (y >= bottom) & (y <= top))   # points of the mesh in display grid
+
+        if not(linear_interpolation):
+            columns = (np.floor_divide(x - left, sep_x).astype(int)
+                %display_grid.shape[0])
+            rows = (-1 - np.floor_divide(y - bottom, sep_y).astype(int)
+                %display_grid.shape[1])%display_grid.shape[0]
+            self.indexes = display_grid.grid[rows, columns][np.newaxis]  # indexes of grid boxes at points of the mesh
+            self.weights = np.ones(self.indexes.shape)                  # weights of grid boxes at points of the mesh
+            return
+
+        u = (x - left)/sep_x - 1/2  # x-coordinate in number of boxes from centres of first column
+        v = (top - y)/sep_y - 1/2   # distance in number of boxes below centres of first row
+        column, row = np.floor(u).astype(int), np.floor(v).astype(int)
+        wx, wy = u - column, v - row
+
+        rows = np.array([row, row, row + 1, row + 1])%display_grid.shape[0]
+        columns = np.array([column, column + 1, column, column + 1]
+            )%display_grid.shape[1]
+        self.indexes = display_grid.grid[rows, columns]     # indexes of grid boxes at points of the mesh
+        self.weights = np.array([(1 - wy)*(1 - wx), (1 - wy)*wx,
+            wy*(1 - wx), wy*wx])                            # weights of grid boxes at points of the mesh
+
+    def values(self, grids):
+        """
+        Returns values of grids at points of the mesh.
+
+        Parameters
+        ----------
+        grids : (*, shape[0], shape[1]) array-like
+            Grids.
+
+        Returns
+        -------
+        values : (*, r.size, theta.size) Numpy array
+            Values of grids.
+            NOTE: Values at points which are not in the display grid are
+                  numpy.nan.
+        """
+
+        grids = np.asarray(grids)
+        grids = grids.reshape(grids.shape[:-2] + (-1,))    # flattened grids
+
+        values = self.weights[0]*grids[..., self.indexes[0]]
+        for indexes, weights in zip(self.indexes[1:], self.weights[1:]):
+            values = values + weights*grids[..., indexes]
+
+        return np.where(self.in_grid, values, np.nan)
+
+    def integrate_over_angles(self, grids, projection=lambda angle: 1):
+        """
+        Returns integrations of values of grids over angles of the mesh,
+        projected on projection, at radii of the mesh.
+
+        Parameters
+        ----------
+        grids : (*, shape[0], shape[1]) array-like
+            Grids.
+        projection : function of angle
+            Projector, which has to accept arrays of angles. (default: 1)
+
+        Returns
+        -------
+        integrations : (*, r.size) Numpy array
+            Integrations of grids.
+        """
+
+        return _trapezoid(self.values(grids)*projection(self.theta),
+            self.theta, axis=-1)
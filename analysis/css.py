@@ -19,7 +19,7 @@ MODE : string
 	|___________|______________________________________________________|
 	| 'fourier' | Fourier space (from displacements Fourier transform) |
 	|___________|______________________________________________________|
-	| 'ovito'   | OVITO                                                |
+	| 'ovito'   | Atomic strain (OVITO's local affine fit)             |
 	|___________|______________________________________________________|
 	DEFAULT: fourier
 COMPUTE : bool
@@ -59,9 +59,17 @@ WRAPPED_FILE : string
 	Wrapped trajectory file. (.gsd)
 	DEFAULT: DATA_DIRECTORY/active_particles.naming.wrapped_trajectory_file
 UNWRAPPED_FILE : string
-	Unwrapped trajectory file. (.dat)
+	Unwrapped trajectory file. (.dat or .gsd)
 	NOTE: .dat files defined with active_particles.dat
+	NOTE: Unwrapped positions are computed from periodic image flags of .gsd
+	      files, so that UNWRAPPED_FILE can be the wrapped trajectory file.
+	      (see active_particles.dat.GsdUnwrapped)
 	DEFAULT: DATA_DIRECTORY/active_particles.naming.unwrapped_trajectory_file
+STORE_FILE : string
+	Chunked trajectory store file, read instead of wrapped and unwrapped
+	trajectory files if set.
+	NOTE: stores defined with active_particles.dat.Store
+	DEFAULT: None
 INITIAL_FRAME : int
 	Frame to consider as initial.
 	NOTE: INITIAL_FRAME < 0 will be interpreted as the initial frame being
@@ -72,10 +80,41 @@ TIME : int
 	NOTE: TIME < 0 will be interpreted as a lag time corresponding to the total
 	      number of simulation frames - INITIAL_FRAME + TIME.
 	DEFAULT: -1
+TIMES [COMPUTE mode] : string
+	Lag times for displacement, for which correlations are computed in a
+	single pass over frames and saved in the same files as with TIME.
+	(see active_particles.init.get_env_times and
+	active_particles.analysis.parallel.sum_frames_lag_times)
+	NOTE: e.g., TIMES=1:2:5:10 or TIMES=log:1:1000:20 for 20 lag times
+	      logarithmically spaced between 1 and 1000.
+	NOTE: TIMES overrides TIME in COMPUTE mode, and PLOT or SHOW modes
+	      following COMPUTE mode then use the largest lag time.
+	DEFAULT: TIME
 INTERVAL_MAXIMUM : int
 	Maximum number of intervals of length dt considered in correlations
 	calculations.
 	DEFAULT: 1
+PROCESSES [COMPUTE mode] : int
+	Number of worker processes computing correlations of different frames.
+	(see active_particles.analysis.parallel.sum_frames)
+	NOTE: PROCESSES <= 0 will be interpreted as the number of CPUs.
+	NOTE: If PROCESSES == 1, displacements between frames time and
+	      time + TIME are read ahead on a background thread.
+	      (see active_particles.analysis.parallel.pair_reads)
+	DEFAULT: 1
+CHECKPOINT_FILE [COMPUTE mode] : string
+	File to which correlations summed over frames are checkpointed, and from
+	which an interrupted computation with the same frames resumes.
+	(see active_particles.analysis.parallel.sum_frames)
+	NOTE: The checkpoint file is removed when all frames are done.
+	NOTE: Checkpoints are only saved if CHECKPOINT_FILE or CHECKPOINT_FRAMES
+	      is set.
+	DEFAULT: DATA_DIRECTORY/active_particles.naming.Css filename + '.checkpoint'
+	         if CHECKPOINT_FRAMES is set, None otherwise
+CHECKPOINT_FRAMES [COMPUTE mode] : int
+	Number of frames between checkpoints.
+	NOTE: CHECKPOINT_FRAMES <= 0 disables checkpoints.
+	DEFAULT: active_particles.analysis.parallel._checkpoint_frames
 R_CUT ['real' mode] : float
 	Cut-off radius for coarse graining function.
 	NOTE: Value of R_CUT is then multiplied by average particle diameter from
@@ -84,6 +123,11 @@ R_CUT ['real' mode] : float
 SIGMA ['real' mode] : float
 	Length scale of the spatial extent of the coarse graining function.
 	DEFAULT: R_CUT
+KD_TREE ['real' mode] : bool
+	Look for neighbouring particles with a periodic k-d tree rather than a
+	neighbours grid.
+	(see active_particles.analysis.neighbours.NeighboursKDTree)
+	DEFAULT: False
 N_CASES : int
 	Number of boxes in each direction to compute the shear strain and
 	displacement vorticity grid.
@@ -203,15 +247,19 @@ vorticity.
 
 import active_particles.naming as naming
 
-from active_particles.init import get_env, slurm_output, linframes
-from active_particles.dat import Dat, Gsd
+from active_particles.init import get_env, get_env_times, slurm_output,\
+	linframes, lazy_import, mpl_backend
+from active_particles.dat import Gsd, count_dat_frames
 from active_particles.maths import relative_positions, wave_vectors_2D,\
 	FFT2Dfilter, gaussian_smooth_1D
 from active_particles.quantities import nD0_active
 
-from active_particles.analysis.neighbours import NeighboursGrid
-from active_particles.analysis.correlations import corField2D_scalar_average
-from active_particles.analysis.correlations import CorGrid
+from active_particles.analysis.neighbours import NeighboursGrid,\
+	NeighboursKDTree
+from active_particles.analysis.correlations import CorField2DScalar, fft2
+from active_particles.analysis.parallel import sum_frames_lag_times,\
+	trajectories, pair_reads, _checkpoint_frames
+from active_particles.analysis.correlations import CorGrid, PolarSampler
 from active_particles.analysis.coarse_graining import GaussianCG,\
 	CoarseGraining
 from active_particles.analysis.cuu import displacement_grid, Cnn
@@ -227,26 +275,26 @@ import numpy as np
 
 import pickle
 
-from operator import itemgetter
-
 from datetime import datetime
 
-import matplotlib as mpl
-if not(get_env('SHOW', default=False, vartype=bool)):
-	mpl.use('Agg')	# avoids crash if launching without display
-import matplotlib.pyplot as plt
-import matplotlib.colors as colors
-import matplotlib.cm as cmx
-from mpl_toolkits.axes_grid1 import make_axes_locatable
-from matplotlib.widgets import Slider
-from matplotlib.gridspec import GridSpec
-from matplotlib.lines import Line2D
+from functools import partial
+
+mpl = lazy_import('matplotlib')
+plt = lazy_import('matplotlib.pyplot', before_import=mpl_backend)	# avoids crash if launching without display
+colors = lazy_import('matplotlib.colors')
+cmx = lazy_import('matplotlib.cm')
+make_axes_locatable = lazy_import('mpl_toolkits.axes_grid1',
+	'make_axes_locatable')
+Slider = lazy_import('matplotlib.widgets', 'Slider')
+GridSpec = lazy_import('matplotlib.gridspec', 'GridSpec')
+Line2D = lazy_import('matplotlib.lines', 'Line2D')
 
 from active_particles.plot.mpl_tools import GridCircle, FittingLine
 
 # DEFAULT VARIABLES
 
 _r_cut = 2	# default cut-off radius for coarse graining function
+_chunk_size = 10000	# default number of grid points at which shear strain and displacement vorticity are computed at once
 _r_max = 20	# default half size of the box showed for 2D correlation
 
 _c_min = -0.2	# default minimum value for correlations
@@ -311,6 +359,7 @@ def strain_vorticity(point, time, dt, positions, displacements,
 	box_size : float
 		Length of the system's square box.
 	neighbours_grid : active_particles.analysis.neighbours.NeighboursGrid
+	or active_particles.analysis.neighbours.NeighboursKDTree
 		Neighbours grid.
 
 	Returns
@@ -327,8 +376,8 @@ def strain_vorticity(point, time, dt, positions, displacements,
 		return 0, 0
 
 	pos_wrcut = relative_positions(
-		np.array(itemgetter(*wrcut)(positions), ndmin=2), point, box_size)	# position at time time (with boundary conditions) with point as the centre of the frame
-	dis_wrcut = np.array(itemgetter(*wrcut)(displacements), ndmin=2)		# displacements of the particles between time and time + dt
+		np.array(positions)[wrcut], point, box_size)		# position at time time (with boundary conditions) with point as the centre of the frame
+	dis_wrcut = np.array(displacements)[wrcut]				# displacements of the particles between time and time + dt
 
 	coarse_graining = CoarseGraining(GaussianCG(sigma, r_cut).factors,
 		pos_wrcut)															# coarse graining object
@@ -345,6 +394,84 @@ def strain_vorticity(point, time, dt, positions, displacements,
 
 	return strain, vorticity
 
+def strain_vorticity_points(points, positions, displacements, sigma, r_cut,
+	box_size, neighbours_grid, chunk_size=_chunk_size):
+	"""
+	From coarse-grained displacement field u, calculates linearised shear
+	strain and displacement vorticity at all points at once.
+	(see active_particles.analysis.css.strain_vorticity)
+
+	Coarse-graining factors of all pairs of points and neighbouring particles
+	are computed at once, and coarse-grained quantities are obtained by summing
+	weighted values over these pairs with numpy.bincount, for chunks of
+	chunk_size points.
+
+	Parameters
+	----------
+	points : (*, 2) array like
+		Coordinates of points at which to calculate shear strain and
+		displacement vorticity.
+	positions : (N, 2) shaped array like
+		Array of wrapped particle positions.
+	displacements : (N, 2) shaped array like
+		Array of particle displacements.
+	sigma : float
+		Length scale of the spatial extent of the coarse graining function.
+	r_cut : float
+		Cut-off radius for coarse graining function.
+		Also cut-off radius with which neighbours grid has been computed.
+	box_size : float
+		Length of the system's square box.
+	neighbours_grid : active_particles.analysis.neighbours.NeighboursGrid
+	or active_particles.analysis.neighbours.NeighboursKDTree
+		Neighbours grid.
+	chunk_size : int
+		Number of points considered at once.
+		DEFAULT: active_particles.analysis.css._chunk_size
+
+	Returns
+	-------
+	strain : (len(points),) float Numpy array
+		Linearised shear strain at points.
+	vorticity : (len(points),) float Numpy array
+		Displacement vorticity at points.
+	"""
+
+	points = np.array(points, ndmin=2)
+	positions = np.array(positions)[:, :2]
+	displacements = np.array(displacements)[:, :2]
+	factors = GaussianCG(sigma, r_cut).factors	# coarse-graining function
+
+	strain = np.zeros(len(points))		# linearised shear strain
+	vorticity = np.zeros(len(points))	# displacement vorticity
+	for start in range(0, len(points), chunk_size):	# chunks of points
+		chunk = points[start:start + chunk_size]
+
+		wrcut, starts = neighbours_grid.get_neighbours_batch(chunk)	# particles indexes within r_cut of points
+		pairs = np.repeat(np.arange(len(chunk)), np.diff(starts))	# points indexes of pairs of points and particles
+
+		pos_wrcut = relative_positions(positions[wrcut], chunk[pairs],
+			box_size)						# positions with points as the centre of the frame
+		dis_wrcut = displacements[wrcut]	# displacements of the particles between time and time + dt
+
+		weights = factors(pos_wrcut)	# coarse-graining factors of pairs
+		average = lambda var: np.bincount(pairs, weights=weights*var,
+			minlength=len(chunk))		# coarse-graining averaging at points
+		rho, Ax, Ay, Aux, Auy, Auxy, Auyx = tuple(map(average,
+			[1, pos_wrcut[:, 0], pos_wrcut[:, 1], dis_wrcut[:, 0],
+			dis_wrcut[:, 1], dis_wrcut[:, 0]*pos_wrcut[:, 1],
+			dis_wrcut[:, 1]*pos_wrcut[:, 0]]))	# coarse grained density, x, y, u_x, u_y, u_x * y, u_y * x
+
+		rho = np.where(rho != 0, rho, np.inf)	# strain and vorticity are zero if there is no particles within r_cut
+		strain[start:start + chunk_size] = 0.5*(
+			(Ay*Aux + Ax*Auy)/((rho*sigma)**2)
+			- (Auxy + Auyx)/(rho*(sigma**2)))	# linearised shear strain
+		vorticity[start:start + chunk_size] = (
+			(Ax*Auy - Ay*Aux)/((rho*sigma)**2)
+			- (Auyx - Auxy)/(rho*(sigma**2)))	# displacement vorticity
+
+	return strain, vorticity
+
 def strain_vorticity_grid(box_size, Ncases, grid_points, time, dt, w_traj,
 	u_traj, sigma, r_cut):
 	"""
@@ -395,7 +522,9 @@ def strain_vorticity_grid(box_size, Ncases, grid_points, time, dt, w_traj,
 
 	positions = w_traj.position(time +
 		dt*get_env('ENDPOINT', default=False, vartype=bool))		# array of wrapped particle positions
-	neighbours_grid = NeighboursGrid(positions, box_size, r_cut)	# neighbours grid
+	neighbours_grid = (NeighboursKDTree
+		if get_env('KD_TREE', default=False, vartype=bool)
+		else NeighboursGrid)(positions, box_size, r_cut)			# neighbours grid
 
 	print("Neighbours grid computation time (time = %e): %s" %
 		(time, datetime.now() - startTime0))	# neighbours grid computation time
@@ -404,15 +533,59 @@ def strain_vorticity_grid(box_size, Ncases, grid_points, time, dt, w_traj,
 
 	displacements = u_traj.displacement(time, time + dt)	# array of particle displacements
 
-	sgrid, cgrid = tuple(np.transpose(list(map(
-		lambda point: strain_vorticity(point, time, dt, positions,
-		displacements, sigma, r_cut, box_size, neighbours_grid),
-		grid_points))))	# shear strain and displacement vorticity lists
+	sgrid, cgrid = strain_vorticity_points(grid_points, positions,
+		displacements, sigma, r_cut, box_size, neighbours_grid)	# shear strain and displacement vorticity lists
 
 	correct_grid = lambda grid: np.transpose(
 		np.reshape(grid, (Ncases, Ncases)))[::-1]	# get grids with the same orientation as positions
 	return correct_grid(sgrid), correct_grid(cgrid)	# shear strain and displacement vorticity grids
 
+def strain_vorticity_correlations_sums(box_size, Ncases, grid_points, time,
+	dt, w_traj, u_traj, sigma, r_cut):
+	"""
+	Calculates accumulators of correlations of (linearised) shear strain and
+	displacement vorticity grids at a given frame, which can be summed over
+	frames before normalisation.
+	(see active_particles.analysis.css.strain_vorticity_grid and
+	active_particles.analysis.parallel.sum_frames)
+
+	Parameters
+	----------
+	box_size : float
+		Length of the considered system's square box.
+	Ncases : int
+		Number of boxes in each direction to compute the shear strain and
+		displacement vorticity grid.
+	grid_points : array like of coordinates
+		Grid points at which shear strain will be evaluated.
+	time : int
+		Frame at which shear strain and displacement vorticity will be
+		calculated.
+	dt : int
+		Length of the interval of time for which the displacements are
+		calculated.
+	w_traj : active_particles.dat.Gsd
+		Wrapped trajectory object.
+	u_traj : active_particles.dat.Dat
+		Unwrapped trajectory object.
+	sigma : float
+		Length scale of the spatial extent of the coarse graining function.
+	r_cut : float
+		Cut-off radius for coarse graining function.
+
+	Returns
+	-------
+	Css : active_particles.analysis.correlations.CorField2DScalar
+		Shear strain correlation accumulator.
+	Ccc : active_particles.analysis.correlations.CorField2DScalar
+		Displacement vorticity correlation accumulator.
+	"""
+
+	sgrid, cgrid = strain_vorticity_grid(box_size, Ncases, grid_points,
+		time, dt, w_traj, u_traj, sigma, r_cut)	# shear strain and displacement vorticity grids
+
+	return CorField2DScalar().add(sgrid), CorField2DScalar().add(cgrid)
+
 def strain_vorticity_fftsqnorm_grid(box_size, centre, Ncases, time, dt,
 	w_traj, u_traj):
 	"""
@@ -450,7 +623,7 @@ def strain_vorticity_fftsqnorm_grid(box_size, centre, Ncases, time, dt,
 
 	ugrid = displacement_grid(box_size, centre, Ncases, time, dt,
 		w_traj, u_traj)							# displacment grid
-	FFTugrid = np.fft.fft2(ugrid, axes=(0, 1))	# displacement grid Fourier transform
+	FFTugrid = fft2(ugrid, axes=(0, 1))	# displacement grid Fourier transform
 
 	# SHEAR STRAIN AND DISPLACEMENT VORTICITY FOURIER TRANSFORM CALCULATION
 
@@ -466,7 +639,9 @@ def strain_vorticity_fftsqnorm_grid(box_size, centre, Ncases, time, dt,
 def strain_OVITO_fftsqnorm_grid(box_size, centre, Ncases, time, dt, w_traj):
 	"""
 	Calculates grid of square norm of fast Fourier transforms of (linearised)
-	shear strain with OVITO.
+	shear strain from local affine fits of particles' neighbourhoods, as
+	OVITO's atomic strain modifier.
+	(see active_particles.analysis.strain.AtomicStrain)
 
 	Parameters
 	----------
@@ -494,7 +669,7 @@ def strain_OVITO_fftsqnorm_grid(box_size, centre, Ncases, time, dt, w_traj):
 		time + dt*get_env('ENDPOINT', default=False, vartype=bool),
 		w_traj.xy_strain(time, time + dt),
 		Ncases=Ncases, box_size=box_size, centre=centre)	# shear strain grid
-	FFTsgrid = np.fft.fft2(sgrid, axes=(0, 1))				# shear strain Fourier transform grid
+	FFTsgrid = fft2(sgrid, axes=(0, 1))				# shear strain Fourier transform grid
 
 	return np.conj(FFTsgrid)*FFTsgrid
 
@@ -966,9 +1141,12 @@ class Css2DtoC44:
         self.r_min = r_min
         self.r_max = r_max
         self.c44_x = np.linspace(self.r_min, self.r_max, self.points_x)
+        self.c44_theta = np.linspace(0, 2*np.pi, self.points_theta)
 
         self.linear_interpolation = linear_interpolation
 
+        self.samplers = {}	# polar samplers of (r, theta) mesh with grid shapes as keys
+
     def get_C44(self, Css2D, smooth=0):
         """
         From 2D strain correlations Css2D, returns values of C44 at
@@ -976,28 +1154,31 @@ class Css2DtoC44:
 
         Parameters
         ----------
-        Css2D : 2D array-like
+        Css2D : (*, n, n) array-like
             Shear strain correlation grid.
+            NOTE: C44 of a batch of grids, along first dimensions, is
+            calculated in a single call.
 		smooth : float
 			C44 Gaussian smoothing length scale. (default: 0)
 
         Returns
         -------
-        C44 : 2D Numpy array
+        C44 : (*, points_x, 2) Numpy array
             List of [r, C44(r)].
         """
 
-        self.css2Dgrid = CorGrid(Css2D, self.box_size)	# shear strain 2D CorGrid object
+        Css2D = np.asarray(Css2D)
+        if not(Css2D.shape[-2:] in self.samplers):
+            self.samplers[Css2D.shape[-2:]] = PolarSampler(Css2D.shape[-2:],
+                self.box_size, self.c44_x, self.c44_theta,
+                linear_interpolation=self.linear_interpolation)	# polar sampler of (r, theta) mesh
 
-        self.c44 = np.array(list(map(
-            lambda r: self.css2Dgrid.integrate_over_angles(r,
-            	projection=lambda theta: np.cos(4*theta)/np.pi,
-            	points_theta=self.points_theta,
-				linear_interpolation=self.linear_interpolation),
-            self.c44_x)))
+        self.c44 = self.samplers[Css2D.shape[-2:]].integrate_over_angles(
+            Css2D, projection=lambda theta: np.cos(4*theta)/np.pi)
 
-        return np.array(list(map(lambda x, y: [x, y],
-			*(self.c44_x, gaussian_smooth_1D(self.c44_x, self.c44, smooth)))))
+        c44 = gaussian_smooth_1D(self.c44_x, self.c44, smooth)
+        return np.stack((np.broadcast_to(self.c44_x, c44.shape), c44),
+            axis=-1)
 
 class Css2DtoCsstheta:
     """
@@ -1035,6 +1216,8 @@ class Css2DtoCsstheta:
 
         self.linear_interpolation = linear_interpolation
 
+        self.samplers = {}	# polar samplers of half-lines with grid shapes and angles as keys
+
     def get_Csstheta(self, Css2D, theta=0):
         """
         From 2D strain correlations Css2D, returns values of Css(r, theta) at
@@ -1042,22 +1225,30 @@ class Css2DtoCsstheta:
 
         Parameters
         ----------
-        Css2D : 2D array-like
+        Css2D : (*, n, n) array-like
             Shear strain correlation grid.
+            NOTE: Css(r, theta) of a batch of grids, along first dimensions,
+            is calculated in a single call.
 		theta : float
 			Inclination of half-line in Css2D grid. (default: 0)
 
         Returns
         -------
-        Csstheta : 2D Numpy array
+        Csstheta : (*, points_x, 2) Numpy array
             List of [r, Css(r, theta)].
         """
 
-        self.css2Dgrid = CorGrid(Css2D, self.box_size)	# shear strain 2D CorGrid object
-        self.csstheta = np.array(list(map(
-			lambda r: [r, self.css2Dgrid.get_value_polar(r, theta,
-				linear_interpolation=self.linear_interpolation)],
-            self.csstheta_x)))
+        Css2D = np.asarray(Css2D)
+        if not((Css2D.shape[-2:], theta) in self.samplers):
+            self.samplers[(Css2D.shape[-2:], theta)] = PolarSampler(
+                Css2D.shape[-2:], self.box_size, self.csstheta_x, theta,
+                linear_interpolation=self.linear_interpolation)	# polar sampler of half-line
+
+        csstheta = self.samplers[(Css2D.shape[-2:], theta)].values(
+            Css2D)[..., 0]
+        self.csstheta = np.stack((
+            np.broadcast_to(self.csstheta_x, csstheta.shape), csstheta),
+            axis=-1)
 
         return self.csstheta
 
@@ -1185,7 +1376,8 @@ if __name__ == '__main__':	# executing as script
 	wrap_file_name = get_env('WRAPPED_FILE',
 		default=joinpath(data_dir, naming.wrapped_trajectory_file))		# wrapped trajectory file (.gsd)
 	unwrap_file_name = get_env('UNWRAPPED_FILE',
-		default=joinpath(data_dir, naming.unwrapped_trajectory_file))	# unwrapped trajectory file (.dat)
+		default=joinpath(data_dir, naming.unwrapped_trajectory_file))	# unwrapped trajectory file (.dat or .gsd)
+	store_file_name = get_env('STORE_FILE')							# chunked trajectory store file
 
 	dt = get_env('TIME', default=-1, vartype=int)	# lag time for displacement
 
@@ -1210,7 +1402,8 @@ if __name__ == '__main__':	# executing as script
 	Ncases = get_env('N_CASES', default=ceil(np.sqrt(parameters['N'])),
 		vartype=int)	# number of boxes in each direction to compute the shear strain and displacement vorticity grid
 
-	Nentries = parameters['N_steps']//parameters['period_dump']		# number of time snapshots in unwrapped trajectory file
+	Nentries = count_dat_frames(unwrap_file_name,
+		default=parameters['N_steps']//parameters['period_dump'])	# number of time snapshots in unwrapped trajectory file
 	init_frame = int(Nentries/2) if init_frame < 0 else init_frame	# initial frame
 	Nframes = Nentries - init_frame									# number of frames available for the calculation
 
@@ -1245,6 +1438,16 @@ if __name__ == '__main__':	# executing as script
 
 		startTime = datetime.now()
 
+		processes = get_env('PROCESSES', default=1, vartype=int)	# number of worker processes
+		checkpoint = get_env('CHECKPOINT_FILE',
+			default=joinpath(data_dir, Css_filename + '.checkpoint')
+				if 'CHECKPOINT_FRAMES' in envvar else None)	# checkpoint file of correlations summed over frames
+		checkpoint_frames = get_env('CHECKPOINT_FRAMES',
+			default=_checkpoint_frames, vartype=int)					# number of frames between checkpoints
+
+		lag_times = get_env_times('TIMES', Nframes) or [dt]					# lag times for displacement
+		frames = lambda dt: linframes(init_frame, Nentries - dt, int_max)	# frames at which shear strain is calculated for lag time dt
+
 		if mode == 'real':	# calculation of shear strain and vorticity in real space
 
 			grid_points = np.array([(x, y) for x in\
@@ -1259,73 +1462,103 @@ if __name__ == '__main__':	# executing as script
 
 			display_grid = get_env('DISPLAY_GRID', default=0, vartype=int)	# index of map in list of variable maps to display
 
+			open_trajectories = partial(trajectories,
+				wrap_file_name=wrap_file_name,
+				unwrap_file_name=unwrap_file_name,
+				N=parameters['N'], prep_frames=prep_frames,
+				store_file_name=store_file_name)	# function returning trajectory objects
+
 			# SHEAR STRAIN, DISPLACEMENT VORTICITY AND THEIR CORRELATIONS
 
-			with open(wrap_file_name, 'rb') as wrap_file,\
-				open(unwrap_file_name, 'rb') as unwrap_file:	# opens wrapped and unwrapped trajectory files
+			display_trajectories = open_trajectories()	# trajectory objects to compute grids to display
 
-				w_traj = Gsd(wrap_file, prep_frames=prep_frames)	# wrapped trajectory object
-				u_traj = Dat(unwrap_file, parameters['N'])			# unwrapped trajectory object
-				Sgrid, Cgrid = tuple(np.transpose(list(map(lambda time:
-					strain_vorticity_grid(parameters['box_size'], Ncases,
-					grid_points, time, dt, w_traj, u_traj, sigma, r_cut),
-					times)), (1, 0, 2, 3)))							# lists of shear strain and displacement vorticity correlations
+			for dt, (Css, Ccc) in zip(lag_times,
+				sum_frames_lag_times(
+				partial(strain_vorticity_correlations_sums,
+					box_size=parameters['box_size'], Ncases=Ncases,
+					grid_points=grid_points, sigma=sigma, r_cut=r_cut),
+				lag_times, frames, open_trajectories=open_trajectories,
+				processes=processes, prefetch=partial(pair_reads,
+					positions=True, endpoint=get_env('ENDPOINT', default=False,
+					vartype=bool)),
+				checkpoint=checkpoint, checkpoint_frames=checkpoint_frames)):	# accumulators of shear strain and displacement vorticity correlations over frames for every lag time
 
-			Css2D, Ccc2D = tuple(map(corField2D_scalar_average,
-				[Sgrid, Cgrid]))	# shear strain and displacement vorticity fields correlations
+				Css2D, Ccc2D = Css.correlation(), Ccc.correlation()	# shear strain and displacement vorticity fields correlations
+				sgrid, cgrid = strain_vorticity_grid(parameters['box_size'],
+					Ncases, grid_points, frames(dt)[display_grid], dt,
+					sigma=sigma, r_cut=r_cut, **display_trajectories)	# shear strain and displacement vorticity grids to display
 
-			# SAVING
+				# SAVING
 
-			sgrid = Sgrid[display_grid]
-			cgrid = Cgrid[display_grid]
+				attributes['dt'] = dt								# lag time displayed in filenames
+				Css_filename, = naming_Css.filename(**attributes)	# Css filename
+				Ccc_filename, = naming_Ccc.filename(**attributes)	# Ccc filename
 
-			with open(joinpath(data_dir, Css_filename),
-				'wb') as Css_dump_file,\
-				open(joinpath(data_dir, Ccc_filename),
-				'wb') as Ccc_dump_file:
-				pickle.dump([sgrid, Css2D], Css_dump_file)
-				pickle.dump([cgrid, Ccc2D], Ccc_dump_file)
+				with open(joinpath(data_dir, Css_filename),
+					'wb') as Css_dump_file,\
+					open(joinpath(data_dir, Ccc_filename),
+					'wb') as Ccc_dump_file:
+					pickle.dump([sgrid, Css2D], Css_dump_file)
+					pickle.dump([cgrid, Ccc2D], Ccc_dump_file)
+
+			for trajectory in display_trajectories.values():
+				trajectory.close()
 
 		elif mode == 'fourier':	# calculation of shear strain and vorticity in Fourier space
 
 			# SHEAR STRAIN AND DISPLACEMENT VORTICITY FAST FOURIER TRANSFORMS
 
-			with open(wrap_file_name, 'rb') as wrap_file,\
-				open(unwrap_file_name, 'rb') as unwrap_file:	# opens wrapped and unwrapped trajectory files
+			for dt, (FFTsgridsqnorm, FFTcgridsqnorm) in zip(lag_times,
+				sum_frames_lag_times(partial(strain_vorticity_fftsqnorm_grid,
+					box_size=box_size, centre=centre, Ncases=Ncases),
+				lag_times, frames, open_trajectories=partial(trajectories,
+					wrap_file_name=wrap_file_name,
+					unwrap_file_name=unwrap_file_name,
+					N=parameters['N'], prep_frames=prep_frames,
+					store_file_name=store_file_name),
+				processes=processes, prefetch=pair_reads,
+				checkpoint=checkpoint, checkpoint_frames=checkpoint_frames)):	# sums of square norm of shear strain and displacement vorticity Fourier transforms for every lag time
 
-				w_traj = Gsd(wrap_file, prep_frames=prep_frames)	# wrapped trajectory object
-				u_traj = Dat(unwrap_file, parameters['N'])			# unwrapped trajectory object
-				FFTsgridsqnorm, FFTcgridsqnorm = tuple(np.mean(np.transpose(
-					list(map(lambda time:
-					strain_vorticity_fftsqnorm_grid(
-						box_size, centre, Ncases, time, dt, w_traj, u_traj),
-					times)), (1, 0, 2, 3)), axis=1))				# average square norm of shear strain and displacement vorticity Fourier transforms
+				FFTsgridsqnorm, FFTcgridsqnorm = tuple(map(
+					lambda grid: grid/len(frames(dt)),
+					(FFTsgridsqnorm, FFTcgridsqnorm)))	# average square norm of shear strain and displacement vorticity Fourier transforms
 
-			# SAVING
+				# SAVING
 
-			with open(joinpath(data_dir, Css_filename),
-				'wb') as Css_dump_file,\
-				open(joinpath(data_dir, Ccc_filename),
-				'wb') as Ccc_dump_file:
-				pickle.dump(FFTsgridsqnorm, Css_dump_file)
-				pickle.dump(FFTcgridsqnorm, Ccc_dump_file)
+				attributes['dt'] = dt								# lag time displayed in filenames
+				Css_filename, = naming_Css.filename(**attributes)	# Css filename
+				Ccc_filename, = naming_Ccc.filename(**attributes)	# Ccc filename
 
-		elif mode == 'ovito': # calculation of shear strain from OVITO
+				with open(joinpath(data_dir, Css_filename),
+					'wb') as Css_dump_file,\
+					open(joinpath(data_dir, Ccc_filename),
+					'wb') as Ccc_dump_file:
+					pickle.dump(FFTsgridsqnorm, Css_dump_file)
+					pickle.dump(FFTcgridsqnorm, Ccc_dump_file)
+
+		elif mode == 'ovito': # calculation of shear strain as OVITO
 
 			# SHEAR STRAIN FAST FOURIER TRANSFORT
 
-			with open(wrap_file_name, 'rb') as wrap_file:	# opens wrapped trajectory file
+			for dt, FFTsgridsqnorm in zip(lag_times, sum_frames_lag_times(
+				partial(strain_OVITO_fftsqnorm_grid,
+					box_size=box_size, centre=centre, Ncases=Ncases),
+				lag_times, frames, open_trajectories=partial(trajectories,
+					wrap_file_name=wrap_file_name, prep_frames=prep_frames,
+					store_file_name=store_file_name),
+				processes=processes,
+				checkpoint=checkpoint, checkpoint_frames=checkpoint_frames)):	# sums of square norm of shear strain Fourier transform for every lag time
+
+				FFTsgridsqnorm = FFTsgridsqnorm/len(frames(dt))	# average square norm of shear strain Fourier transform
 
-				w_traj = Gsd(wrap_file, prep_frames=prep_frames)	# wrapped trajectory object
-				FFTsgridsqnorm = np.mean(list(map(lambda time:
-					strain_OVITO_fftsqnorm_grid(
-						box_size, centre, Ncases, time, dt, w_traj),
-					times)), axis=0)								# average square norm of shear strain Fourier transform
+				# SAVING
 
-			# SAVING
+				attributes['dt'] = dt								# lag time displayed in filenames
+				Css_filename, = naming_Css.filename(**attributes)	# Css filename
 
-			with open(joinpath(data_dir, Css_filename), 'wb') as Css_dump_file:
-				pickle.dump(FFTsgridsqnorm, Css_dump_file)
+				with open(joinpath(data_dir, Css_filename),
+					'wb') as Css_dump_file:
+					pickle.dump(FFTsgridsqnorm, Css_dump_file)
 
 		# EXECUTION TIME
 
@@ -53,9 +53,17 @@ WRAPPED_FILE : string
 	Wrapped trajectory file. (.gsd)
 	DEFAULT: DATA_DIRECTORY/active_particles.naming.wrapped_trajectory_file
 UNWRAPPED_FILE : string
-	Unwrapped trajectory file. (.dat)
+	Unwrapped trajectory file. (.dat or .gsd)
 	NOTE: .dat files defined with active_particles.dat
+	NOTE: Unwrapped positions are computed from periodic image flags of .gsd
+	      files, so that UNWRAPPED_FILE can be the wrapped trajectory file.
+	      (see active_particles.dat.GsdUnwrapped)
 	DEFAULT: DATA_DIRECTORY/active_particles.naming.unwrapped_trajectory_file
+STORE_FILE : string
+	Chunked trajectory store file, read instead of wrapped and unwrapped
+	trajectory files if set.
+	NOTE: stores defined with active_particles.dat.Store
+	DEFAULT: None
 INITIAL_FRAME : int
 	Frame to consider as initial.
 	NOTE: INITIAL_FRAME < 0 will be interpreted as the initial frame being
@@ -66,9 +74,41 @@ TIME : int
 	NOTE: TIME < 0 will be interpreted as a lag time corresponding to the total
 	      number of simulation frames - INITIAL_FRAME + TIME.
 	DEFAULT: -1
+TIMES [COMPUTE mode] : string
+	Lag times for displacement, for which correlations are computed in a
+	single pass over frames and saved in the same files as with TIME.
+	(see active_particles.init.get_env_times and
+	active_particles.analysis.parallel.sum_frames_lag_times)
+	NOTE: e.g., TIMES=1:2:5:10 or TIMES=log:1:1000:20 for 20 lag times
+	      logarithmically spaced between 1 and 1000.
+	NOTE: TIMES overrides TIME in COMPUTE mode, and PLOT or SHOW modes
+	      following COMPUTE mode then use the largest lag time.
+	DEFAULT: TIME
 INTERVAL_MAXIMUM : int
 	Maximum number of intervals of length dt considered for the calculation.
 	DEFAULT: 1
+PROCESSES [COMPUTE mode] : int
+	Number of worker processes computing displacement grids Fourier
+	transforms of different frames.
+	(see active_particles.analysis.parallel.sum_frames)
+	NOTE: PROCESSES <= 0 will be interpreted as the number of CPUs.
+	NOTE: If PROCESSES == 1, displacements between frames time and
+	      time + TIME are read ahead on a background thread.
+	      (see active_particles.analysis.parallel.pair_reads)
+	DEFAULT: 1
+CHECKPOINT_FILE [COMPUTE mode] : string
+	File to which correlations summed over frames are checkpointed, and from
+	which an interrupted computation with the same frames resumes.
+	(see active_particles.analysis.parallel.sum_frames)
+	NOTE: The checkpoint file is removed when all frames are done.
+	NOTE: Checkpoints are only saved if CHECKPOINT_FILE or CHECKPOINT_FRAMES
+	      is set.
+	DEFAULT: DATA_DIRECTORY/active_particles.naming.Ctt filename + '.checkpoint'
+	         if CHECKPOINT_FRAMES is set, None otherwise
+CHECKPOINT_FRAMES [COMPUTE mode] : int
+	Number of frames between checkpoints.
+	NOTE: CHECKPOINT_FRAMES <= 0 disables checkpoints.
+	DEFAULT: active_particles.analysis.parallel._checkpoint_frames
 N_CASES : int
 	Number of boxes in each direction to compute the displacement grid.
 	DEFAULT: smallest integer value greater than or equal to the square root of
@@ -196,9 +236,9 @@ length for different wave length Gaussian cut-off radii.
 
 import active_particles.naming as naming
 
-from active_particles.init import get_env, get_env_list, slurm_output,\
-	linframes
-from active_particles.dat import Dat, Gsd
+from active_particles.init import get_env, get_env_list, get_env_times,\
+	slurm_output, linframes, lazy_import, mpl_backend
+from active_particles.dat import Gsd, count_dat_frames
 from active_particles.maths import g2Dto1Dgrid, kFFTgrid, wave_vectors_2D,\
 	divide_arrays, FFT2Dfilter
 from active_particles.quantities import nD0_active
@@ -215,6 +255,8 @@ from active_particles.analysis.correlations import CorGrid
 from active_particles.plot.mpl_tools import FittingLine, GridCircle
 from active_particles.plot.plot import list_colormap
 from active_particles.analysis.number import count_particles
+from active_particles.analysis.parallel import sum_frames_lag_times,\
+    trajectories, pair_reads, _checkpoint_frames
 
 from os import getcwd
 from os import environ as envvar
@@ -228,16 +270,17 @@ import pickle
 
 from datetime import datetime
 
-import matplotlib as mpl
-if not(get_env('SHOW', default=False, vartype=bool)):
-	mpl.use('Agg')	# avoids crash if launching without display
-import matplotlib.pyplot as plt
-from matplotlib.gridspec import GridSpec
-import matplotlib.colors as colors
-import matplotlib.cm as cmx
-from mpl_toolkits.axes_grid1 import make_axes_locatable
-from matplotlib.widgets import Slider
-from matplotlib.lines import Line2D
+from functools import partial
+
+mpl = lazy_import('matplotlib')
+plt = lazy_import('matplotlib.pyplot', before_import=mpl_backend)	# avoids crash if launching without display
+GridSpec = lazy_import('matplotlib.gridspec', 'GridSpec')
+colors = lazy_import('matplotlib.colors')
+cmx = lazy_import('matplotlib.cm')
+make_axes_locatable = lazy_import('mpl_toolkits.axes_grid1',
+	'make_axes_locatable')
+Slider = lazy_import('matplotlib.widgets', 'Slider')
+Line2D = lazy_import('matplotlib.lines', 'Line2D')
 
 # DEFAULT VARIABLES
 
@@ -254,6 +297,47 @@ _dot_label =\
 
 # FUNCTIONS AND CLASSES
 
+def kFFTgrids_sqnorm(box_size, centre, Ncases, time, dt, w_traj, u_traj):
+	"""
+	Calculates square norms of cross and dot products of normalised wave
+	vectors with displacement grid Fourier transform at a given frame.
+	(see active_particles.analysis.cuu.displacement_grid and
+	active_particles.maths.kFFTgrid)
+
+	Parameters
+	----------
+	box_size : float
+		Length of the considered system's square box.
+	centre : float array
+		Centre of the box.
+	Ncases : int
+		Number of boxes in each direction to compute the displacements.
+	time : int
+		Frame at which displacements will be calculated.
+	dt : int
+		Length of the interval of time for which the displacements are
+		calculated.
+	w_traj : active_particles.dat.Gsd
+		Wrapped trajectory object.
+	u_traj : active_particles.dat.Dat
+		Unwrapped trajectory object.
+
+	Returns
+	-------
+	k_cross_FFTugrid2D_sqnorm : 2D Numpy array
+		Square norm of cross product of normalised wave vectors with
+		displacement grid Fourier transform.
+	k_dot_FFTugrid2D_sqnorm : 2D Numpy array
+		Square norm of dot product of normalised wave vectors with
+		displacement grid Fourier transform.
+	"""
+
+	k_cross_FFTugrid, k_dot_FFTugrid = kFFTgrid(displacement_grid(
+		box_size, centre, Ncases, time, dt, w_traj, u_traj))	# cross and dot products of normalised wave vectors with displacement grid Fourier transform
+
+	return ((np.conj(k_cross_FFTugrid)*k_cross_FFTugrid).real,
+		(np.conj(k_dot_FFTugrid)*k_dot_FFTugrid).real)
+
 def plot_product(product, av_p_sep, ax):
 	"""
 	Plot cross or product data on ax, on log-log axis, as a function of
@@ -1012,7 +1096,10 @@ if __name__ == '__main__':  # executing as script
     Ncases = get_env('N_CASES', default=ceil(np.sqrt(parameters['N'])),
 		vartype=int)        # number of boxes in each direction to compute the displacement grid
 
-    Nentries = parameters['N_steps']//parameters['period_dump']		# number of time snapshots in unwrapped trajectory file
+    unwrap_file_name = get_env('UNWRAPPED_FILE',
+		default=joinpath(data_dir, naming.unwrapped_trajectory_file))	# unwrapped trajectory file (.dat or .gsd)
+    Nentries = count_dat_frames(unwrap_file_name,
+		default=parameters['N_steps']//parameters['period_dump'])	# number of time snapshots in unwrapped trajectory file
     init_frame = int(Nentries/2) if init_frame < 0 else init_frame	# initial frame
     Nframes = Nentries - init_frame									# number of frames available for the calculation
 
@@ -1045,46 +1132,54 @@ if __name__ == '__main__':  # executing as script
 
         # VARIABLE DEFINITIONS
 
-        unwrap_file_name = get_env('UNWRAPPED_FILE',
-			default=joinpath(data_dir, naming.unwrapped_trajectory_file))	# unwrapped trajectory file (.dat)
+        store_file_name = get_env('STORE_FILE')                           # chunked trajectory store file
 
         # DISPLACEMENT AND DENSITY CORRELATIONS
 
-        with open(wrap_file_name, 'rb') as wrap_file,\
-			open(unwrap_file_name, 'rb') as unwrap_file:	# opens wrapped and unwrapped trajectory files
+        processes = get_env('PROCESSES', default=1, vartype=int)	# number of worker processes
+        checkpoint = get_env('CHECKPOINT_FILE',
+            default=joinpath(data_dir, Ctt_filename + '.checkpoint')
+                if 'CHECKPOINT_FRAMES' in envvar else None)	# checkpoint file of grids summed over frames
+        checkpoint_frames = get_env('CHECKPOINT_FRAMES',
+            default=_checkpoint_frames, vartype=int)                 	# number of frames between checkpoints
 
-            w_traj = Gsd(wrap_file, prep_frames=prep_frames)	# wrapped trajectory object
-            u_traj = Dat(unwrap_file, parameters['N'])			# unwrapped trajectory object
-            Ugrid = list(map(
-                lambda time: displacement_grid(
-                	box_size, centre, Ncases, time, dt, w_traj, u_traj),
-                times))											# lists of displacement variables
+        lag_times = get_env_times('TIMES', Nframes) or [dt]	# lag times for displacement
+        frames = lambda dt: linframes(init_frame, Nentries - dt, int_max)	# frames at which displacements are calculated for lag time dt
 
         wave_vectors = wave_vectors_2D(Ncases, Ncases, d=box_size/Ncases)	# wave vectors grid
         wave_vectors_norm = np.sqrt(np.sum(wave_vectors**2, axis=-1))		# wave vectors norm grid
 
-        k_cross_FFTUgrid, k_dot_FFTUgrid = np.transpose(
-			list(map(lambda grid: kFFTgrid(grid), Ugrid)),
-			(1, 0, 2, 3))	# wave vector grids, and cross
-
-        k_cross_FFTugrid2D_sqnorm, k_dot_FFTugrid2D_sqnorm = list(map(
-			lambda Grid: np.mean(
-			list(map(lambda grid: (np.conj(grid)*grid).real, Grid)),
-			axis=0),
-			[k_cross_FFTUgrid, k_dot_FFTUgrid]))	# grid of mean square norms of cross and dot products of normalised wave vectors with displacement grids Fourier transform
-
-        k_cross_FFTugrid1D_sqnorm, k_dot_FFTugrid1D_sqnorm = list(map(
-			lambda grid2D: g2Dto1Dgrid(grid2D, wave_vectors_norm),
-			[k_cross_FFTugrid2D_sqnorm, k_dot_FFTugrid2D_sqnorm]))	# cylindrical averages of mean square norms of cross and dot products of normalised wave vectors with displacement grids Fourier transform
-
-        # SAVING
-
-        with open(joinpath(data_dir, Ctt_filename), 'wb') as Ctt_dump_file,\
-			open(joinpath(data_dir, Cll_filename), 'wb') as Cll_dump_file:
-            pickle.dump([wave_vectors, k_cross_FFTugrid2D_sqnorm,
-				k_cross_FFTugrid1D_sqnorm], Ctt_dump_file)
-            pickle.dump([wave_vectors, k_dot_FFTugrid2D_sqnorm,
-				k_dot_FFTugrid1D_sqnorm], Cll_dump_file)
+        for dt, (k_cross_FFTugrid2D_sqnorm, k_dot_FFTugrid2D_sqnorm) in zip(
+            lag_times, sum_frames_lag_times(partial(kFFTgrids_sqnorm,
+                box_size=box_size, centre=centre, Ncases=Ncases),
+            lag_times, frames, open_trajectories=partial(trajectories,
+                wrap_file_name=wrap_file_name,
+                unwrap_file_name=unwrap_file_name,
+                N=parameters['N'], prep_frames=prep_frames,
+                store_file_name=store_file_name),
+            processes=processes, prefetch=pair_reads,
+            checkpoint=checkpoint, checkpoint_frames=checkpoint_frames)):	# grids of sums of square norms of cross and dot products of normalised wave vectors with displacement grids Fourier transform for every lag time
+
+            k_cross_FFTugrid2D_sqnorm, k_dot_FFTugrid2D_sqnorm = tuple(map(
+                lambda grid: grid/len(frames(dt)),
+                (k_cross_FFTugrid2D_sqnorm, k_dot_FFTugrid2D_sqnorm)))	# grid of mean square norms of cross and dot products of normalised wave vectors with displacement grids Fourier transform
+
+            k_cross_FFTugrid1D_sqnorm, k_dot_FFTugrid1D_sqnorm = g2Dto1Dgrid(
+				[k_cross_FFTugrid2D_sqnorm, k_dot_FFTugrid2D_sqnorm],
+				wave_vectors_norm)	# cylindrical averages of mean square norms of cross and dot products of normalised wave vectors with displacement grids Fourier transform
+
+            # SAVING
+
+            attributes['dt'] = dt                               # lag time displayed in filenames
+            Ctt_filename, = naming_Ctt.filename(**attributes)   # Ctt filename
+            Cll_filename, = naming_Cll.filename(**attributes)   # Cll filename
+
+            with open(joinpath(data_dir, Ctt_filename), 'wb') as Ctt_dump_file,\
+				open(joinpath(data_dir, Cll_filename), 'wb') as Cll_dump_file:
+                pickle.dump([wave_vectors, k_cross_FFTugrid2D_sqnorm,
+					k_cross_FFTugrid1D_sqnorm], Ctt_dump_file)
+                pickle.dump([wave_vectors, k_dot_FFTugrid2D_sqnorm,
+					k_dot_FFTugrid1D_sqnorm], Cll_dump_file)
 
         # EXECUTION TIME
 
@@ -10,8 +10,24 @@ active_particles.naming.Cnn (density correlation).
 A brief description of the algorithm can be found at:
 https://yketa.github.io/UBC_2018_Wiki/#Displacement%20correlations
 
+In 'pairs' mode, correlations are instead computed directly from pairs of
+particles within R_MAX, found with a (periodic) k-d tree, as functions of radius
+binned in N_BINS bins, so that resolution is not limited by grid spacing and no
+density correction is needed.
+(see active_particles.analysis.correlations.corPairs)
+
 Environment modes
 -----------------
+MODE : string
+	Computation mode.
+	 ______________________________________________________________
+	| Mode    | Computation                                        |
+	|_________|____________________________________________________|
+	| 'grid'  | Coarse-grained displacements on N_CASES grid       |
+	|_________|____________________________________________________|
+	| 'pairs' | Pairs of particles within R_MAX                    |
+	|_________|____________________________________________________|
+	DEFAULT: grid
 COMPUTE : bool
 	Compute shear strain and displacement vorticity.
 	DEFAULT: False
@@ -25,7 +41,7 @@ SHOW [COMPUTE or PLOT mode] : bool
 SAVE [COMPUTE or PLOT mode] : bool
 	Save graphs.
 	DEFAULT: False
-GRID_CIRCLE [SHOW mode] : bool
+GRID_CIRCLE ['grid' and SHOW mode] : bool
 	Analyse graphically values of corrected correlations at fixed radius.
 	DEFAULT: False
 
@@ -41,9 +57,17 @@ WRAPPED_FILE : string
 	Wrapped trajectory file. (.gsd)
 	DEFAULT: DATA_DIRECTORY/active_particles.naming.wrapped_trajectory_file
 UNWRAPPED_FILE : string
-	Unwrapped trajectory file. (.dat)
+	Unwrapped trajectory file. (.dat or .gsd)
 	NOTE: .dat files defined with active_particles.dat
+	NOTE: Unwrapped positions are computed from periodic image flags of .gsd
+	      files, so that UNWRAPPED_FILE can be the wrapped trajectory file.
+	      (see active_particles.dat.GsdUnwrapped)
 	DEFAULT: DATA_DIRECTORY/active_particles.naming.unwrapped_trajectory_file
+STORE_FILE : string
+	Chunked trajectory store file, read instead of wrapped and unwrapped
+	trajectory files if set.
+	NOTE: stores defined with active_particles.dat.Store
+	DEFAULT: None
 INITIAL_FRAME : int
 	Frame to consider as initial.
 	NOTE: INITIAL_FRAME < 0 will be interpreted as the initial frame being
@@ -54,11 +78,42 @@ TIME : int
 	NOTE: TIME < 0 will be interpreted as a lag time corresponding to the total
 	      number of simulation frames - INITIAL_FRAME + TIME.
 	DEFAULT: -1
+TIMES [COMPUTE mode] : string
+	Lag times for displacement, for which correlations are computed in a
+	single pass over frames and saved in the same files as with TIME.
+	(see active_particles.init.get_env_times and
+	active_particles.analysis.parallel.sum_frames_lag_times)
+	NOTE: e.g., TIMES=1:2:5:10 or TIMES=log:1:1000:20 for 20 lag times
+	      logarithmically spaced between 1 and 1000.
+	NOTE: TIMES overrides TIME in COMPUTE mode, and PLOT or SHOW modes
+	      following COMPUTE mode then use the largest lag time.
+	DEFAULT: TIME
 INTERVAL_MAXIMUM : int
 	Maximum number of intervals of length dt considered in correlations
 	calculations.
 	DEFAULT: 1
-N_CASES : int
+PROCESSES [COMPUTE mode] : int
+	Number of worker processes computing correlations of different frames.
+	(see active_particles.analysis.parallel.sum_frames)
+	NOTE: PROCESSES <= 0 will be interpreted as the number of CPUs.
+	NOTE: If PROCESSES == 1, displacements between frames time and
+	      time + TIME are read ahead on a background thread.
+	      (see active_particles.analysis.parallel.pair_reads)
+	DEFAULT: 1
+CHECKPOINT_FILE [COMPUTE mode] : string
+	File to which correlations summed over frames are checkpointed, and from
+	which an interrupted computation with the same frames resumes.
+	(see active_particles.analysis.parallel.sum_frames)
+	NOTE: The checkpoint file is removed when all frames are done.
+	NOTE: Checkpoints are only saved if CHECKPOINT_FILE or CHECKPOINT_FRAMES
+	      is set.
+	DEFAULT: DATA_DIRECTORY/active_particles.naming.Cuu filename + '.checkpoint'
+	         if CHECKPOINT_FRAMES is set, None otherwise
+CHECKPOINT_FRAMES [COMPUTE mode] : int
+	Number of frames between checkpoints.
+	NOTE: CHECKPOINT_FRAMES <= 0 disables checkpoints.
+	DEFAULT: active_particles.analysis.parallel._checkpoint_frames
+N_CASES ['grid' mode] : int
 	Number of boxes in each direction to compute the shear strain and
 	displacement vorticity grid.
 	DEFAULT: smallest integer value greater than or equal to the square root of
@@ -75,9 +130,14 @@ Y_ZERO : float
 R_MIN [PLOT or SHOW mode] : float
 	Minimum radius for correlations plots.
 	DEFAULT: active_particles.analysis.cuu._r_min
-R_MAX [PLOT or SHOW mode] : float
-	Maximum radius for correlations plots.
+R_MAX [PLOT or SHOW mode, or 'pairs' mode] : float
+	Maximum radius for correlations plots, and maximum distance between pairs
+	of particles in 'pairs' mode.
+	NOTE: R_MAX < 0 will be interpreted as half of BOX_SIZE.
 	DEFAULT: active_particles.analysis.cuu._r_max
+N_BINS ['pairs' mode] : int
+	Number of bins of radius between 0 and R_MAX.
+	DEFAULT: active_particles.analysis.cuu._Nbins
 CUU_MIN [PLOT or SHOW mode] : float
 	Minimum displacement correlation for correlation plots.
 	DEFAULT: active_particles.analysis.cuu._Cuu_min
@@ -109,7 +169,7 @@ AXIS [PLOT or SHOW mode] : string
 
 Output
 ------
-[COMPUTE MODE]
+[COMPUTE and 'grid' mode]
 > Prints execution time.
 > Saves 2D and 1D density correlations according to active_particles.naming.Cnn
 standards in DATA_DIRECTORY.
@@ -125,6 +185,12 @@ DATA_DIRECTORY.
 > Saves 2D, 1D, longitudinal and transversal displacement norm correlations and
 1D correlations corrected with density correlations according to
 active_particles.naming.Cee standards in DATA_DIRECTORY.
+[COMPUTE and 'pairs' mode]
+> Prints execution time.
+> Saves 1D displacement, relative displacement, displacement norm and
+displacement direction correlations according to active_particles.naming.Cuu,
+active_particles.naming.Cww, active_particles.naming.Cdd and
+active_particles.naming.Cee standards, with 'pairs' mode, in DATA_DIRECTORY.
 [SHOW or PLOT mode]
 > Plots correlations for all variables.
 [SAVE mode]
@@ -133,12 +199,15 @@ active_particles.naming.Cee standards in DATA_DIRECTORY.
 
 import active_particles.naming as naming
 
-from active_particles.init import get_env, slurm_output
-from active_particles.dat import Dat, Gsd
+from active_particles.init import get_env, get_env_times, slurm_output,\
+	lazy_import, mpl_backend
+from active_particles.dat import count_dat_frames
 from active_particles.maths import relative_positions, wo_mean, g2Dto1Dsquare
 
 from active_particles.analysis.correlations import corField2D_scalar_average,\
-    corField2D_vector_average_Cnn, CorGrid
+    CorGrid, CorField2DScalar, CorField2DVector, CorPairs
+from active_particles.analysis.parallel import sum_frames_lag_times,\
+    trajectories, pair_reads, _checkpoint_frames
 
 from os import getcwd
 from os import environ as envvar
@@ -156,20 +225,23 @@ from collections import OrderedDict
 
 from datetime import datetime
 
-import matplotlib as mpl
-if not(get_env('SHOW', default=False, vartype=bool)):
-	mpl.use('Agg')	# avoids crash if launching without display
-import matplotlib.pyplot as plt
-import matplotlib.colors as colors
-import matplotlib.cm as cmx
-from mpl_toolkits.axes_grid1 import make_axes_locatable
+from functools import partial
+
+mpl = lazy_import('matplotlib')
+plt = lazy_import('matplotlib.pyplot', before_import=mpl_backend)	# avoids crash if launching without display
+colors = lazy_import('matplotlib.colors')
+cmx = lazy_import('matplotlib.cm')
+make_axes_locatable = lazy_import('mpl_toolkits.axes_grid1',
+	'make_axes_locatable')
 
 from active_particles.plot.mpl_tools import GridCircle
 
 # DEFAULT VARIABLES
 
 _r_min = 1  # default minimum radius for correlations plots
-_r_max = 20	# default maximum radius for correlations plots
+_r_max = 20	# default maximum radius for correlations plots and correlations from pairs of particles
+
+_Nbins = 100	# default number of bins of radius for correlations from pairs of particles
 
 _Cuu_min = 1e-3 # default minimum displacement correlation for correlation plots
 _Cuu_max = 1    # default maximum displacement correlation for correlation plots
@@ -273,12 +345,121 @@ def displacement_related_grids(box_size, centre, Ncases, time,
 
 	return np.concatenate((dgridr, dgridr), axis=-1), ugrid, wgrid, egrid  # displacement variable grid
 
+def displacement_correlations_sums(box_size, centre, Ncases, time, dt,
+	w_traj, u_traj):
+	"""
+	Calculates accumulators of correlations of displacement norm, density,
+	displacement, relative displacement and displacement direction grids at
+	a given frame, which can be summed over frames before normalisation.
+	(see active_particles.analysis.cuu.displacement_related_grids and
+	active_particles.analysis.parallel.sum_frames)
+
+	Parameters
+	----------
+	box_size : float
+		Length of the considered system's square box.
+	centre : float array
+		Centre of the box.
+	Ncases : int
+		Number of boxes in each direction to compute the displacements.
+	time : int
+		Frame at which displacements will be calculated.
+	dt : int
+		Length of the interval of time for which the displacements are
+		calculated.
+	w_traj : active_particles.dat.Gsd
+		Wrapped trajectory object.
+	u_traj : active_particles.dat.Dat
+		Unwrapped trajectory object.
+
+	Returns
+	-------
+	Cdd : active_particles.analysis.correlations.CorField2DScalar
+		Displacement norm correlation accumulator.
+	Cnn : active_particles.analysis.correlations.CorField2DScalar
+		Density correlation accumulator.
+	Cuu : active_particles.analysis.correlations.CorField2DVector
+		Displacement correlations accumulator.
+	Cww : active_particles.analysis.correlations.CorField2DVector
+		Relative displacement correlations accumulator.
+	Cee : active_particles.analysis.correlations.CorField2DVector
+		Displacement direction correlations accumulator.
+	"""
+
+	ddgrid, ugrid, wgrid, egrid = displacement_related_grids(box_size,
+		centre, Ncases, time, dt, w_traj, u_traj)	# displacement variables grids
+	ngrid = (ugrid != 0).any(axis=-1)*1				# density grid
+
+	return (CorField2DScalar().add(ddgrid[:, :, 0]),
+		CorField2DScalar().add(ngrid), CorField2DVector().add(ugrid),
+		CorField2DVector().add(wgrid), CorField2DVector().add(egrid))
+
+def displacement_pair_correlations_sums(box_size, centre, r_max, Nbins,
+	time, dt, w_traj, u_traj):
+	"""
+	Calculates accumulator of correlations of displacement, relative
+	displacement, displacement norm and displacement direction, computed from
+	pairs of particles within r_max at a given frame, which can be summed over
+	frames before normalisation.
+	(see active_particles.analysis.correlations.CorPairs and
+	active_particles.analysis.parallel.sum_frames)
+
+	Particles in the square sub-system of centre centre and length box_size
+	are considered, with periodic boundary conditions if this sub-system is
+	the whole system box. Displacement variables are defined per particle as
+	grids are in active_particles.analysis.cuu.displacement_related_grids.
+
+	Parameters
+	----------
+	box_size : float
+		Length of the considered system's square box.
+	centre : float array
+		Centre of the box.
+	r_max : float
+		Maximum radius.
+	Nbins : int
+		Number of bins of radius.
+	time : int
+		Frame at which displacements will be calculated.
+	dt : int
+		Length of the interval of time for which the displacements are
+		calculated.
+	w_traj : active_particles.dat.Gsd
+		Wrapped trajectory object.
+	u_traj : active_particles.dat.Dat
+		Unwrapped trajectory object.
+
+	Returns
+	-------
+	Cpairs : active_particles.analysis.correlations.CorPairs
+		Displacement, relative displacement, displacement norm and
+		displacement direction correlations accumulator, in this order.
+	"""
+
+	frame = time + dt*get_env('ENDPOINT', default=False, vartype=bool)	# frame of positions
+	system_size = w_traj.box_size(frame)								# length of the system box
+
+	positions = relative_positions(w_traj.position(frame)[:, :2], centre,
+		system_size)	# positions relative to the centre of the box
+	in_box = (np.abs(positions) <= box_size/2).all(axis=-1)	# particles in the box
+
+	positions = positions[in_box]
+	u = np.array(u_traj.displacement(time, time + dt))[in_box, :2]	# displacements
+
+	w = u - np.mean(u, axis=0)		# relative displacements
+	d = np.sqrt(np.sum(u**2, axis=-1))	# displacement norms
+	e = np.divide(u, d[:, np.newaxis], out=np.zeros(u.shape),
+		where=d[:, np.newaxis]!=0)	# displacement directions
+
+	return CorPairs(r_max, Nbins).add(positions, u, w, d, e,
+		box_size=system_size if box_size >= system_size else None)	# periodic boundaries if the box covers the whole system
+
 class Cnn:
 	"""
 	Manipulates density self-correlations computed from displacement grids.
 	"""
 
-	def __init__(self, ugrid, box_size):
+	def __init__(self, ugrid, box_size, cnn2D=None):
 		"""
 		Calculates grids of density and their averaged correlations.
 
@@ -288,13 +469,19 @@ class Cnn:
 			Array of displacements or list of array of displacements.
 		box_size : float
 			Length of the system's square box.
+		cnn2D : 2D array-like
+			Precomputed 2D density correlation.
+			NOTE: if cnn2D != None, ugrid is ignored.
+			DEFAULT: None
 		"""
 
-		self.ugrid = np.array(ugrid, ndmin=4)	# list of array of displacements
 		self.box_size = box_size
 
-		self.ngrid = (self.ugrid != 0).any(axis=-1)*1			# density grid
-		self.cnn2D = corField2D_scalar_average(self.ngrid)		# 2D density correlation
+		if cnn2D is None:
+			self.ugrid = np.array(ugrid, ndmin=4)	# list of array of displacements
+			self.ngrid = (self.ugrid != 0).any(axis=-1)*1		# density grid
+			self.cnn2D = corField2D_scalar_average(self.ngrid)	# 2D density correlation
+		else: self.cnn2D = np.array(cnn2D)						# 2D density correlation
 		self.cnn1D = g2Dto1Dsquare(self.cnn2D, self.box_size)	# 1D averaged density correlation
 
 	def save(self, attributes, dir=getcwd()):
@@ -559,6 +746,63 @@ def plot_correlation(C, C2D, C1D, C1Dcor, C_min, C_max, naming_standard,
         return fig, axs, gc
     except NameError: return fig, axs
 
+def plot_pair_correlation(C, C1D, C_min, C_max, naming_standard):
+    """
+    Plot correlations computed from pairs of particles.
+
+    Parameters
+    ----------
+    C : string
+        Correlation name.
+    C1D : 1D array
+        Correlation as function of radius.
+        NOTE: This has to be of the form (r, C1D(r)) with C1D(r) the averaged
+        correlation at radius r.
+    C_min : float
+        Correlation minimum for plot.
+    C_max : float
+        Correlation maximum for plot.
+    naming_standard : active_particles.naming standard
+		Standard naming object.
+
+	Returns
+	-------
+	fig : matplotlib figure
+		Main figure.
+	ax : matplotlib axis
+		Main figure's axis.
+    """
+
+    fig, ax = plt.subplots()
+
+    fig.set_size_inches(16, 16)
+
+    fig.suptitle(
+        r'$N=%.2e, \phi=%1.2f, \tilde{v}=%.2e, \tilde{\nu}_r=%.2e$'
+        % (parameters['N'], parameters['density'], parameters['vzero'],
+		parameters['dr']) + '\n' +
+        r'$S_{init}=%.2e, \Delta t=%.2e$' % (init_frame,
+		dt*parameters['period_dump']*parameters['time_step']) +
+        r'$, S_{max}=%.2e, r_{max}=%.2e, N_{bins}=%.2e$' % (int_max, r_max,
+        Nbins))
+
+    fplot(ax)(C1D[:, 0], C1D[:, 1])
+
+    ax.set_xlabel(r'$r$')
+    ax.set_ylabel(r'$%s$' % C)
+    ax.set_title('radial ' + r'$%s$' % C + ' from pairs of particles')
+
+    ax.set_xlim(r_min, r_max)
+    ax.set_ylim(C_min, C_max)
+
+    # SAVING
+
+    if get_env('SAVE', default=False, vartype=bool):	# SAVE mode
+        image_name, = naming_standard.image().filename(**attributes)
+        fig.savefig(joinpath(data_dir, image_name))
+
+    return fig, ax
+
 # SCRIPT
 
 if __name__ == '__main__':  # executing as script
@@ -588,7 +832,16 @@ if __name__ == '__main__':  # executing as script
 		vartype=int)        # number of boxes in each direction with which to compute the displacement grid
     dL = box_size/Ncases    # boxes separation
 
-    Nentries = parameters['N_steps']//parameters['period_dump']		# number of time snapshots in unwrapped trajectory file
+    mode = get_env('MODE', default='grid')  # correlations computation mode
+
+    r_max = get_env('R_MAX', default=_r_max, vartype=float)	# maximum radius for correlations plots and correlations from pairs of particles
+    r_max = box_size/2 if r_max < 0 else r_max
+    Nbins = get_env('N_BINS', default=_Nbins, vartype=int)	# number of bins of radius for correlations from pairs of particles
+
+    unwrap_file_name = get_env('UNWRAPPED_FILE',
+		default=joinpath(data_dir, naming.unwrapped_trajectory_file))	# unwrapped trajectory file (.dat or .gsd)
+    Nentries = count_dat_frames(unwrap_file_name,
+		default=parameters['N_steps']//parameters['period_dump'])	# number of time snapshots in unwrapped trajectory file
     init_frame = int(Nentries/2) if init_frame < 0 else init_frame	# initial frame
     Nframes = Nentries - init_frame									# number of frames available for the calculation
 
@@ -598,16 +851,17 @@ if __name__ == '__main__':  # executing as script
 		'vzero': parameters['vzero'], 'dr': parameters['dr'],
 		'N': parameters['N'], 'init_frame': init_frame, 'dt': dt,
 		'int_max': int_max, 'Ncases': Ncases, 'box_size': box_size,
-        'x_zero': centre[0], 'y_zero': centre[1]}		# attributes displayed in filenames
+        'x_zero': centre[0], 'y_zero': centre[1],
+        'r_max': r_max, 'Nbins': Nbins}					# attributes displayed in filenames
     naming_Cnn = naming.Cnn()                           # Cnn naming object
     Cnn_filename, = naming_Cnn.filename(**attributes)   # Cnn filename
-    naming_Cuu = naming.Cuu()                           # Cuu naming object
+    naming_Cuu = naming.Cuu(mode=mode)                  # Cuu naming object
     Cuu_filename, = naming_Cuu.filename(**attributes)   # Cuu filename
-    naming_Cww = naming.Cww()                           # Cww naming object
+    naming_Cww = naming.Cww(mode=mode)                  # Cww naming object
     Cww_filename, = naming_Cww.filename(**attributes)   # Cww filename
-    naming_Cdd = naming.Cdd()                           # Cdd naming object
+    naming_Cdd = naming.Cdd(mode=mode)                  # Cdd naming object
     Cdd_filename, = naming_Cdd.filename(**attributes)   # Cdd filename
-    naming_Cee = naming.Cee()                           # Cee naming object
+    naming_Cee = naming.Cee(mode=mode)                  # Cee naming object
     Cee_filename, = naming_Cee.filename(**attributes)   # Cee filename
 
 	# STANDARD OUTPUT
@@ -625,58 +879,105 @@ if __name__ == '__main__':  # executing as script
 
         wrap_file_name = get_env('WRAPPED_FILE',
 			default=joinpath(data_dir, naming.wrapped_trajectory_file))		# wrapped trajectory file (.gsd)
-        unwrap_file_name = get_env('UNWRAPPED_FILE',
-			default=joinpath(data_dir, naming.unwrapped_trajectory_file))	# unwrapped trajectory file (.dat)
+        store_file_name = get_env('STORE_FILE')                           # chunked trajectory store file
+
+        lag_times = get_env_times('TIMES', Nframes) or [dt]	# lag times for displacement
 
-        times = np.array(list(OrderedDict.fromkeys(map(
+        frames = lambda dt: np.array(list(OrderedDict.fromkeys(map(
 			lambda x: int(x),
 			np.linspace(init_frame, Nentries - dt - 1, int_max)
-			))))	# frames at which shear strain will be calculated
+			))))	# frames at which shear strain will be calculated for lag time dt
 
         # DISPLACEMENT CORRELATIONS
 
-        with open(wrap_file_name, 'rb') as wrap_file,\
-			open(unwrap_file_name, 'rb') as unwrap_file:	# opens wrapped and unwrapped trajectory files
-
-            w_traj = Gsd(wrap_file, prep_frames=prep_frames)	# wrapped trajectory object
-            u_traj = Dat(unwrap_file, parameters['N'])			# unwrapped trajectory object
-            DDgrid, Ugrid, Wgrid, Egrid = tuple(np.transpose(list(map(
-                lambda time: displacement_related_grids(
-                	box_size, centre, Ncases, time, dt, w_traj, u_traj),
-                times)), (1, 0, 2, 3, 4)))						# lists of displacement variables
-
-        Dgrid = DDgrid[:, :, :, 0]  				# list of displacement norm grids
-        Cdd2D = corField2D_scalar_average(Dgrid)	# displacement norm correlation grids
-
-        Cnn_object = Cnn(Ugrid, box_size)	# density correlation object
-        Cnn2D = Cnn_object.cnn2D			# 2D density correlation grid
-        Cnn1D = Cnn_object.cnn1D			# 1D averaged density correlation grid
-
-        (Cuu2D, CuuL, CuuT), (Cww2D, CwwL, CwwT), (Cee2D, CeeL, CeeT) = tuple(
-            map(lambda Grid: corField2D_vector_average_Cnn(Grid, Cnn2D),
-            [Ugrid, Wgrid, Egrid]))                                             # displacement, relative displacement and displacement direction correlation grids
-
-        (Cuu1D, Cuu1Dcor), (Cww1D, Cww1Dcor), (Cdd1D, Cdd1Dcor),\
-            (Cee1D, Cee1Dcor) = tuple(map(
-            lambda C2D:
-            tuple(map(lambda C: g2Dto1Dsquare(C, box_size),
-            [C2D, np.divide(C2D, Cnn2D, out=np.zeros(C2D.shape),
-            where=Cnn2D!=0)]
-            )), [Cuu2D, Cww2D, Cdd2D, Cee2D]))  # 1D displacement variables correlations
-
-        # SAVING
-
-		# density correlations
-        Cnn_object.save(attributes, dir=data_dir)
-		# everything else
-        with open(joinpath(data_dir, Cuu_filename), 'wb') as Cuu_dump_file,\
-            open(joinpath(data_dir, Cww_filename), 'wb') as Cww_dump_file,\
-            open(joinpath(data_dir, Cdd_filename), 'wb') as Cdd_dump_file,\
-            open(joinpath(data_dir, Cee_filename), 'wb') as Cee_dump_file:
-            pickle.dump([Cuu2D, Cuu1D, Cuu1Dcor, CuuL, CuuT], Cuu_dump_file)
-            pickle.dump([Cww2D, Cww1D, Cww1Dcor, CwwL, CwwT], Cww_dump_file)
-            pickle.dump([Cdd2D, Cdd1D, Cdd1Dcor], Cdd_dump_file)
-            pickle.dump([Cee2D, Cee1D, Cee1Dcor, CeeL, CeeT], Cee_dump_file)
+        processes = get_env('PROCESSES', default=1, vartype=int)	# number of worker processes
+        checkpoint = get_env('CHECKPOINT_FILE',
+            default=joinpath(data_dir, Cuu_filename + '.checkpoint')
+                if 'CHECKPOINT_FRAMES' in envvar else None)	# checkpoint file of correlations summed over frames
+        checkpoint_frames = get_env('CHECKPOINT_FRAMES',
+            default=_checkpoint_frames, vartype=int)                 	# number of frames between checkpoints
+
+        sums = sum_frames_lag_times(
+            partial(displacement_pair_correlations_sums,
+                box_size=box_size, centre=centre, r_max=r_max, Nbins=Nbins)
+            if mode == 'pairs' else
+            partial(displacement_correlations_sums,
+                box_size=box_size, centre=centre, Ncases=Ncases),
+            lag_times, frames, open_trajectories=partial(trajectories,
+                wrap_file_name=wrap_file_name,
+                unwrap_file_name=unwrap_file_name,
+                N=parameters['N'], prep_frames=prep_frames,
+                store_file_name=store_file_name),
+            processes=processes, prefetch=partial(pair_reads, positions=True,
+                endpoint=get_env('ENDPOINT', default=False, vartype=bool))
+            if mode == 'pairs' else pair_reads,
+            checkpoint=checkpoint, checkpoint_frames=checkpoint_frames)	# accumulators of displacement variables correlations over frames for every lag time
+
+        if mode == 'pairs':	# correlations from pairs of particles
+
+            for dt, Cpairs in zip(lag_times, sums):
+
+                attributes['dt'] = dt                               # lag time displayed in filenames
+                Cuu_filename, = naming_Cuu.filename(**attributes)   # Cuu filename
+                Cww_filename, = naming_Cww.filename(**attributes)   # Cww filename
+                Cdd_filename, = naming_Cdd.filename(**attributes)   # Cdd filename
+                Cee_filename, = naming_Cee.filename(**attributes)   # Cee filename
+
+                Cuu1D, Cww1D, Cdd1D, Cee1D = Cpairs.correlation()	# 1D displacement variables correlations
+
+                # SAVING
+
+                with open(joinpath(data_dir, Cuu_filename), 'wb') as Cuu_dump_file,\
+                    open(joinpath(data_dir, Cww_filename), 'wb') as Cww_dump_file,\
+                    open(joinpath(data_dir, Cdd_filename), 'wb') as Cdd_dump_file,\
+                    open(joinpath(data_dir, Cee_filename), 'wb') as Cee_dump_file:
+                    pickle.dump([Cuu1D], Cuu_dump_file)
+                    pickle.dump([Cww1D], Cww_dump_file)
+                    pickle.dump([Cdd1D], Cdd_dump_file)
+                    pickle.dump([Cee1D], Cee_dump_file)
+
+        else:	# correlations from coarse-grained displacements
+
+            for dt, (Cdd, Cnn_accumulator, Cuu, Cww, Cee) in zip(lag_times,
+                sums):
+
+                attributes['dt'] = dt                               # lag time displayed in filenames
+                Cnn_filename, = naming_Cnn.filename(**attributes)   # Cnn filename
+                Cuu_filename, = naming_Cuu.filename(**attributes)   # Cuu filename
+                Cww_filename, = naming_Cww.filename(**attributes)   # Cww filename
+                Cdd_filename, = naming_Cdd.filename(**attributes)   # Cdd filename
+                Cee_filename, = naming_Cee.filename(**attributes)   # Cee filename
+
+                Cdd2D = Cdd.correlation()	# displacement norm correlation grids
+
+                Cnn_object = Cnn(None, box_size,
+                    cnn2D=Cnn_accumulator.correlation())	# density correlation object
+                Cnn2D = Cnn_object.cnn2D			# 2D density correlation grid
+                Cnn1D = Cnn_object.cnn1D			# 1D averaged density correlation grid
+
+                (Cuu2D, CuuL, CuuT), (Cww2D, CwwL, CwwT), (Cee2D, CeeL, CeeT) = tuple(
+                    map(lambda accumulator: accumulator.correlation(Cnn=Cnn2D),
+                    [Cuu, Cww, Cee]))                                                   # displacement, relative displacement and displacement direction correlation grids
+
+                C2D = np.array([Cuu2D, Cww2D, Cdd2D, Cee2D])   # displacement variables correlation grids
+                (Cuu1D, Cuu1Dcor), (Cww1D, Cww1Dcor), (Cdd1D, Cdd1Dcor),\
+                    (Cee1D, Cee1Dcor) = g2Dto1Dsquare(np.stack((C2D,
+                    np.divide(C2D, Cnn2D, out=np.zeros(C2D.shape), where=Cnn2D!=0)),
+                    axis=1), box_size)  # 1D displacement variables correlations, averaged in a single batch
+
+                # SAVING
+
+				# density correlations
+                Cnn_object.save(attributes, dir=data_dir)
+				# everything else
+                with open(joinpath(data_dir, Cuu_filename), 'wb') as Cuu_dump_file,\
+                    open(joinpath(data_dir, Cww_filename), 'wb') as Cww_dump_file,\
+                    open(joinpath(data_dir, Cdd_filename), 'wb') as Cdd_dump_file,\
+                    open(joinpath(data_dir, Cee_filename), 'wb') as Cee_dump_file:
+                    pickle.dump([Cuu2D, Cuu1D, Cuu1Dcor, CuuL, CuuT], Cuu_dump_file)
+                    pickle.dump([Cww2D, Cww1D, Cww1Dcor, CwwL, CwwT], Cww_dump_file)
+                    pickle.dump([Cdd2D, Cdd1D, Cdd1Dcor], Cdd_dump_file)
+                    pickle.dump([Cee2D, Cee1D, Cee1Dcor, CeeL, CeeT], Cee_dump_file)
 
         # EXECUTION TIME
 
@@ -686,16 +987,27 @@ if __name__ == '__main__':  # executing as script
 
 		# DATA
 
-        with open(joinpath(data_dir, Cnn_filename), 'rb') as Cnn_dump_file,\
-            open(joinpath(data_dir, Cuu_filename), 'rb') as Cuu_dump_file,\
-            open(joinpath(data_dir, Cww_filename), 'rb') as Cww_dump_file,\
-            open(joinpath(data_dir, Cdd_filename), 'rb') as Cdd_dump_file,\
-            open(joinpath(data_dir, Cee_filename), 'rb') as Cee_dump_file:
-            Cnn2D, Cnn1D = pickle.load(Cnn_dump_file)
-            Cuu2D, Cuu1D, Cuu1Dcor, CuuL, CuuT = pickle.load(Cuu_dump_file)
-            Cww2D, Cww1D, Cww1Dcor, CwwL, CwwT = pickle.load(Cww_dump_file)
-            Cdd2D, Cdd1D, Cdd1Dcor = pickle.load(Cdd_dump_file)
-            Cee2D, Cee1D, Cee1Dcor, CeeL, CeeT = pickle.load(Cee_dump_file)
+        if mode == 'pairs':	# correlations from pairs of particles
+            with open(joinpath(data_dir, Cuu_filename), 'rb') as Cuu_dump_file,\
+                open(joinpath(data_dir, Cww_filename), 'rb') as Cww_dump_file,\
+                open(joinpath(data_dir, Cdd_filename), 'rb') as Cdd_dump_file,\
+                open(joinpath(data_dir, Cee_filename), 'rb') as Cee_dump_file:
+                Cuu1D, = pickle.load(Cuu_dump_file)
+                Cww1D, = pickle.load(Cww_dump_file)
+                Cdd1D, = pickle.load(Cdd_dump_file)
+                Cee1D, = pickle.load(Cee_dump_file)
+
+        else:	# correlations from coarse-grained displacements
+            with open(joinpath(data_dir, Cnn_filename), 'rb') as Cnn_dump_file,\
+                open(joinpath(data_dir, Cuu_filename), 'rb') as Cuu_dump_file,\
+                open(joinpath(data_dir, Cww_filename), 'rb') as Cww_dump_file,\
+                open(joinpath(data_dir, Cdd_filename), 'rb') as Cdd_dump_file,\
+                open(joinpath(data_dir, Cee_filename), 'rb') as Cee_dump_file:
+                Cnn2D, Cnn1D = pickle.load(Cnn_dump_file)
+                Cuu2D, Cuu1D, Cuu1Dcor, CuuL, CuuT = pickle.load(Cuu_dump_file)
+                Cww2D, Cww1D, Cww1Dcor, CwwL, CwwT = pickle.load(Cww_dump_file)
+                Cdd2D, Cdd1D, Cdd1Dcor = pickle.load(Cdd_dump_file)
+                Cee2D, Cee1D, Cee1Dcor, CeeL, CeeT = pickle.load(Cee_dump_file)
 
     if get_env('PLOT', default=False, vartype=bool) or\
 		get_env('SHOW', default=False, vartype=bool):	# PLOT or SHOW mode
@@ -709,8 +1021,6 @@ if __name__ == '__main__':  # executing as script
             else ax.plot
 
         r_min = get_env('R_MIN', default=_r_min, vartype=float) # minimum radius for correlations plots
-        r_max = get_env('R_MAX', default=_r_max, vartype=float)	# maximum radius for correlations plots
-        r_max = box_size/2 if r_max < 0 else r_max	# half size of the box showed for 2D correlation
 
         Cuu_min = get_env('CUU_MIN', default=_Cuu_min, vartype=float)   # minimum displacement correlation for correlation plots
         Cuu_max = get_env('CUU_MAX', default=_Cuu_max, vartype=float)   # maximum displacement correlation for correlation plots
@@ -724,15 +1034,26 @@ if __name__ == '__main__':  # executing as script
         Cee_min = get_env('CEE_MIN', default=_Cee_min, vartype=float)   # minimum displacement direction correlation for correlation plots
         Cee_max = get_env('CEE_MAX', default=_Cee_max, vartype=float)   # maximum displacement direction correlation for correlation plots
 
-        plot_Cuu = plot_correlation('C_{uu}', Cuu2D, Cuu1D, Cuu1Dcor, Cuu_min,
-			Cuu_max, naming_Cuu,
+        if mode == 'pairs':	# correlations from pairs of particles
+            plot_Cuu = plot_pair_correlation('C_{uu}', Cuu1D, Cuu_min, Cuu_max,
+                naming_Cuu)
+            plot_Cww = plot_pair_correlation('C_{\delta u \delta u}', Cww1D,
+                Cww_min, Cww_max, naming_Cww)
+            plot_Cdd = plot_pair_correlation('C_{|u||u|}', Cdd1D, Cdd_min,
+                Cdd_max, naming_Cdd)
+            plot_Cee = plot_pair_correlation('C_{\hat{u}\hat{u}}', Cee1D,
+                Cee_min, Cee_max, naming_Cee)
+
+        else:	# correlations from coarse-grained displacements
+            plot_Cuu = plot_correlation('C_{uu}', Cuu2D, Cuu1D, Cuu1Dcor,
+                Cuu_min, Cuu_max, naming_Cuu,
 			CL=CuuL, CT=CuuT)
-        plot_Cww = plot_correlation('C_{\delta u \delta u}', Cww2D, Cww1D,
+            plot_Cww = plot_correlation('C_{\delta u \delta u}', Cww2D, Cww1D,
 			Cww1Dcor, Cww_min, Cww_max, naming_Cww,
 			CL=CwwL, CT=CwwT)
-        plot_Cdd = plot_correlation('C_{|u||u|}', Cdd2D, Cdd1D, Cdd1Dcor,
+            plot_Cdd = plot_correlation('C_{|u||u|}', Cdd2D, Cdd1D, Cdd1Dcor,
 			Cdd_min, Cdd_max, naming_Cdd)
-        plot_Cee = plot_correlation('C_{\hat{u}\hat{u}}', Cee2D, Cee1D,
+            plot_Cee = plot_correlation('C_{\hat{u}\hat{u}}', Cee2D, Cee1D,
 			Cee1Dcor, Cee_min, Cee_max, naming_Cee,
 			CL=CeeL, CT=CeeT)
 
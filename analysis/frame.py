@@ -154,7 +154,8 @@ Output
 
 import active_particles.naming as naming
 
-from active_particles.init import get_env, slurm_output, mkdir
+from active_particles.init import get_env, slurm_output, mkdir,\
+	lazy_import, mpl_backend
 from active_particles.dat import Dat, Gsd
 from active_particles.maths import normalise1D, amplogwidth
 
@@ -171,13 +172,12 @@ import pickle
 import numpy as np
 np.seterr(divide='ignore')
 
-import matplotlib as mpl
-if not(get_env('SHOW', default=False, vartype=bool)):
-	mpl.use('Agg')	# avoids crash if launching without display
-import matplotlib.pyplot as plt
-from matplotlib.colors import Normalize as ColorsNormalise
-from matplotlib.cm import ScalarMappable
-from mpl_toolkits.axes_grid1 import make_axes_locatable
+mpl = lazy_import('matplotlib')
+plt = lazy_import('matplotlib.pyplot', before_import=mpl_backend)	# avoids crash if launching without display
+ColorsNormalise = lazy_import('matplotlib.colors', 'Normalize')
+ScalarMappable = lazy_import('matplotlib.cm', 'ScalarMappable')
+make_axes_locatable = lazy_import('mpl_toolkits.axes_grid1',
+	'make_axes_locatable')
 
 from datetime import datetime
 
@@ -300,7 +300,7 @@ class _Frame:
             head_width=length*self.arrow_head_width,
             head_length=length*self.arrow_head_length, zorder=1)
 
-    def colorbar(self, vmin, vmax, cmap=plt.cm.jet):
+    def colorbar(self, vmin, vmax, cmap='jet'):
         """
         Adds colorbar to plot.
 
@@ -310,8 +310,8 @@ class _Frame:
             Minimum value of the colorbar.
         vmax : float
             Maximum value of the colorbar.
-        cmap : matplotlib colorbar
-            Matplotlib colorbar to be used. (default: matplotlib.pyplot.cm.jet)
+        cmap : matplotlib colormap or string
+            Matplotlib colormap to be used. (default: 'jet')
         """
 
         vNorm = ColorsNormalise(vmin=vmin, vmax=vmax)
@@ -35,6 +35,20 @@ DIVIDE_BY_DT [COMPUTE or SHOW mode] : bool
 SUPTITLE [COMPUTE or SHOW mode] : bool
 	Display suptitle on figure.
 	DEFAULT: True
+FFT [COMPUTE and not(DISTRIBUTION) mode] : bool
+	Compute mean square displacements with the fast Fourier transform
+	algorithm, over all pairs of frames from INITIAL_FRAME, for all lag times
+	at once.
+	NOTE: INTERVAL_MAXIMUM is then ignored, and all intervals of each lag time
+	      are considered, as with INTERVAL_MAXIMUM equal to the number of
+	      frames from INITIAL_FRAME, which is displayed in the file name
+	      instead.
+	NOTE: Standard errors are then computed from the dispersion of mean
+	      square displacements of individual particles, rather than of all
+	      square displacements, and the header of the output file is
+	      'time, MSD, sterr over particles'.
+	      (see active_particles.analysis.msd.mean_square_displacement_fft)
+	DEFAULT: False
 
 Environment parameters
 ----------------------
@@ -45,9 +59,17 @@ PARAMETERS_FILE : string
 	Simulation parameters file.
 	DEFAULT: DATA_DIRECTORY/active_particles.naming.parameters_file
 UNWRAPPED_FILE : string
-	Unwrapped trajectory file. (.dat)
+	Unwrapped trajectory file. (.dat or .gsd)
 	NOTE: .dat files defined with active_particles.dat
+	NOTE: Unwrapped positions are computed from periodic image flags of .gsd
+	      files, so that UNWRAPPED_FILE can be the wrapped trajectory file.
+	      (see active_particles.dat.GsdUnwrapped)
 	DEFAULT: DATA_DIRECTORY/active_particles.naming.unwrapped_trajectory_file
+STORE_FILE : string
+	Chunked trajectory store file, read instead of wrapped and unwrapped
+	trajectory files if set.
+	NOTE: stores defined with active_particles.dat.Store
+	DEFAULT: None
 INITIAL_FRAME : int
 	Frame to consider as initial.
 	NOTE: INITIAL_FRAME < 0 will be interpreted as the initial frame being
@@ -61,6 +83,11 @@ INTERVAL_PERIOD : int
 	Mean square displacement will be calculated for each INTERVAL_PERIOD dumps
 	period of time.
 	DEFAULT: 1
+CHUNK_SIZE [FFT mode] : int
+	Number of particles considered at once in mean square displacements
+	calculation.
+	NOTE: CHUNK_SIZE <= 0 will be interpreted as all particles.
+	DEFAULT: active_particles.analysis.msd._chunk_size
 FONT_SIZE : int
 	Font size for the plot.
 	DEFAULT: active_particles.plot.pphiloc._font_size
@@ -121,9 +148,11 @@ the active_particles.naming.Msd(distribution=True) standard.
 
 import active_particles.naming as naming
 
-from active_particles.init import get_env, slurm_output
-from active_particles.dat import Dat
+from active_particles.init import get_env, slurm_output, lazy_import,\
+    mpl_backend
+from active_particles.dat import Dat, GsdUnwrapped, Store, count_dat_frames
 from active_particles.maths import wo_mean, mean_sterr, Histogram
+from active_particles.analysis.parallel import Prefetch
 
 from os import getcwd
 from os import environ as envvar
@@ -137,15 +166,14 @@ from datetime import datetime
 
 from collections import OrderedDict
 
-import matplotlib as mpl
-if not(get_env('SHOW', default=False, vartype=bool)):
-	mpl.use('Agg')	# avoids crash if launching without display
-import matplotlib.pyplot as plt
-import matplotlib.colors as colors
-import matplotlib.cm as cmx
-import matplotlib as mpl
-from mpl_toolkits.axes_grid1 import make_axes_locatable
-import matplotlib.pyplot as plt
+from math import ceil
+
+mpl = lazy_import('matplotlib')
+plt = lazy_import('matplotlib.pyplot', before_import=mpl_backend)	# avoids crash if launching without display
+colors = lazy_import('matplotlib.colors')
+cmx = lazy_import('matplotlib.cm')
+make_axes_locatable = lazy_import('mpl_toolkits.axes_grid1',
+    'make_axes_locatable')
 
 from active_particles.plot.mpl_tools import FittingLine
 
@@ -155,6 +183,8 @@ _sq_disp_min = 1e-5	# default minimum included value of square displacement for
 _sq_disp_max = 1e5	# default maximum excluded value of square displacement for histogram bins
 _Nbins = 100		# default number of histogram bins
 
+_chunk_size = 1000	# default number of particles considered at once in FFT mode
+
 _psqdispmin = 1e-4  # default minimum square displacement probability
 _psqdispmax = 1e-1  # default maximum square displacement probability
 _contours = 20      # default contour level value
@@ -192,6 +222,165 @@ def square_displacement(u_traj, frame, dt):
     displacements = u_traj.displacement(frame, frame + dt)  # displacements between frame and frame + dt
     return  np.sum(wo_mean(displacements)**2, axis=-1)
 
+def displacements_frames(frames, dt):
+    """
+    Returns frames at which positions are read to compute displacements
+    between frames frame and frame + dt, for all frame in frames.
+
+    Parameters
+    ----------
+    frames : int array-like
+        Initial frames.
+    dt : int
+        Lag time.
+
+    Returns
+    -------
+    frames : (2*len(frames),) int Numpy array
+        Initial frames followed by final frames.
+    """
+
+    frames = np.array(frames, dtype=int)
+    return np.concatenate((frames, frames + dt))
+
+def square_displacements(u_traj, frames, dt):
+    """
+    Returns square displacements without mean drift between frames frame and
+    frame + dt, for all frame in frames, of all particles in unwrapped
+    trajectory file.
+
+    All necessary frames are read at once. (see
+    active_particles.dat.Dat.positions)
+
+    Parameters
+    ----------
+    u_traj : active_particles.dat.Dat
+		Unwrapped trajectory object.
+    frames : int array-like
+        Initial frames.
+    dt : int
+        Lag time.
+
+    Returns
+    -------
+    sq_disp : (len(frames), N) Numpy array
+        Arrays of all square displacements without mean drift.
+    """
+
+    positions = u_traj.positions(displacements_frames(frames, dt))  # positions at frames and frames + dt
+    displacements = positions[len(frames):] - positions[:len(frames)] # displacements between frames and frames + dt
+    return np.sum((displacements
+        - np.mean(displacements, axis=1, keepdims=True))**2, axis=-1)
+
+def msd_fft(positions):
+    """
+    Returns mean square displacements of individual particles, averaged over
+    all initial frames, for all lag times, computed with the fast Fourier
+    transform (Wiener-Khinchin) algorithm.
+
+    With T the number of frames, the mean square displacement at lag time m
+    is S1(m) - 2 S2(m), where
+    S1(m) = 1/(T - m) sum_{t=0}^{T-m-1} (r(t)^2 + r(t + m)^2)
+    is obtained from cumulative sums and
+    S2(m) = 1/(T - m) sum_{t=0}^{T-m-1} r(t).r(t + m)
+    is the positions auto-correlation computed from zero-padded FFTs.
+
+    Parameters
+    ----------
+    positions : (T, n, d) array-like
+        Positions of n particles at T consecutive frames.
+
+    Returns
+    -------
+    msd : (T, n) Numpy array
+        Mean square displacements of the n particles for lag times 0 to
+        T - 1.
+    """
+
+    positions = np.array(positions, dtype=float)
+    T = positions.shape[0]      # number of frames
+    Tm = np.reshape(T - np.arange(T), (T, 1))   # number of initial frames for each lag time
+
+    D = np.sum(positions**2, axis=-1)                           # square norms of positions
+    D = np.concatenate((D, np.zeros((1, D.shape[1]))), axis=0)  # padded with zeros for indexes -1 and T
+    S1 = (2*np.sum(D, axis=0) - np.cumsum(
+        D[np.arange(T) - 1] + D[T - np.arange(T)], axis=0))/Tm  # sum of square norms of positions at initial and final frames
+
+    FFT = np.fft.rfft(positions, n=2*T, axis=0)             # zero-padded FFT of positions
+    S2 = np.sum(np.fft.irfft(np.conj(FFT)*FFT, n=2*T, axis=0)[:T],
+        axis=-1)/Tm                                         # positions auto-correlation
+
+    return S1 - 2*S2
+
+def mean_square_displacement_fft(u_traj, frames, chunk_size=None):
+    """
+    Returns mean square displacements without mean drift, averaged over all
+    pairs of frames in frames separated by lag time, for all lag times, and
+    corresponding standard errors.
+    (see active_particles.analysis.msd.msd_fft)
+
+    Mean drift is removed by subtracting the mean square displacement of the
+    centre of mass from the mean of mean square displacements of individual
+    particles, which is equivalent to removing the mean displacement of
+    particles between two frames, since the mean over particles of cross
+    terms between displacements of particles and of the centre of mass is the
+    square displacement of the centre of mass.
+
+    Particles are considered by chunks of chunk_size particles, so that memory
+    stays bounded for long trajectories, and positions are read once.
+
+    NOTE: Standard errors are computed from the dispersion of the mean square
+          displacements of individual particles, minus the mean square
+          displacement of the centre of mass, and are thus not comparable to
+          standard errors of all square displacements computed with
+          active_particles.maths.mean_sterr.
+
+    Parameters
+    ----------
+    u_traj : active_particles.dat.Dat
+        Unwrapped trajectory object.
+    frames : int array-like
+        Consecutive frames.
+    chunk_size : int
+        Number of particles considered at once.
+        NOTE: if chunk_size == None, all particles are considered at once.
+        DEFAULT: None
+
+    Returns
+    -------
+    msd : (len(frames),) Numpy array
+        Mean square displacements for lag times 0 to len(frames) - 1.
+    sterr : (len(frames),) Numpy array
+        Standard errors of mean square displacements.
+    """
+
+    frames = np.array(frames, dtype=int)
+    if chunk_size == None or chunk_size <= 0: chunk_size = u_traj.N
+    chunks = [range(start, min(start + chunk_size, u_traj.N))
+        for start in range(0, u_traj.N, chunk_size)]    # chunks of particle indexes
+
+    prefetch = Prefetch(chunks,
+        lambda chunk: [('u_traj', 'positions', (frames, *chunk))],
+        u_traj=u_traj)  # chunks with positions read ahead
+
+    centre = np.zeros((len(frames), 2)) # centre of mass positions
+    sum_msd = np.zeros(len(frames))     # sum of particles mean square displacements
+    sum_sq_msd = np.zeros(len(frames))  # sum of particles square mean square displacements
+    for chunk in prefetch:
+        positions = prefetch.u_traj.positions(frames, *chunk)[..., :2]  # positions of particles of chunk
+        centre += np.sum(positions, axis=1)
+        msd_chunk = msd_fft(positions)
+        sum_msd += np.sum(msd_chunk, axis=-1)
+        sum_sq_msd += np.sum(msd_chunk**2, axis=-1)
+    centre /= u_traj.N
+
+    msd_centre = msd_fft(np.reshape(centre, (len(frames), 1, 2)))[:, 0]  # mean square displacement of centre of mass
+    mean_msd = sum_msd/u_traj.N     # mean of particles mean square displacements
+    msd = mean_msd - msd_centre
+    sterr = np.sqrt(np.maximum(sum_sq_msd/u_traj.N - mean_msd**2, 0)
+        /u_traj.N)
+    return msd, sterr
+
 # SCRIPT
 
 if __name__ == '__main__':  # executing as script
@@ -209,13 +398,20 @@ if __name__ == '__main__':  # executing as script
     with open(parameters_file, 'rb') as param_file:
         parameters = pickle.load(param_file)				# parameters hash table
 
-    Nentries = parameters['N_steps']//parameters['period_dump']		# number of time snapshots in unwrapped trajectory file
+    unwrap_file_name = get_env('UNWRAPPED_FILE',
+		default=joinpath(data_dir, naming.unwrapped_trajectory_file))	# unwrapped trajectory file (.dat or .gsd)
+    Nentries = count_dat_frames(unwrap_file_name,
+		default=parameters['N_steps']//parameters['period_dump'])	# number of time snapshots in unwrapped trajectory file
+    prep_frames = ceil(parameters['prep_steps']/parameters['period_dump'])	# number of preparation frames (FIRE energy minimisation)
     init_frame = int(Nentries/2) if init_frame < 0 else init_frame	# initial frame
 
     distribution = get_env('DISTRIBUTION', default=False, vartype=bool)	# DISTRIBUTION mode
 
     divide_by_dt = get_env('DIVIDE_BY_DT', default=True, vartype=bool)	# DIVIDE_BY_DT mode
 
+    fft = get_env('FFT', default=False, vartype=bool) and not(distribution)	# FFT mode
+    if fft: int_max = Nentries - init_frame	# all intervals are considered in FFT mode
+
     # NAMING
 
     attributes = {'density': parameters['density'],
@@ -238,8 +434,7 @@ if __name__ == '__main__':  # executing as script
 
 		# VARIABLE DEFINITIONS
 
-        unwrap_file_name = get_env('UNWRAPPED_FILE',
-			default=joinpath(data_dir, naming.unwrapped_trajectory_file))	# unwrapped trajectory file (.dat)
+        store_file_name = get_env('STORE_FILE')                           # chunked trajectory store file
 
         Nframes = Nentries - init_frame # number of frames available for the calculation
         Ntimes = Nframes//int_period    # number of time intervals considered in the calculation
@@ -251,35 +446,59 @@ if __name__ == '__main__':  # executing as script
 
         # CALCULATION
 
-        with open(unwrap_file_name, 'rb') as unwrap_file,\
+        with (open(unwrap_file_name, 'rb') if store_file_name == None
+            else Store(store_file_name, unwrapped=True)) as unwrap_file,\
             open(joinpath(data_dir, msd_filename),
 			'wb' if distribution else 'w') as msd_file:					# opens unwrapped trajectory file and square displacement output file
-            if not(distribution): msd_file.write('time, MSD, sterr\n')	# output file header
+            if not(distribution): msd_file.write('time, MSD, sterr%s\n'
+                % (' over particles' if fft else ''))	# output file header
+
+            if store_file_name != None:                 # chunked trajectory store
+                u_traj = unwrap_file                    # unwrapped trajectory object
+            elif unwrap_file_name.endswith('.gsd'):     # unwrapped positions computed from .gsd file
+                u_traj = GsdUnwrapped(unwrap_file, prep_frames=prep_frames)
+            else:
+                u_traj = Dat(unwrap_file, parameters['N'])
+
+            if fft:	# FFT mode
 
-            u_traj = Dat(unwrap_file, parameters['N'])  # unwrapped trajectory object
+                chunk_size = get_env('CHUNK_SIZE', default=_chunk_size,
+                    vartype=int)    # number of particles considered at once
 
-            sq_disps = []			# list of square displacements
-            for dt in lag_times:    # for each lag time
-                lag_time = dt*parameters['period_dump']*parameters['time_step']
+                msd, sterr = mean_square_displacement_fft(u_traj,
+                    range(init_frame, Nentries), chunk_size=chunk_size)    # mean square displacements and corresponding standard errors for all lag times
+                for dt in lag_times:
+                    lag_time = dt*parameters['period_dump']*parameters['time_step']
+                    msd_file.write('%e,%e,%e\n' % (lag_time, msd[dt], sterr[dt]))
 
-                frames = list(OrderedDict.fromkeys(
+            else:   # direct calculation for each lag time
+
+                initial_frames = lambda dt: list(OrderedDict.fromkeys(
                     init_frame + np.linspace(0, Nframes - dt - 1,
                     min(int_max, Nframes - dt), dtype=int)
-                    ))                              # initial frames for mean square displacement at lag time dt
-                sq_disp = list(map(
-                    lambda frame: square_displacement(u_traj, frame, dt),
-                    frames
-                    ))                              # square displacements for lag time dt
+                    ))  # initial frames for mean square displacement at lag time dt
+                prefetch = Prefetch(lag_times,
+                    lambda dt: [('u_traj', 'positions',
+                        (displacements_frames(initial_frames(dt), dt),))],
+                    u_traj=u_traj)  # lag times with positions read ahead
+
+                sq_disps = []			    # list of square displacements
+                for dt in prefetch:         # for each lag time
+                    lag_time = dt*parameters['period_dump']*parameters['time_step']
+
+                    frames = initial_frames(dt) # initial frames for mean square displacement at lag time dt
+                    sq_disp = list(square_displacements(prefetch.u_traj,
+                        frames, dt))            # square displacements for lag time dt
 
-                if not(distribution):					# not(DISTRIBUTION) mode
-                    msd, sterr = mean_sterr(sq_disp)	# mean square displacement and corresponding standard error
-                    msd_file.write('%e,%e,%e\n' % (lag_time, msd, sterr))
+                    if not(distribution):					# not(DISTRIBUTION) mode
+                        msd, sterr = mean_sterr(sq_disp)	# mean square displacement and corresponding standard error
+                        msd_file.write('%e,%e,%e\n' % (lag_time, msd, sterr))
 
-                else:	# DISTRIBUTION mode
-                    sq_disps += [sq_disp]
+                    else:	# DISTRIBUTION mode
+                        sq_disps += [sq_disp]
 
-            if distribution:
-                pickle.dump([lag_times, sq_disps], msd_file)
+                if distribution:
+                    pickle.dump([lag_times, sq_disps], msd_file)
 
         # EXECUTION TIME
 
@@ -1,7 +1,9 @@
 """
-Module neighbours defines the object NeighboursGrid, which is initiated by
+Module neighbours defines the objects NeighboursGrid, which is initiated by
 calculating the neighbours grid and allows one to then access neighbouring
-particles of any point.
+particles of any point, and NeighboursKDTree, which provides the same
+interface from a periodic k-d tree, and the function wrap, which wraps
+coordinates in a periodic box so that they can be given to periodic k-d trees.
 
 A brief description of the algorithm can be found at:
 https://yketa.github.io/UBC_2018_Wiki/#Neighbours%20grids
@@ -9,20 +11,54 @@ https://yketa.github.io/UBC_2018_Wiki/#Neighbours%20grids
 
 import numpy as np
 
-from active_particles.maths import neighbouring_boxes_2D
+from active_particles.init import lazy_import
+
+cKDTree = lazy_import('scipy.spatial', 'cKDTree')
+
+def wrap(points, box_size):
+    """
+    Returns coordinates of points wrapped in [0, box_size[.
+
+    NOTE: Coordinates slightly below 0 are wrapped to box_size by the modulo
+          operation because of rounding errors, and are then set to 0, since
+          scipy.spatial.cKDTree does not accept coordinates equal to the size
+          of its periodic box.
+
+    Parameters
+    ----------
+    points : (*, d) array-like
+        Coordinates of points.
+    box_size : float or (d,) float array-like
+        Length(s) of the periodic box.
+
+    Returns
+    -------
+    wrapped_points : (*, d) float Numpy array
+        Wrapped coordinates of points.
+    """
+
+    box_size = np.asarray(box_size, dtype=float)
+    wrapped_points = np.array(points, dtype=float)%box_size
+    wrapped_points[wrapped_points >= box_size] = 0  # rounding errors
+    return wrapped_points
 
 class NeighboursGrid:
     """
     Considering a 2D square box, a grid is built by dividing the box in smaller
-    boxes of length at least equal to r_cut. We call neighbours grid the hash
-    table which keys are 2-uples of indexes of the created grid and which
-    values are lists of the indexes of particles contained in the corresponding
-    boxes.
+    boxes of length at least equal to r_cut. We call neighbours grid the cell
+    list which associates to each box of this grid the indexes of particles
+    contained in this box.
+
+    The neighbours grid is stored as an array of particles indexes sorted by
+    flattened box index, self.particles, and an array of offsets,
+    self.box_starts, such that indexes of particles in flattened box b are
+    self.particles[self.box_starts[b]:self.box_starts[b + 1]].
 
     Neighbours grids are used to speed up calculations when looking for
     neighbouring particles within a cut-off radius. Once a neighbours grid is
     calculated by initiating this object, neighbouring particles within r_cut
-    of any point can be found with self.get_neighbours(...).
+    of any point can be found with self.get_neighbours(...), or of many points
+    at once with self.get_neighbours_batch(...).
     """
 
     def __init__(self, positions, box_size, r_cut):
@@ -42,20 +78,45 @@ class NeighboursGrid:
 
         self.cases_rcut = int(box_size/r_cut)   # number of boxes in one direction for the neighbours grid
         self.spacing = box_size/self.cases_rcut # spacing between two consecutive boxes
-        self.neighbours_grid = {(x, y): [] for x in range(self.cases_rcut)\
-            for y in range(self.cases_rcut)}    # neighbours grid
 
-        for index in range(len(positions)):     # for all particles
-            if (np.abs(positions[index]) > box_size).any(): continue    # do not consider particles outside the box
-            self.neighbours_grid[tuple(
-                (np.array(positions[index])//self.spacing + self.cases_rcut)
-                %self.cases_rcut)] += [index]                           # add index to corresponding list
+        positions = np.array(positions, ndmin=2)[:, :2]
+        in_box = np.where(
+            (np.abs(positions) <= box_size).all(axis=-1))[0]    # do not consider particles outside the box
+        boxes = self.box_index(positions[in_box])               # flattened box indexes of particles
+
+        order = np.argsort(boxes, kind='mergesort')
+        self.particles = in_box[order]  # particles indexes sorted by box
+        self.box_starts = np.concatenate(([0], np.cumsum(np.bincount(
+            boxes, minlength=self.cases_rcut**2))))    # offsets of boxes in self.particles
+
+        self.neighbouring_boxes = np.array([(x, y)
+            for x in [-1, 0, 1] for y in [-1, 0, 1]])   # increments in box indexes of neighbouring boxes
+
+    def box_index(self, points):
+        """
+        Returns flattened indexes of boxes containing points.
+
+        Parameters
+        ----------
+        points : (*, 2) array-like
+            Coordinates of points.
+
+        Returns
+        -------
+        boxes : (*,) int Numpy array
+            Flattened indexes of boxes.
+        """
+
+        index = np.array(
+            (np.array(points)//self.spacing + self.cases_rcut)%self.cases_rcut,
+            dtype=int)  # indexes of boxes
+        return index[..., 0]*self.cases_rcut + index[..., 1]
 
     def get_neighbours(self, point):
         """
-        Returns the list of indexes of particles contained in boxes
-        neighbouring the box containing a given point as well as the particles'
-        indexes in this box.
+        Returns the indexes of particles contained in boxes neighbouring the
+        box containing a given point as well as the particles' indexes in this
+        box.
 
         WARNING: Not all particles which indexes are returned by this function
         are within a distance r_cut of point, however all particles which are
@@ -69,15 +130,151 @@ class NeighboursGrid:
 
         Returns
         -------
-        neighbours : list
-            List of the indexes of particles neighbouring point within r_cut.
+        neighbours : int Numpy array
+            Indexes of particles neighbouring point within r_cut.
+        """
+
+        return self.get_neighbours_batch(np.array(point, ndmin=2))[0]
+
+    def get_neighbours_batch(self, points):
+        """
+        Returns the indexes of particles contained in boxes neighbouring the
+        boxes containing given points as well as the particles' indexes in
+        these boxes, for all points at once.
+
+        WARNING: Not all particles which indexes are returned by this function
+        are within a distance r_cut of points, however all particles which are
+        within r_cut will be returned.
+
+        Parameters
+        ----------
+        points : (*, 2) array-like
+            Positions of the points of which we want neighbouring particles
+            within r_cut.
+
+        Returns
+        -------
+        neighbours : int Numpy array
+            Concatenated indexes of particles neighbouring each point.
+        starts : (len(points) + 1,) int Numpy array
+            Offsets of points in neighbours, such that indexes of particles
+            neighbouring points[p] are neighbours[starts[p]:starts[p + 1]].
+        """
+
+        index = np.array(
+            (np.array(points, ndmin=2)//self.spacing
+            + self.cases_rcut)%self.cases_rcut, dtype=int)  # indexes of boxes containing points
+        index = (np.reshape(index, (len(index), 1, 2))
+            + self.neighbouring_boxes + self.cases_rcut)%self.cases_rcut    # indexes of neighbouring boxes
+        boxes = np.sort(index[..., 0]*self.cases_rcut + index[..., 1], axis=-1)
+        boxes[:, 1:][boxes[:, 1:] == boxes[:, :-1]] = -1    # discard boxes counted twice when there are less than 3 boxes in one direction
+
+        counts = np.where(boxes >= 0,
+            self.box_starts[boxes + 1] - self.box_starts[boxes], 0)    # number of particles in neighbouring boxes
+        starts = np.concatenate(([0], np.cumsum(np.sum(counts, axis=-1))))
+
+        counts = counts.flatten()
+        first = np.where(boxes >= 0, self.box_starts[boxes], 0).flatten() # offsets of neighbouring boxes in self.particles
+        segments = np.cumsum(counts) - counts                               # offsets of neighbouring boxes in neighbours
+        neighbours = self.particles[np.repeat(first - segments, counts)
+            + np.arange(np.sum(counts))]
+
+        return neighbours, starts
+
+class NeighboursKDTree:
+    """
+    Considering a 2D square box with periodic boundary conditions, a k-d tree
+    of particle positions is built with scipy.spatial.cKDTree, which allows
+    one to access particles within r_cut of any point with the same interface
+    as active_particles.analysis.neighbours.NeighboursGrid.
+
+    Contrary to neighbours grids, only particles within a distance r_cut of
+    points are returned.
+    """
+
+    def __init__(self, positions, box_size, r_cut):
         """
+        Calculates k-d tree from particle positions, box size and cut-off
+        radius.
 
-        index =\
-            (np.array(point)//self.spacing + self.cases_rcut)%self.cases_rcut   # index of the box containing point
+        Parameters
+        ----------
+        positions : (N, 2) shaped array
+            Positions of the particles.
+        box_size : float
+            Length of the 2D square box.
+        r_cut : float
+            Cut-off radius.
+        """
+
+        self.box_size = box_size
+        self.r_cut = r_cut
+
+        positions = np.array(positions, ndmin=2)[:, :2]
+        self.particles = np.where(
+            (np.abs(positions) <= box_size).all(axis=-1))[0]    # do not consider particles outside the box
+        self.tree = cKDTree(self.wrap(positions[self.particles]),
+            boxsize=box_size)                                   # periodic k-d tree
+
+    def wrap(self, points):
+        """
+        Returns coordinates of points wrapped in [0, self.box_size[.
+
+        Parameters
+        ----------
+        points : (*, 2) array-like
+            Coordinates of points.
+
+        Returns
+        -------
+        wrapped_points : (*, 2) float Numpy array
+            Wrapped coordinates of points.
+        """
+
+        return wrap(points, self.box_size)
+
+    def get_neighbours(self, point):
+        """
+        Returns the indexes of particles within r_cut of a given point.
+
+        Parameters
+        ----------
+        point : array of length 2
+            Position of the point of which we want neighbouring particles
+            within r_cut.
+
+        Returns
+        -------
+        neighbours : int Numpy array
+            Indexes of particles neighbouring point within r_cut.
+        """
+
+        return self.get_neighbours_batch(np.array(point, ndmin=2))[0]
+
+    def get_neighbours_batch(self, points):
+        """
+        Returns the indexes of particles within r_cut of given points, for all
+        points at once.
+
+        Parameters
+        ----------
+        points : (*, 2) array-like
+            Positions of the points of which we want neighbouring particles
+            within r_cut.
+
+        Returns
+        -------
+        neighbours : int Numpy array
+            Concatenated indexes of particles neighbouring each point.
+        starts : (len(points) + 1,) int Numpy array
+            Offsets of points in neighbours, such that indexes of particles
+            neighbouring points[p] are neighbours[starts[p]:starts[p + 1]].
+        """
 
-        neighbours = []                                         # neighbours list
-        for neighbour_index in neighbouring_boxes_2D(index, self.cases_rcut):
-            neighbours += self.neighbours_grid[neighbour_index] # adds indexes of neighbouring box to list of neighbours
+        neighbours = self.tree.query_ball_point(
+            self.wrap(np.array(points, ndmin=2)), self.r_cut)  # lists of indexes in tree
+        starts = np.concatenate(([0], np.cumsum(list(map(len, neighbours)))))
 
-        return neighbours
+        return self.particles[np.array(
+            np.concatenate(neighbours) if len(neighbours) > 0 else [],
+            dtype=int)], starts
@@ -0,0 +1,796 @@
+"""
+Module parallel provides functions to compute sums of quantities over
+trajectory frames with a pool of worker processes, each of them with its own
+trajectory objects, and the object Prefetch, which reads trajectory data of
+upcoming frames on a background thread.
+
+Running sums can be checkpointed to disk every few frames, so that an
+interrupted computation resumes from its last checkpoint.
+
+Sums for several lag times are computed in a single pass over frames with
+active_particles.analysis.parallel.sum_frames_lag_times.
+"""
+
+from active_particles.dat import Dat, Gsd, GsdUnwrapped, Store
+
+from multiprocessing import Pool
+from multiprocessing.util import Finalize
+
+from functools import partial
+
+import threading
+
+from collections import deque, OrderedDict
+
+import numpy as np
+
+import pickle
+
+import os
+
+# DEFAULT VARIABLES
+
+_prefetch_frames = 2        # default maximum number of items read ahead
+_prefetch_memory = 2**28    # default maximum memory in bytes of data read ahead
+
+_checkpoint_frames = 10     # default number of frames between checkpoints
+
+_trajectories = {}  # trajectory objects of worker process
+
+def trajectories(wrap_file_name=None, unwrap_file_name=None, N=None,
+    prep_frames=0, store_file_name=None):
+    """
+    Opens trajectory files and returns corresponding trajectory objects.
+
+    Parameters
+    ----------
+    wrap_file_name : string
+        Wrapped trajectory file name. (.gsd)
+        NOTE: if wrap_file_name == None, no wrapped trajectory object is
+              returned.
+        DEFAULT: None
+    unwrap_file_name : string
+        Unwrapped trajectory file name. (.dat or .gsd)
+        NOTE: if unwrap_file_name == None, no unwrapped trajectory object is
+              returned.
+        NOTE: if unwrap_file_name ends with '.gsd', unwrapped positions are
+              computed from periodic image flags of this file, sharing the
+              wrapped trajectory object if it is the same file.
+              (see active_particles.dat.GsdUnwrapped)
+        DEFAULT: None
+    N : int
+        Number of particles.
+        DEFAULT: None
+    prep_frames : int
+        Number of preparation frames in wrapped trajectory file.
+        DEFAULT: 0
+    store_file_name : string
+        Chunked trajectory store file name. (see active_particles.dat.Store)
+        NOTE: if store_file_name != None, wrapped and unwrapped trajectory
+              objects are read from the store instead of trajectory files,
+              and are returned if wrap_file_name != None and
+              unwrap_file_name != None respectively.
+        DEFAULT: None
+
+    Returns
+    -------
+    trajectory_objects : hash table
+        Trajectory objects, with keys
+        'w_traj' : active_particles.dat.Gsd wrapped trajectory object, if
+                   wrap_file_name != None,
+        'u_traj' : active_particles.dat.Dat or
+                   active_particles.dat.GsdUnwrapped unwrapped trajectory
+                   object, if unwrap_file_name != None.
+    """
+
+    trajectory_objects = {}
+    if store_file_name != None:
+        if wrap_file_name != None:
+            trajectory_objects['w_traj'] = Store(store_file_name)   # wrapped trajectory object
+        if unwrap_file_name != None:
+            trajectory_objects['u_traj'] = Store(store_file_name,
+                unwrapped=True)                                     # unwrapped trajectory object
+        return trajectory_objects
+
+    if wrap_file_name != None:
+        trajectory_objects['w_traj'] = Gsd(open(wrap_file_name, 'rb'),
+            prep_frames=prep_frames)    # wrapped trajectory object
+    if unwrap_file_name != None and unwrap_file_name.endswith('.gsd'):
+        trajectory_objects['u_traj'] = GsdUnwrapped(
+            trajectory_objects['w_traj'] if unwrap_file_name == wrap_file_name
+            else open(unwrap_file_name, 'rb'), prep_frames=prep_frames)      # unwrapped trajectory object
+    elif unwrap_file_name != None:
+        trajectory_objects['u_traj'] = Dat(open(unwrap_file_name, 'rb'), N)   # unwrapped trajectory object
+    return trajectory_objects
+
+def add_results(result0, result1):
+    """
+    Returns sum of results, which can be numbers, arrays or nested tuples or
+    lists of numbers and arrays with the same structure.
+
+    NOTE: None results, and None elements of tuples or lists, are considered
+          as zero.
+
+    Parameters
+    ----------
+    result0 : number, array-like, tuple, list or None
+        First result.
+    result1 : number, array-like, tuple, list or None
+        Second result.
+
+    Returns
+    -------
+    result : number, array-like, tuple or None
+        Sum of results.
+    """
+
+    if result0 is None: return result1
+    if result1 is None: return result0
+    if isinstance(result0, (tuple, list)):
+        return tuple(map(add_results, result0, result1))
+    return result0 + result1
+
+def sum_frames(function, times, open_trajectories=None, processes=1,
+    prefetch=None, checkpoint=None, checkpoint_frames=_checkpoint_frames,
+    checkpoint_key=None):
+    """
+    Returns sum over frames of function(time=time, **trajectory_objects),
+    where trajectory_objects are returned by open_trajectories().
+
+    Frames are distributed over a pool of worker processes (see
+    multiprocessing.Pool and multiprocessing.Pool.imap_unordered), each of
+    them calling open_trajectories once to get its own trajectory objects.
+    Results are added as soon as they are returned by workers, so that results
+    of all frames are never held in memory at once.
+
+    With a checkpoint file, results are added in order of frames, and the
+    running sum and number of frames done are saved to this file every
+    checkpoint_frames frames. If this file exists and was saved for the same
+    frames and checkpoint key, the running sum is loaded from it and frames already done are
+    skipped, so that the sum is the same as the one of an uninterrupted
+    computation. The file is removed when the sum is complete.
+
+    NOTE: function and open_trajectories have to be picklable, i.e. module-level
+          functions or functools.partial objects of module-level functions.
+
+    Parameters
+    ----------
+    function : function
+        Function of frame, as keyword argument time, and trajectory objects,
+        as keyword arguments, returning number, array or nested tuple or list
+        of numbers and arrays.
+    times : int array-like
+        Frames over which to sum.
+    open_trajectories : function
+        Function which returns hash table of trajectory objects.
+        (see active_particles.analysis.parallel.trajectories)
+        NOTE: if open_trajectories == None, function is called with frame
+              only.
+        DEFAULT: None
+    processes : int
+        Number of worker processes to use. (see multiprocessing.Pool)
+        NOTE: if processes == None or processes <= 0, then
+              processes = os.cpu_count().
+        NOTE: if processes == 1, frames are computed in the current process.
+        DEFAULT: 1
+    prefetch : function
+        Function of frame which returns reads of trajectory objects to
+        perform ahead on a background thread when frames are computed in the
+        current process. (see active_particles.analysis.parallel.Prefetch)
+        NOTE: e.g., partial(active_particles.analysis.parallel.pair_reads,
+              dt=dt) reads displacements between frames time and time + dt
+              ahead.
+        NOTE: if prefetch == None, nothing is read ahead.
+        DEFAULT: None
+    checkpoint : string
+        Checkpoint file name.
+        NOTE: if checkpoint == None, no checkpoint is saved or loaded.
+        DEFAULT: None
+    checkpoint_frames : int
+        Number of frames between checkpoints.
+        NOTE: if checkpoint_frames <= 0, no checkpoint is saved or loaded.
+        DEFAULT: active_particles.analysis.parallel._checkpoint_frames
+    checkpoint_key : *
+        Picklable identifier of the computation, saved with checkpoints.
+        NOTE: checkpoints saved with another identifier are not loaded.
+        DEFAULT: None
+
+    Returns
+    -------
+    sum : number, array or tuple
+        Sum over frames of function.
+    """
+
+    if processes != None and processes <= 0: processes = None
+    if checkpoint_frames <= 0: checkpoint = None
+
+    times = [int(time) for time in times]
+    done, result = 0, None  # number of frames done and running sum
+    if checkpoint != None:
+        done, result = load_checkpoint(checkpoint, times, key=checkpoint_key)
+
+    def add(result, frame_result, done):
+        # adds result of a frame to running sum and saves checkpoint
+        result = _add(result, frame_result)
+        if checkpoint != None and done % checkpoint_frames == 0:
+            save_checkpoint(checkpoint, times, done, result,
+                key=checkpoint_key)
+        return result
+
+    if processes == 1:  # computation in current process
+        _init_worker(open_trajectories)
+        trajectories = list(_trajectories.values()) # trajectory objects to close
+        try:
+            frames = times[done:]   # frames not done
+            if prefetch != None:
+                frames = Prefetch(frames, prefetch, **_trajectories)    # frames with data read ahead
+                _trajectories.update(frames.trajectories)               # reading trajectory objects through proxies
+            for time in frames:
+                done += 1
+                result = add(result, _call(function, time), done)
+        finally:
+            _init_worker(None)
+            _close(trajectories)
+
+    else:
+        with Pool(processes=processes, initializer=_init_worker,
+            initargs=(open_trajectories, True)) as pool:    # pool of worker processes
+            imap = pool.imap_unordered if checkpoint == None else pool.imap  # results in order of frames with a checkpoint
+            for frame_result in imap(partial(_call, function), times[done:]):
+                done += 1
+                result = add(result, frame_result, done)
+            pool.close()
+            pool.join() # worker processes exit and close their trajectory objects
+
+    if checkpoint != None and os.path.exists(checkpoint):
+        os.remove(checkpoint)
+    return result
+
+def save_checkpoint(checkpoint, times, done, result, key=None):
+    """
+    Saves running sum over frames to checkpoint file.
+
+    The checkpoint is first written to a temporary file which then replaces
+    the checkpoint file, so that an interruption while writing never leaves a
+    corrupted checkpoint.
+
+    Parameters
+    ----------
+    checkpoint : string
+        Checkpoint file name.
+    times : int list
+        Frames over which to sum.
+    done : int
+        Number of first frames of times which are summed.
+    result : *
+        Running sum.
+    key : *
+        Picklable identifier of the computation.
+        DEFAULT: None
+    """
+
+    with open(checkpoint + '.tmp', 'wb') as dump_file:
+        pickle.dump({'times': times, 'key': key, 'done': done,
+            'result': result}, dump_file)
+        dump_file.flush()
+        os.fsync(dump_file.fileno())
+    os.replace(checkpoint + '.tmp', checkpoint)
+
+def load_checkpoint(checkpoint, times, key=None):
+    """
+    Loads running sum over frames from checkpoint file.
+
+    Parameters
+    ----------
+    checkpoint : string
+        Checkpoint file name.
+    times : int list
+        Frames over which to sum.
+    key : *
+        Picklable identifier of the computation.
+        DEFAULT: None
+
+    Returns
+    -------
+    done : int
+        Number of first frames of times which are summed.
+        NOTE: done == 0 if checkpoint file does not exist or was saved for
+              other frames or another identifier.
+    result : *
+        Running sum.
+        NOTE: result == None if done == 0.
+    """
+
+    try:
+        with open(checkpoint, 'rb') as dump_file:
+            state = pickle.load(dump_file)
+    except (OSError, EOFError, pickle.UnpicklingError):
+        return 0, None
+    if state['times'] != times or state.get('key') != key: return 0, None
+    return state['done'], state['result']
+
+def sum_frames_lag_times(function, lag_times, frames, prefetch=None,
+    checkpoint=None, **kwargs):
+    """
+    Returns, for every lag time dt, sum over frames frames(dt) of
+    function(time=time, dt=dt, **trajectory_objects), computed in a single
+    pass over frames. (see active_particles.analysis.parallel.sum_frames)
+
+    Each frame is computed for all lag times for which it is an initial frame
+    at once, so that, for this initial frame, calls of methods of trajectory
+    objects with the same integer positional arguments only (e.g., reads of
+    positions at the initial frame) are performed once. Sums of every lag time
+    are added in the same order as with
+    active_particles.analysis.parallel.sum_frames over frames(dt).
+
+    NOTE: Method calls with keyword or non-integer arguments (e.g.,
+          active_particles.dat.Gsd.to_grid), and calls with the same
+          arguments for different initial frames, are not memoized.
+
+    Parameters
+    ----------
+    function : function
+        Function of frame and lag time, as keyword arguments time and dt, and
+        trajectory objects, as keyword arguments.
+    lag_times : int array-like
+        Lag times.
+    frames : function
+        Function of lag time which returns frames over which to sum.
+    prefetch : function
+        Function of frame and lag time which returns reads of trajectory
+        objects to perform ahead.
+        NOTE: e.g., active_particles.analysis.parallel.pair_reads.
+        NOTE: if prefetch == None, nothing is read ahead.
+        DEFAULT: None
+    checkpoint : string
+        Checkpoint file name.
+        NOTE: checkpoints are identified by lag times.
+        DEFAULT: None
+
+    Optional keyword arguments
+    --------------------------
+    kwargs : *
+        Keyword arguments of active_particles.analysis.parallel.sum_frames.
+
+    Returns
+    -------
+    sums : list
+        Sums over frames of function for every lag time.
+    """
+
+    lag_times = [int(dt) for dt in lag_times]
+    lag_frames = tuple((dt, frozenset(map(int, frames(dt))))
+        for dt in lag_times)                                    # frames of lag times
+    times = sorted(set().union(*(times for _, times in lag_frames)))   # frames over which to sum
+
+    return list(sum_frames(
+        partial(_lag_times_call, function, lag_frames=lag_frames),
+        times, prefetch=None if prefetch == None else partial(
+            _lag_times_reads, prefetch, lag_frames=lag_frames),
+        checkpoint=checkpoint, checkpoint_key=tuple(lag_times), **kwargs))
+
+def _lag_times_call(function, time, lag_frames, **trajectories):
+    """
+    Returns results of function(time=time, dt=dt, **trajectories) for lag
+    times dt for which time is an initial frame, with trajectory objects
+    whose method calls with the same integer positional arguments are
+    performed once. (see active_particles.analysis.parallel._MemoProxy)
+
+    Parameters
+    ----------
+    function : function
+        Function of frame, lag time and trajectory objects.
+    time : int
+        Frame.
+    lag_frames : tuple of (int, frozenset of int)
+        Lag times and their frames.
+
+    Optional keyword arguments
+    --------------------------
+    trajectories : *
+        Trajectory objects.
+
+    Returns
+    -------
+    results : tuple
+        Results of function for every lag time.
+        NOTE: results are None for lag times for which time is not an initial
+              frame.
+    """
+
+    trajectories = {name: _MemoProxy(trajectory)
+        for name, trajectory in trajectories.items()}   # trajectory objects with memoized reads
+    return tuple(function(time=time, dt=dt, **trajectories)
+        if time in times else None for dt, times in lag_frames)
+
+def _lag_times_reads(reads, time, lag_frames):
+    """
+    Returns reads of frame 'time' for all lag times for which it is an initial
+    frame, without duplicates.
+
+    Parameters
+    ----------
+    reads : function
+        Function of frame and lag time which returns list of reads.
+    time : int
+        Frame.
+    lag_frames : tuple of (int, frozenset of int)
+        Lag times and their frames.
+
+    Returns
+    -------
+    reads : list of tuple
+        Reads as (trajectory object name, method name, positional arguments).
+    """
+
+    return list(OrderedDict.fromkeys(read
+        for dt, times in lag_frames if time in times
+        for read in reads(time, dt)))
+
+class _MemoProxy:
+    """
+    Proxy of trajectory object which memoizes results of methods called with
+    integer positional arguments only (e.g., frames and particles).
+
+    NOTE: Methods called with keyword or non-integer arguments are called
+          directly, without memoization.
+    """
+
+    def __init__(self, trajectory):
+        """
+        Parameters
+        ----------
+        trajectory : *
+            Trajectory object.
+        """
+
+        self.trajectory = trajectory
+        self.results = {}   # results of method calls
+
+    def __getattr__(self, name):
+        """
+        Returns attribute 'name' of trajectory object, with results memoized
+        if it is a method.
+        """
+
+        attribute = getattr(self.trajectory, name)
+        if not(callable(attribute)): return attribute
+
+        def method(*args, **kwargs):
+            if kwargs or not(all(isinstance(arg, (int, np.integer))
+                for arg in args)):
+                return attribute(*args, **kwargs)
+            key = (name, tuple(map(int, args)))
+            if not(key in self.results): self.results[key] = attribute(*args)
+            result = self.results[key]
+            return result.copy() if isinstance(result, np.ndarray) else result  # copy of array which could be modified in place
+
+        return method
+
+def _init_worker(open_trajectories, close_at_exit=False):
+    """
+    Sets trajectory objects of process.
+
+    Parameters
+    ----------
+    open_trajectories : function
+        Function which returns hash table of trajectory objects.
+        NOTE: if open_trajectories == None, process has no trajectory objects.
+    close_at_exit : bool
+        Close trajectory objects when process exits.
+        (see multiprocessing.util.Finalize)
+        DEFAULT: False
+    """
+
+    global _trajectories
+    _trajectories = {} if open_trajectories == None else dict(
+        open_trajectories())
+    if close_at_exit:
+        Finalize(None, _close, args=(list(_trajectories.values()),),
+            exitpriority=0)
+
+def _close(trajectories):
+    """
+    Closes trajectory objects which have a close method.
+
+    Parameters
+    ----------
+    trajectories : list
+        Trajectory objects.
+    """
+
+    for trajectory in trajectories:
+        if hasattr(trajectory, 'close'): trajectory.close()
+
+def _call(function, time):
+    """
+    Returns function(time=time, **trajectory_objects) with trajectory objects
+    of process.
+
+    Parameters
+    ----------
+    function : function
+        Function of frame and trajectory objects.
+    time : int
+        Frame.
+
+    Returns
+    -------
+    result : *
+        Result of function.
+    """
+
+    return function(time=int(time), **_trajectories)
+
+def _add(result, frame_result):
+    """
+    Returns sum of running result and result of a frame.
+
+    Parameters
+    ----------
+    result : *
+        Running result.
+        NOTE: if result == None, frame_result is returned.
+    frame_result : *
+        Result of a frame.
+
+    Returns
+    -------
+    result : *
+        Sum of results.
+    """
+
+    if result is None: return frame_result
+    return add_results(result, frame_result)
+
+def pair_reads(time, dt, positions=False, endpoint=False):
+    """
+    Returns reads of frames 'time' and 'time' + dt: displacements of
+    trajectory object 'u_traj' and, optionally, wrapped positions of
+    trajectory object 'w_traj'.
+    (see active_particles.analysis.parallel.Prefetch)
+
+    NOTE: Reads have to match calls of the function computed for each frame,
+          with the same positional arguments and no keyword arguments, for
+          their results to be used. Positions read internally by methods of
+          trajectory objects (e.g., active_particles.dat.Gsd.to_grid) are not
+          read ahead.
+
+    Parameters
+    ----------
+    time : int
+        Initial frame.
+    dt : int
+        Lag time.
+    positions : bool
+        Read wrapped positions, at frame 'time' + dt*endpoint.
+        DEFAULT: False
+    endpoint : bool
+        Read wrapped positions at frame 'time' + dt rather than 'time'.
+        DEFAULT: False
+
+    Returns
+    -------
+    reads : list of tuple
+        Reads as (trajectory object name, method name, positional arguments).
+    """
+
+    time, dt = int(time), int(dt)
+    return [('u_traj', 'displacement', (time, time + dt))] + (
+        [('w_traj', 'position', (time + dt*bool(endpoint),))] if positions
+        else [])
+
+class Prefetch:
+    """
+    Iterates over items (e.g., frames) while a background thread performs
+    reads of trajectory objects for upcoming items, so that reads from disk
+    overlap with computations on the current item.
+
+    Trajectory objects are replaced by proxies (self.trajectories, also
+    accessible as attributes of this object) whose methods, when called for
+    the current item with the same positional arguments as a read performed
+    ahead, return its result, and are otherwise called on the trajectory
+    object. Calls to trajectory objects are serialised by a lock, and reads
+    ahead of trajectory objects which cache data (e.g.,
+    active_particles.dat.Gsd) also warm their caches.
+
+    At most self.frames items are read ahead, and reads ahead are held while
+    their memory exceeds self.memory bytes, unless no item is read ahead.
+
+    Exceptions raised on the background thread (e.g., by the reads function)
+    are re-raised when the item for which they were raised is reached.
+    """
+
+    def __init__(self, items, reads, frames=_prefetch_frames,
+        memory=_prefetch_memory, **trajectories):
+        """
+        Parameters
+        ----------
+        items : iterable
+            Items over which to iterate.
+        reads : function
+            Function of item which returns list of reads as (trajectory object
+            name, method name, positional arguments).
+            NOTE: Reads of trajectory objects which are not given are ignored.
+        frames : int
+            Maximum number of items read ahead.
+            DEFAULT: active_particles.analysis.parallel._prefetch_frames
+        memory : int
+            Maximum memory in bytes of data read ahead.
+            DEFAULT: active_particles.analysis.parallel._prefetch_memory
+
+        Optional keyword arguments
+        --------------------------
+        trajectories : *
+            Trajectory objects.
+        """
+
+        self.items = items
+        self.reads = reads
+        self.frames = max(1, frames)
+        self.memory = memory
+
+        self.lock = threading.Lock()            # lock serialising calls to trajectory objects
+        self.condition = threading.Condition()  # condition on queue of data read ahead
+        self.queue = deque()                    # data read ahead and their memory in bytes, in order of items
+        self.nbytes = 0                         # memory in bytes of data read ahead
+        self.stop = None                        # event stopping reads ahead of current iteration
+        self.error = None                       # exception raised on background thread
+
+        self.trajectories = {name: _PrefetchProxy(trajectory, self.lock)
+            for name, trajectory in trajectories.items()}   # proxies of trajectory objects
+
+    def __getattr__(self, name):
+        """
+        Returns proxy of trajectory object 'name'.
+        """
+
+        try:
+            return self.__dict__['trajectories'][name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def __iter__(self):
+        """
+        Yields items, with results of their reads made available to proxies
+        of trajectory objects.
+        """
+
+        items = list(self.items)
+        stop = threading.Event()    # stop reading ahead for this iteration
+        with self.condition:
+            self.stop = stop
+            self.error = None
+        thread = threading.Thread(target=self.read_ahead, args=(items, stop),
+            daemon=True)
+        thread.start()
+
+        completed = False   # all items yielded
+        try:
+            for item in items:
+                with self.condition:
+                    while not(self.queue) and self.error is None:
+                        self.condition.wait()
+                    if not(self.queue): raise self.error
+                    data, nbytes = self.queue.popleft()
+                    self.nbytes -= nbytes
+                    self.condition.notify_all()
+                for name, proxy in self.trajectories.items():
+                    proxy.current = data.get(name, {})
+                yield item
+            completed = True
+        finally:
+            with self.condition:
+                stop.set()
+                self.condition.notify_all()
+                self.queue.clear()
+                self.nbytes = 0
+            for proxy in self.trajectories.values(): proxy.current = {}
+            if completed: thread.join() # otherwise the thread, which could be blocked in a read, stops by itself after its current read
+
+    def read_ahead(self, items, stop):
+        """
+        Performs reads of items and queues their results, waiting while too
+        many items or too much data are queued.
+
+        NOTE: Failed reads are not queued, so that they are performed again
+              when called for the current item.
+        NOTE: Any other exception stops reading ahead and is kept in
+              self.error, to be re-raised by self.__iter__.
+
+        Parameters
+        ----------
+        items : list
+            Items.
+        stop : threading.Event
+            Event set when reading ahead has to stop.
+        """
+
+        try:
+            for item in items:
+                data, nbytes = {}, 0    # results of reads by trajectory object and method call, and their memory in bytes
+                for name, method, args in self.reads(item):
+                    if stop.is_set(): return
+                    if not(name in self.trajectories): continue
+                    proxy = self.trajectories[name]
+                    try:
+                        with self.lock:
+                            result = getattr(proxy.trajectory, method)(*args)
+                    except Exception: continue
+                    data.setdefault(name, {})[_read_key(method, args)] = result
+                    nbytes += np.asarray(result).nbytes
+
+                with self.condition:
+                    while not(stop.is_set()) and self.queue and (
+                        len(self.queue) >= self.frames
+                        or self.nbytes + nbytes > self.memory):
+                        self.condition.wait()
+                    if stop.is_set(): return
+                    self.queue.append((data, nbytes))
+                    self.nbytes += nbytes
+                    self.condition.notify_all()
+        except BaseException as error:
+            with self.condition:
+                if not(stop.is_set()): self.error = error
+                self.condition.notify_all()
+
+class _PrefetchProxy:
+    """
+    Proxy of trajectory object, whose methods return results read ahead for
+    the current item. (see active_particles.analysis.parallel.Prefetch)
+    """
+
+    def __init__(self, trajectory, lock):
+        """
+        Parameters
+        ----------
+        trajectory : *
+            Trajectory object.
+        lock : threading.Lock
+            Lock serialising calls to trajectory object.
+        """
+
+        self.trajectory = trajectory
+        self.lock = lock
+        self.current = {}   # results of reads of current item, by method call
+
+    def __getattr__(self, name):
+        """
+        Returns attribute of trajectory object, with methods returning
+        results read ahead if they exist.
+
+        NOTE: Results read ahead are returned once.
+        """
+
+        attribute = getattr(self.__dict__['trajectory'], name)
+        if not(callable(attribute)): return attribute
+
+        def method(*args, **kwargs):
+            if not(kwargs):
+                key = _read_key(name, args)
+                if key in self.current: return self.current.pop(key)
+            with self.lock:
+                return attribute(*args, **kwargs)
+        return method
+
+def _read_key(method, args):
+    """
+    Returns hashable key of method call.
+
+    Parameters
+    ----------
+    method : string
+        Method name.
+    args : tuple
+        Positional arguments.
+
+    Returns
+    -------
+    key : tuple
+        Method name and arguments, with arrays and ranges converted to tuples.
+    """
+
+    return (method,) + tuple(
+        tuple(np.ravel(arg).tolist()) if isinstance(arg, (np.ndarray, range))
+        else int(arg) if isinstance(arg, np.integer) else arg
+        for arg in args)
@@ -68,7 +68,7 @@ PAD : float
 
 import active_particles.naming as naming
 
-from active_particles.init import get_env
+from active_particles.init import get_env, lazy_import
 from active_particles.dat import Gsd
 from active_particles.maths import Histogram
 
@@ -83,11 +83,12 @@ import pickle
 
 import numpy as np
 
-import matplotlib.colors as colors
-import matplotlib.cm as cmx
-import matplotlib as mpl
-from mpl_toolkits.axes_grid1 import make_axes_locatable
-import matplotlib.pyplot as plt
+colors = lazy_import('matplotlib.colors')
+cmx = lazy_import('matplotlib.cm')
+mpl = lazy_import('matplotlib')
+make_axes_locatable = lazy_import('mpl_toolkits.axes_grid1',
+    'make_axes_locatable')
+plt = lazy_import('matplotlib.pyplot')
 
 from collections import OrderedDict
 
@@ -0,0 +1,339 @@
+"""
+Module strain defines the object AtomicStrain, which fits the local affine
+deformation of the neighbourhood of every particle between a reference
+configuration and current configurations, following Falk and Langer, Phys.
+Rev. E 57, 7192 (1998), as OVITO's atomic strain modifier does (see
+https://ovito.org/manual/particles.modifiers.atomic_strain.html).
+
+Neighbours are found once in the reference configuration, so that the same
+object computes nonaffine squared displacements and strain tensors for any
+number of current configurations.
+
+Periodic boxes can be sheared, i.e. triclinic, with box vectors (Lx, 0) and
+(xy*Ly, Ly) as in HOOMD-blue, and are then described by (Lx, Ly, xy).
+(see active_particles.dat.Gsd.box)
+"""
+
+import numpy as np
+
+from active_particles.init import lazy_import
+from active_particles.analysis.neighbours import wrap
+
+cKDTree = lazy_import('scipy.spatial', 'cKDTree')
+
+# DEFAULT VARIABLES
+
+_r_cut = 3          # default cut-off radius for neighbours in the reference configuration (OVITO's default)
+_det_min = 1e-12    # minimum determinant of reference neighbourhood matrices for valid fits
+
+class AtomicStrain:
+    """
+    For every particle i with reference neighbours j within r_cut, the
+    deformation gradient F_i is the linear map which best maps, in the least
+    squares sense, reference separations d0_ij onto current separations d_ij
+        F_i = (sum_j d_ij d0_ij^T) (sum_j d0_ij d0_ij^T)^{-1},
+    the nonaffine squared displacement is
+        D2min_i = sum_j |d_ij - F_i d0_ij|^2,
+    and the Green-Lagrangian strain tensor is
+        E_i = (F_i^T F_i - 1)/2.
+
+    Separations are computed with the minimum image convention in the
+    reference and current, possibly triclinic, boxes, and sums over
+    neighbours are computed for all particles at once from the list of
+    neighbouring pairs, sorted by first particle.
+
+    Particles for which the fit is not possible (singular reference
+    neighbourhood matrix, e.g. with less than 2 neighbours) are flagged as
+    invalid in self.valid, and their nonaffine squared displacement and
+    strain tensor are set to 0, as in OVITO.
+    """
+
+    def __init__(self, positions, box_size, r_cut=_r_cut):
+        """
+        Finds neighbouring pairs and computes reference neighbourhood
+        matrices.
+
+        Parameters
+        ----------
+        positions : (N, 2) array-like
+            Reference positions.
+        box_size : float or (3,) float array-like
+            Length of the square periodic box, or lengths Lx, Ly and tilt
+            factor xy of the triclinic periodic box, in the reference
+            configuration.
+        r_cut : float
+            Cut-off radius for neighbours.
+            DEFAULT: active_particles.analysis.strain._r_cut
+        """
+
+        positions = np.array(positions, dtype=float)[:, :2]
+        self.N = len(positions)     # number of particles
+        self.r_cut = r_cut
+
+        i, j = neighbouring_pairs(positions, box_size, r_cut)  # pairs of particles within r_cut
+        order = np.argsort(i, kind='stable')
+        self.i, self.j = i[order], j[order]     # neighbouring pairs sorted by first particle
+        self.starts = np.searchsorted(self.i, np.arange(self.N))   # offsets of particles in pairs
+        self.has_neighbours = np.bincount(self.i, minlength=self.N) > 0
+
+        self.d0 = self.separations(positions, box_size) # reference separations
+        V = self.sum_pairs(
+            self.d0[:, :, np.newaxis]*self.d0[:, np.newaxis, :], axis=0)   # reference neighbourhood matrices
+        self.valid = np.abs(np.linalg.det(V)) > _det_min    # particles with valid fit
+        V[~self.valid] = np.identity(2)
+        self.Vinv = np.linalg.inv(V)    # inverse reference neighbourhood matrices
+
+    def separations(self, positions, box_size):
+        """
+        Returns separations between neighbouring pairs of particles, with the
+        minimum image convention.
+
+        Parameters
+        ----------
+        positions : (*, N, 2) array-like
+            Positions.
+        box_size : float or (3,) float array-like
+            Length of the square periodic box, or lengths Lx, Ly and tilt
+            factor xy of the triclinic periodic box.
+
+        Returns
+        -------
+        d : (*, number of pairs, 2) float Numpy array
+            Separations.
+        """
+
+        positions = np.asarray(positions)[..., :2]
+        return minimum_image(
+            positions[..., self.j, :] - positions[..., self.i, :], box_size)
+
+    def sum_pairs(self, values, axis=-1):
+        """
+        Returns sums over neighbours of values of pairs, for every particle.
+
+        Parameters
+        ----------
+        values : array-like
+            Values of pairs.
+        axis : int
+            Axis of pairs in values.
+            DEFAULT: -1
+
+        Returns
+        -------
+        sums : float Numpy array
+            Sums over neighbours, with axis of pairs replaced by axis of
+            particles.
+        """
+
+        values = np.moveaxis(np.asarray(values, dtype=float), axis, 0)
+        sums = np.zeros((self.N,) + values.shape[1:])
+        if len(self.i) > 0:
+            sums[self.has_neighbours] = np.add.reduceat(values,
+                self.starts[self.has_neighbours], axis=0)
+        return np.moveaxis(sums, 0, axis)
+
+    def deformation_gradient(self, positions, box_size):
+        """
+        Returns deformation gradients of particles' neighbourhoods, and
+        current separations.
+
+        Parameters
+        ----------
+        positions : (*, N, 2) array-like
+            Current positions.
+        box_size : float or (3,) float array-like
+            Length of the square periodic box, or lengths Lx, Ly and tilt
+            factor xy of the triclinic periodic box, in the current
+            configuration.
+
+        Returns
+        -------
+        F : (*, N, 2, 2) float Numpy array
+            Deformation gradients.
+        d : (*, number of pairs, 2) float Numpy array
+            Current separations.
+        """
+
+        d = self.separations(positions, box_size)
+        W = self.sum_pairs(
+            d[..., :, :, np.newaxis]*self.d0[:, np.newaxis, :], axis=-3)
+        return np.matmul(W, self.Vinv), d
+
+    def d2min(self, positions, box_size):
+        """
+        Returns nonaffine squared displacements.
+
+        Parameters
+        ----------
+        positions : (*, N, 2) array-like
+            Current positions.
+        box_size : float or (3,) float array-like
+            Length of the square periodic box, or lengths Lx, Ly and tilt
+            factor xy of the triclinic periodic box, in the current
+            configuration.
+
+        Returns
+        -------
+        d2min : (*, N) float Numpy array
+            Nonaffine squared displacements.
+        """
+
+        F, d = self.deformation_gradient(positions, box_size)
+        residuals = d - np.einsum('...pab,pb->...pa', F[..., self.i, :, :],
+            self.d0)    # separations not accounted for by affine deformation
+        return self.sum_pairs(np.sum(residuals**2, axis=-1))*self.valid
+
+    def strain_tensor(self, positions, box_size):
+        """
+        Returns Green-Lagrangian strain tensors, with components ordered as in
+        OVITO: XX, YY, ZZ, XY, XZ, YZ.
+
+        Parameters
+        ----------
+        positions : (*, N, 2) array-like
+            Current positions.
+        box_size : float or (3,) float array-like
+            Length of the square periodic box, or lengths Lx, Ly and tilt
+            factor xy of the triclinic periodic box, in the current
+            configuration.
+
+        Returns
+        -------
+        strain : (*, N, 6) float Numpy array
+            Strain tensors.
+        """
+
+        F, _ = self.deformation_gradient(positions, box_size)
+        E = (np.matmul(np.swapaxes(F, -1, -2), F) - np.identity(2))/2
+        strain = np.zeros(E.shape[:-2] + (6,))
+        strain[..., 0] = E[..., 0, 0]
+        strain[..., 1] = E[..., 1, 1]
+        strain[..., 3] = E[..., 0, 1]
+        return strain*self.valid[:, np.newaxis]
+
+    def shear_strain(self, positions, box_size):
+        """
+        Returns von Mises shear strains, computed in two dimensions as in
+        OVITO, sqrt(E_XY^2 + (E_XX - E_YY)^2/2).
+
+        Parameters
+        ----------
+        positions : (*, N, 2) array-like
+            Current positions.
+        box_size : float or (3,) float array-like
+            Length of the square periodic box, or lengths Lx, Ly and tilt
+            factor xy of the triclinic periodic box, in the current
+            configuration.
+
+        Returns
+        -------
+        shear_strain : (*, N) float Numpy array
+            Shear strains.
+        """
+
+        strain = self.strain_tensor(positions, box_size)
+        return np.sqrt(strain[..., 3]**2
+            + ((strain[..., 0] - strain[..., 1])**2)/2)
+
+def box_lengths(box_size):
+    """
+    Returns lengths and tilt factor of periodic box.
+
+    Parameters
+    ----------
+    box_size : float or (3,) float array-like
+        Length of the square periodic box, or lengths Lx, Ly and tilt factor
+        xy of the triclinic periodic box.
+
+    Returns
+    -------
+    Lx, Ly, xy : float
+        Lengths and tilt factor of the box.
+    """
+
+    box_size = np.array(box_size, dtype=float, ndmin=1).flatten()
+    if box_size.size == 1: return box_size[0], box_size[0], 0.
+    return box_size[0], box_size[1], box_size[2]
+
+def minimum_image(d, box_size):
+    """
+    Returns separations with the minimum image convention.
+
+    In triclinic boxes, the image along the second box vector is corrected
+    first, shifting separations along x by xy*Ly per image, then the image
+    along x, as OVITO does in reduced coordinates.
+
+    Parameters
+    ----------
+    d : (*, 2) array-like
+        Separations.
+    box_size : float or (3,) float array-like
+        Length of the square periodic box, or lengths Lx, Ly and tilt factor
+        xy of the triclinic periodic box.
+
+    Returns
+    -------
+    d : (*, 2) float Numpy array
+        Separations with the minimum image convention.
+    """
+
+    Lx, Ly, xy = box_lengths(box_size)
+    d = np.array(d, dtype=float)
+    images = np.round(d[..., 1]/Ly) # images along second box vector
+    d[..., 0] -= xy*Ly*images
+    d[..., 1] -= Ly*images
+    d[..., 0] -= Lx*np.round(d[..., 0]/Lx)
+    return d
+
+def neighbouring_pairs(positions, box_size, r_cut):
+    """
+    Returns pairs of particles within r_cut of each other in periodic box,
+    both ways.
+
+    In triclinic boxes, positions are wrapped in the rectangle
+    [0, Lx[ x [0, Ly[, which tiles the plane with the images of the box, and
+    neighbours are searched among images of particles within r_cut of this
+    rectangle, since scipy.spatial.cKDTree only handles rectangular periodic
+    boxes.
+
+    Parameters
+    ----------
+    positions : (N, 2) float array-like
+        Positions.
+    box_size : float or (3,) float array-like
+        Length of the square periodic box, or lengths Lx, Ly and tilt factor
+        xy of the triclinic periodic box.
+    r_cut : float
+        Cut-off radius.
+
+    Returns
+    -------
+    i, j : int Numpy array
+        Indexes of first and second particles of pairs.
+    """
+
+    Lx, Ly, xy = box_lengths(box_size)
+    positions = np.array(positions, dtype=float)[:, :2]
+
+    if xy == 0: # rectangular box
+        pairs = cKDTree(wrap(positions, (Lx, Ly)), boxsize=(Lx, Ly)
+            ).query_pairs(r_cut, output_type='ndarray')    # pairs of particles within r_cut
+        return (np.concatenate((pairs[:, 0], pairs[:, 1])),
+            np.concatenate((pairs[:, 1], pairs[:, 0])))
+
+    images = np.floor(positions[:, 1]/Ly)   # images along second box vector
+    positions[:, 0] -= xy*Ly*images
+    positions[:, 1] -= Ly*images
+    positions[:, 0] = wrap(positions[:, 0], Lx)     # positions in [0, Lx[ x [0, Ly[
+
+    shifts = np.array([(n_x*Lx + (n_y*xy*Ly)%Lx, n_y*Ly)
+        for n_x in range(-2, 3) for n_y in range(-1, 2)])  # translations of images
+    ghosts = (positions[np.newaxis] + shifts[:, np.newaxis]).reshape((-1, 2))  # images of particles
+    index = np.tile(np.arange(len(positions)), len(shifts))                 # indexes of particles of images
+    near = ((ghosts >= -r_cut)*(ghosts <= (Lx + r_cut, Ly + r_cut))).all(axis=-1)   # images within r_cut of rectangle
+
+    pairs = cKDTree(positions).sparse_distance_matrix(cKDTree(ghosts[near]),
+        r_cut, output_type='ndarray')  # pairs of particles and images within r_cut
+    i, j = pairs['i'], index[near][pairs['j']]
+    keys = np.unique((i*len(positions) + j)[i != j])   # pairs without duplicates
+    return keys//len(positions), keys%len(positions)
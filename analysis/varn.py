@@ -100,9 +100,11 @@ standard in DATA_DIRECTORY.
 
 import active_particles.naming as naming
 
-from active_particles.init import get_env, slurm_output
+from active_particles.init import get_env, slurm_output, lazy_import,\
+	mpl_backend
 from active_particles.dat import Gsd
 from active_particles.maths import Histogram
+from active_particles.analysis.parallel import Prefetch
 
 from os import getcwd
 from os import environ as envvar
@@ -118,13 +120,12 @@ from collections import OrderedDict
 
 from datetime import datetime
 
-import matplotlib as mpl
-if not(get_env('SHOW', default=False, vartype=bool)):
-	mpl.use('Agg')	# avoids crash if launching without display
-import matplotlib.pyplot as plt
-import matplotlib.colors as colors
-import matplotlib.cm as cmx
-from mpl_toolkits.axes_grid1 import make_axes_locatable
+mpl = lazy_import('matplotlib')
+plt = lazy_import('matplotlib.pyplot', before_import=mpl_backend)	# avoids crash if launching without display
+colors = lazy_import('matplotlib.colors')
+cmx = lazy_import('matplotlib.cm')
+make_axes_locatable = lazy_import('mpl_toolkits.axes_grid1',
+	'make_axes_locatable')
 
 # DEFAULT VARIABLES
 
@@ -299,7 +300,7 @@ class PlotTime:
 
 	def __init__(self, Nbins, phimax,
 		pphilocmin=_pphilocmin, pphilocmax=_pphilocmax, contours=_contours,
-		colormap=plt.cm.inferno, pad=20, suptitle=True):
+		colormap='inferno', pad=20, suptitle=True):
 		"""
 		Set figure and histogram parameters.
 
@@ -318,8 +319,8 @@ class PlotTime:
 		contours : int
 			Number of contour lines.
 			(default: active_particles.analysis.varn._contours)
-		colormap : matplotlib colormap
-			Histogram colormap. (default: matplotlib.pyplot.cm.inferno)
+		colormap : matplotlib colormap or string
+			Histogram colormap. (default: 'inferno')
 		pad : float
 			Separation between label and colormap. (default: 20)
 		suptitle : bool
@@ -453,10 +454,15 @@ if __name__ == '__main__':  # executing as script
         with open(wrap_file_name, 'rb') as wrap_file:   # opens wrapped trajectory file
 
             w_traj = Gsd(wrap_file, prep_frames=prep_frames)    # wrapped trajectory object
+            prefetch = Prefetch(frames,
+                lambda frame: [('w_traj', 'position', (frame,)),
+                    ('w_traj', 'diameter', (frame,))],
+                w_traj=w_traj)  # frames with positions and diameters read ahead
 
             densities = list(map(
-                lambda frame: density(w_traj, frame, Ncases, box_size),
-                frames))    # density lists at frames
+                lambda frame: density(prefetch.w_traj, frame, Ncases,
+                    box_size),
+                prefetch))  # density lists at frames
 
         # SAVING
 
@@ -1,21 +1,34 @@
 """
 Module dat defines the object Dat, which allows one to write to and read from
-.dat files.
+.dat files, the object Gsd, which reads .gsd files, the object GsdUnwrapped,
+which reads unwrapped trajectories from .gsd files, and the object Store, which
+reads chunked HDF5 or Zarr trajectory stores.
 """
 
 import numpy as np
 import struct
+import os
+import warnings
 from operator import itemgetter
+from collections import OrderedDict
 
 from active_particles.maths import relative_positions, GridFFT
+from active_particles.analysis.strain import AtomicStrain, _r_cut
 
 from gsd.pygsd import GSDFile
 from gsd.hoomd import HOOMDTrajectory
 
-from ovito.io import import_file as ovito_import_file
-from ovito.modifiers import AtomicStrainModifier
-from PyQt5.QtWidgets import QApplication
-qapp = QApplication([])	# creation of a QApplication to avoid crash when using matplotlib after OVITO import
+_dat_magic = b'\x89APDAT\r\n'		# first bytes of .dat files with header
+_dat_version = 2					# default version of written .dat files
+_dat_header_format = '<8sHHHHQ8sQQQ8x'	# packing format of .dat files header
+_dat_header_size = struct.calcsize(_dat_header_format)	# size in bytes of .dat files header
+_dat_compressions = [None, 'zlib', 'zstd', 'blosc']	# compression codecs of .dat files, indexed by their header code
+_chunk_frames = 100	# default number of frames per compressed chunk
+
+_cache_memory = 2**28	# default maximum memory in bytes of decoded snapshots cached by Gsd objects
+
+_store_frame_chunk = 10			# default number of frames per chunk of trajectory stores
+_store_particle_chunk = 10000	# default number of particles per chunk of trajectory stores
 
 class Dat:
 	"""
@@ -26,9 +39,48 @@ class Dat:
 	|           POSITIONS             |           VELOCITIES            | ...
 	| PARTICLE 0 | ... | PARTICLE N-1 | PARTICLE 0 | ... | PARTICLE N-1 | ...
 	|   x  |  y  | ... |   x   |  y   |   x  |  y  | ... |   x   |  y   | ...
+
+	Since version 2, frames are preceded by a header of
+	active_particles.dat._dat_header_size bytes, packed according to
+	active_particles.dat._dat_header_format:
+	| MAGIC | VERSION | DIMENSIONS | VARIABLES | COMPRESSION | N | DTYPE |
+	| FRAMES | INDEX | SEGMENTS |
+	where MAGIC is active_particles.dat._dat_magic, COMPRESSION is the index
+	of the compression codec in active_particles.dat._dat_compressions, DTYPE
+	is the Numpy data type string of elements, FRAMES is the number of frames
+	written in the file, INDEX is the offset in bytes of the index of
+	compressed files, and SEGMENTS is the offset in bytes of the array of unsigned 64-bit first
+	frames of segments, i.e. of frames written by successive
+	active_particles.dat.Dat objects (0 if there is no index or no segments).
+	Segments and then index are written after the last frame.
+	Frames of uncompressed files are at offsets HEADER SIZE + FRAME*FRAME SIZE,
+	so that these files have no index.
+	NOTE: Uncompressed files whose INDEX is not 0 have a frame index, an array
+	      of FRAMES unsigned 64-bit offsets in bytes of frames, which is read
+	      but never written.
+	Files without header (version 1) are read unchanged.
+
+	Frames are appended to files with header by overwriting segments and
+	index, after the header has been rewritten without them, and the header
+	is updated once frames, segments and index have been written, so that a
+	writing interrupted at any point leaves a readable file, whose incomplete
+	trailing frames are ignored and can be truncated.
+	(see active_particles.dat.Dat.truncate)
+
+	Compressed files are made of chunks of frames, each of them compressed
+	independently so that frames can be accessed randomly. Within a chunk,
+	frames are delta-encoded against the previous frame on the integer
+	representation of their elements, which is lossless, and bytes of
+	elements are shuffled before compression. The index of compressed files
+	is an array of (offset in bytes, first frame) unsigned 64-bit pairs for
+	all chunks.
+	NOTE: Chunks are appended to compressed files by overwriting segments and
+	      index, so that an interrupted writing leaves a compressed file
+	      unreadable.
 	"""
 
-	def __init__(self, data_file, N, element_type='d'):
+	def __init__(self, data_file, N, element_type='d', memory_map=None,
+		buffer_frames=1, version=None, compression=None, chunk_frames=_chunk_frames, read_type='d', resume=False):
 		"""
 		Parameters
 		----------
@@ -38,35 +90,479 @@ class Dat:
 			open data_file in 'r+b' mode.
 		N : int
 			Number of particles.
+			NOTE: if N == None, the number of particles is read from the
+			      header of the file.
 		element_type : packing format
 			Data packing format. (default: double float)
+			NOTE: For files with header, data packing format is read from the
+			      header of the file.
+		memory_map : bool or None
+			Read data through a Numpy memory-map of the file. (see
+			numpy.memmap)
+			NOTE: if memory_map == None, the file is memory-mapped if it has
+			      been opened in 'rb' mode.
+			DEFAULT: None
+		buffer_frames : int
+			Number of frames to hold in memory before writing them to file
+			with active_particles.dat.Dat.dump. (default: 1)
+			NOTE: Remaining buffered frames are written to file with
+			      active_particles.dat.Dat.flush, which is called when exiting
+			      a with statement block.
+		version : int or None
+			Version of .dat file format.
+			NOTE: if version == None, the version of non-empty files is
+			      detected from their first bytes, and empty files are
+			      written with version active_particles.dat._dat_version.
+			DEFAULT: None
+		compression : string or None
+			Compression codec of new files: 'zlib', 'zstd' (requires
+			zstandard package) or 'blosc' (requires blosc package).
+			NOTE: For existing files, compression is read from the header of
+			      the file.
+			NOTE: Compressed files cannot be memory-mapped.
+			DEFAULT: None
+		chunk_frames : int
+			Number of frames per compressed chunk when writing a compressed
+			file.
+			NOTE: Frames are buffered until a chunk is complete.
+			DEFAULT: active_particles.dat._chunk_frames
+		read_type : packing format or None
+			Data type of arrays returned by reading methods.
+			NOTE: if read_type == None, arrays are returned with the data type
+			      of the file.
+			DEFAULT: double float
+		resume : bool
+			Truncate incomplete trailing frames of existing file, so that
+			dumped frames are appended after its last complete frame.
+			(see active_particles.dat.Dat.truncate)
+			NOTE: data_file has to be open in 'r+b' mode.
+			DEFAULT: False
 		"""
 
-		self.file = data_file									# .dat file
+		self.file = data_file	# .dat file
+
+		self.header_size = 0	# size in bytes of the header
+		self.frames = None		# number of frames in file
+		self.index = None		# offsets in bytes of frames in file
+		self.index_offset = 0	# offset in bytes of frame index in file
+		self.segments = np.zeros(0, dtype=int)	# first frames of segments
+		self.segments_offset = 0				# offset in bytes of segments in file
+		self.segment_start = None				# first frame written by this object
+		self.compression = compression	# compression codec
+		self.chunks = np.zeros((0, 2), dtype=int)	# offsets in bytes and first frames of compressed chunks
+		self.chunk_cache = (None, None)			# last decompressed chunk index and frames
+
+		size = os.fstat(self.file.fileno()).st_size	# size of the file in bytes
+		if size > 0 and getattr(self.file, 'readable', lambda: True)():	# existing file
+			self.file.seek(0)
+			detected_version = 2 if self.file.read(len(_dat_magic))\
+				== _dat_magic else 1	# version of the file
+			if version != None and version != detected_version:
+				raise ValueError('File has .dat version %i.' % detected_version)
+			self.version = detected_version
+			if self.version > 1:
+				header_N, element_type = self.read_header()
+				if N != None and int(N) != header_N: raise ValueError(
+					'File has %i particles.' % header_N)
+				N = header_N
+		else:																# new file
+			self.version = _dat_version if version == None else version
+			if self.compression != None and self.version < 2:
+				raise ValueError('Compression requires .dat version 2.')
+			_dat_compressions.index(self.compression)	# check compression codec exists
+
+		if N == None: raise ValueError('Number of particles is required.')
 		self.N = int(N)											# number of particles
-		self.element_type = element_type						# data picking format
-		self.bytes_per_element = struct.calcsize(element_type)	# element_type number of bytes
+		self.element_type = np.dtype(element_type).char			# data picking format
+		self.bytes_per_element = struct.calcsize(self.element_type)	# element_type number of bytes
 		self.inc_var = {'position':0, 'velocity':2*self.N}		# increment in bytes_per_element to accesss variable
 
+		self.dtype = np.dtype(element_type)						# Numpy data type corresponding to element_type
+		self.bytes_per_frame = 4*self.N*self.bytes_per_element	# number of bytes per frame
+		self.index_var = {'position':0, 'velocity':1}			# index of variable in frame
+
+		self.buffer_frames = max(1, int(buffer_frames))	# number of frames to buffer before writing to file
+		if self.compression != None: self.buffer_frames = max(1, int(chunk_frames))
+		self.buffer = []								# buffered frames
+
+		self.read_dtype = None if read_type == None else np.dtype(read_type)	# data type of read arrays
+
+		if self.version > 1:
+			self.header_size = _dat_header_size
+			if size == 0: self.write_header()		# new file with header
+			else: self.frames = self.count_frames()	# check frame count against file size
+
+		if memory_map == None:
+			memory_map = getattr(self.file, 'mode', None) == 'rb'	# memory-map files opened in read-only mode
+		self.memory_map = memory_map and self.compression == None
+		if self.memory_map: self.map()
+
+		if resume: self.truncate()
+
+	def read_header(self):
+		"""
+		Reads header of .dat file with version > 1, and sets self.frames,
+		self.index_offset, self.index, self.segments_offset and self.segments
+		accordingly.
+
+		Returns
+		-------
+		N : int
+			Number of particles.
+		element_type : Numpy data type
+			Data type of elements.
+		"""
+
+		self.file.seek(0)
+		(magic, version, dimensions, variables, compression, N, dtype,
+			self.frames, self.index_offset, self.segments_offset) =\
+			struct.unpack(_dat_header_format, self.file.read(_dat_header_size))
+		if dimensions != 2 or variables != 2: raise ValueError(
+			'Only 2 variables in 2 dimensions are supported.')
+		self.compression = _dat_compressions[compression]
+
+		if self.segments_offset > 0:	# file with segments
+			segments_end = self.index_offset\
+				if self.index_offset > self.segments_offset\
+				else os.fstat(self.file.fileno()).st_size	# end of segments in file
+			self.file.seek(self.segments_offset)
+			self.segments = np.frombuffer(self.file.read(
+				8*max(0, (segments_end - self.segments_offset)//8)),
+				dtype='<u8').astype(int)
+
+		if self.compression != None:	# file with chunks index
+			self.file.seek(self.index_offset)
+			self.chunks = np.reshape(np.frombuffer(self.file.read(),
+				dtype='<u8').astype(int), (-1, 2))
+		elif self.index_offset > 0:		# file with frame index
+			self.file.seek(self.index_offset)
+			self.index = np.frombuffer(self.file.read(8*self.frames),
+				dtype='<u8').astype(int)
+
+		return N, np.dtype(dtype.rstrip(b'\x00').decode())
+
+	def write_header(self):
+		"""
+		Writes header of .dat file with version > 1, with current number of
+		frames, frame index offset and segments offset.
+		"""
+
+		if self.frames == None: self.frames = 0
+
+		self.file.seek(0)
+		self.file.write(struct.pack(_dat_header_format, _dat_magic,
+			self.version, 2, 2, _dat_compressions.index(self.compression),
+			self.N, self.dtype.str.encode(), self.frames, self.index_offset,
+			self.segments_offset))
+
+	def write_metadata(self):
+		"""
+		Writes segments, and chunks index for compressed files, at current
+		position of file, which is then truncated, and updates header.
+		"""
+
+		self.segments = np.concatenate(([0],
+			self.segments[(self.segments > 0)
+				*(self.segments < self.segment_start)],
+			[self.segment_start] if self.segment_start > 0 else [])
+			).astype(int)	# segments before and from first frame written by this object
+
+		self.segments_offset = self.file.tell()
+		self.file.write(self.segments.astype('<u8').tobytes())	# write segments
+
+		if self.compression != None:
+			self.index_offset = self.file.tell()
+			self.file.write(self.chunks.astype('<u8').tobytes())	# write chunks index
+		else: self.index = None	# frame index overwritten by frames
+
+		self.file.truncate()	# remove stale data after metadata
+		self.write_header()
+		self.file.seek(0, os.SEEK_END)
+
+	def end_offset(self):
+		"""
+		Returns offset in bytes of the end of the last frame, or of the last
+		chunk of compressed files, in file with header.
+
+		Returns
+		-------
+		offset : int
+			Offset in bytes.
+		"""
+
+		if self.compression == None:
+			return self.header_size + self.frames*self.bytes_per_frame
+		if len(self.chunks) == 0: return self.header_size
+		return min(offset for offset in (self.segments_offset, self.index_offset)
+			if offset > 0)
+
+	def truncate(self, frames=None):
+		"""
+		Truncates file after its last complete frame and the following
+		segments and index, removing incomplete trailing frames left by an
+		interrupted writing, and sets file's current position at its end, so
+		that dumped frames are appended after the last complete frame.
+
+		NOTE: self.file has to be open in 'r+b' mode.
+
+		Parameters
+		----------
+		frames : int or None
+			Maximum number of frames to keep.
+			NOTE: if frames == None, all complete frames are kept.
+			NOTE: Compressed files can only be truncated to their number of
+			      complete frames.
+			DEFAULT: None
+
+		Returns
+		-------
+		frames : int
+			Number of complete frames in file.
+		"""
+
+		complete = self.count_frames()	# number of complete frames in file
+		frames = complete if frames == None else min(complete, int(frames))
+		if frames < complete and self.compression != None:
+			raise ValueError('Compressed files cannot drop complete frames.')
+
+		if self.version == 1:
+			end = self.header_size + frames*self.bytes_per_frame	# end of last complete frame
+		elif frames != self.frames:		# header announces incomplete or dropped frames
+			self.frames = frames
+			self.index_offset, self.segments_offset = 0, 0
+			self.write_header()
+			end = self.end_offset()
+		else:
+			end = self.end_offset()
+			if self.segments_offset > 0: end = max(end,
+				self.segments_offset + 8*len(self.segments))	# end of segments
+			if self.index_offset > 0: end = max(end,
+				self.index_offset + 8*(2*len(self.chunks)
+				if self.compression != None else self.frames))	# end of index
+
+		self.frames = frames
+		self.file.seek(end)
+		self.file.truncate()
+		self.file.flush()
+		return frames
+
+	def count_frames(self):
+		"""
+		Returns number of complete frames in file.
+
+		For files with header, the number of frames is read from the header,
+		and checked against the size of the file: if the file is shorter than
+		announced, a warning is issued and only complete frames are counted.
+
+		Returns
+		-------
+		frames : int
+			Number of frames.
+		"""
+
+		size = os.fstat(self.file.fileno()).st_size	# size of the file in bytes
+		for offset in (self.index_offset, self.segments_offset):	# segments and index follow frames
+			if offset > 0: size = min(size, offset)
+		available = (size - self.header_size)//self.bytes_per_frame	# number of complete frames in file
+
+		if self.version == 1: return available
+		if self.compression != None: return self.frames
+		if available < self.frames:
+			warnings.warn('.dat file header announces %i frames but only %i'
+				' are complete.' % (self.frames, available))
+			return available
+		return self.frames
+
+	def frame_offset(self, time):
+		"""
+		Returns offset in bytes of frame 'time' in file.
+
+		Parameters
+		----------
+		time : int
+			Frame index.
+
+		Returns
+		-------
+		offset : int
+			Offset in bytes.
+		"""
+
+		if self.index is not None: return int(self.index[int(time)])
+		return self.header_size + int(time)*self.bytes_per_frame
+
+	def frame(self, time):
+		"""
+		Returns frame 'time' of a compressed file, of shape (2, self.N, 2)
+		with first axis corresponding to variables (0 for position and 1 for
+		velocity), second axis to particles and third axis to dimensions of
+		space.
+
+		NOTE: The last decompressed chunk is cached.
+
+		Parameters
+		----------
+		time : int
+			Frame index.
+
+		Returns
+		-------
+		frame : (2, self.N, 2) self.dtype Numpy array
+			Frame.
+		"""
+
+		time = int(time)
+		if time < 0: time += self.frames
+		if time < 0 or time >= self.frames: raise IndexError(
+			'Frame %i out of range.' % time)
+
+		chunk = np.searchsorted(self.chunks[:, 1], time, side='right') - 1	# index of chunk containing frame
+		if self.chunk_cache[0] != chunk:
+			offset, first_frame = self.chunks[chunk]
+			end = self.chunks[chunk + 1, 0] if chunk + 1 < len(self.chunks)\
+				else self.end_offset()											# end of chunk in file
+			frames = self.chunks[chunk + 1, 1] if chunk + 1 < len(self.chunks)\
+				else self.frames												# end frame of chunk
+			self.file.seek(offset)
+			self.chunk_cache = (chunk, _decode_chunk(
+				self.file.read(end - offset), self.compression,
+				(frames - first_frame, 2, self.N, 2), self.dtype))
+		return self.chunk_cache[1][time - self.chunks[chunk, 1]]
+
+	def read_cast(self, arr):
+		"""
+		Returns array converted to self.read_dtype.
+
+		Parameters
+		----------
+		arr : Numpy array
+			Read array.
+
+		Returns
+		-------
+		arr : Numpy array
+			Array with data type self.read_dtype.
+		"""
+
+		if self.read_dtype is None or arr.dtype == self.read_dtype: return arr
+		return arr.astype(self.read_dtype)
+
+	def map(self):
+		"""
+		(Re)creates the Numpy memory-map self.data of the .dat file, of shape
+		(self.frames, 2, self.N, 2) with first axis corresponding to frames,
+		second axis to variables (0 for position and 1 for velocity), third
+		axis to particles and fourth axis to dimensions of space.
+
+		NOTE: Incomplete trailing frames are not mapped.
+
+		Returns
+		-------
+		data : (self.frames, 2, self.N, 2) self.dtype Numpy memory-map
+			Memory-mapped trajectory.
+		"""
+
+		self.frames = self.count_frames()	# number of complete frames in file
+		if self.frames == 0:				# numpy.memmap cannot map empty files
+			self.data = np.empty((0, 2, self.N, 2), dtype=self.dtype)
+		else:
+			self.data = np.memmap(self.file, dtype=self.dtype, mode='r',
+				offset=self.header_size, shape=(self.frames, 2, self.N, 2))
+		return self.data
+
+	def __enter__(self):
+		"""
+		Enables use of the object in a with statement.
+		"""
+
+		return self
+
+	def __exit__(self, exc_type, exc_value, traceback):
+		"""
+		Writes buffered frames to file when exiting a with statement block.
+		"""
+
+		self.flush()
+
+	def close(self):
+		"""
+		Writes buffered frames to file, and closes file.
+		"""
+
+		self.flush()
+		self.file.close()
+
 	def dump(self, positions, velocities):
 		"""
 		Dump to file following the .dat file format (trajectory file).
 
+		The frame is written as a single contiguous array, and is held in
+		memory until self.buffer_frames frames have been dumped.
+		(see active_particles.dat.Dat.flush)
+
 		NOTE: self.file has to be open in 'wb' or 'r+b' mode.
 
 		Parameters
 		----------
 		positions : (self.N, 2) shaped array like
 			List of position coordinates.
+			NOTE: Only the 2 first coordinates are considered.
 		velocities : (self.N, 2) shaped array like
 			List of velocity coordinates.
+			NOTE: Only the 2 first coordinates are considered.
+		"""
+
+		frame = np.empty((2, self.N, 2), dtype=self.dtype)	# frame following the .dat file format
+		frame[0] = np.asarray(positions)[:, :2]
+		frame[1] = np.asarray(velocities)[:, :2]
+
+		self.buffer += [frame]
+		if len(self.buffer) >= self.buffer_frames: self.flush()
+
+	def flush(self):
+		"""
+		Writes buffered frames to file with a single call, and flushes file.
+
+		For files with header, frames are written after the last frame, then
+		the segments and the header are updated. (see active_particles.dat.Dat.write_metadata)
+		For compressed files, buffered frames are written as a single chunk
+		after the last chunk, then the segments, the chunks index and the
+		header are updated.
 		"""
 
-		for data in [positions, velocities]:							# for each variable to dump
-			for particle in range(self.N):								# for each particle
-				for coord in range(2):									# for each dimension of space
-						self.file.write(struct.pack(self.element_type,	# dump to file
-							data[particle][coord]))
+		if self.buffer == []: return	# no buffered frames
+
+		if self.version > 1 and self.segment_start == None:
+			self.segment_start = self.frames	# first frame written by this object
+
+		if self.compression != None:	# compressed chunk
+			chunk_offset = self.end_offset()	# end of last chunk
+			self.file.seek(chunk_offset)
+			self.file.write(_encode_chunk(np.array(self.buffer),
+				self.compression))		# write buffered frames as a chunk
+			self.chunks = np.concatenate(
+				(self.chunks, [[chunk_offset, self.frames]]))
+			self.frames += len(self.buffer)
+			self.write_metadata()
+
+			self.file.flush()
+			self.buffer = []
+			return
+
+		if self.version > 1:
+			if self.index_offset > 0 or self.segments_offset > 0:	# frames overwrite segments and index
+				self.index_offset, self.segments_offset = 0, 0
+				self.write_header()	# header without segments and index, valid while frames are written
+				self.file.flush()
+			self.file.seek(self.end_offset())	# end of last frame
+		self.file.write(np.concatenate(self.buffer).tobytes())	# write buffered frames
+
+		if self.version > 1:
+			self.frames += len(self.buffer)
+			self.write_metadata()
+
+		self.file.flush()
+		self.buffer = []
 
 	def get_value(self, time, particle, axis, inc_var):
 		"""
@@ -94,8 +590,12 @@ class Dat:
 			Variable.
 		"""
 
-		self.file.seek(self.bytes_per_element*(
-			4*self.N*time + inc_var + 2*particle + axis))	# set file's current position according to frame, variable, number of particles, and axis
+		if self.compression != None:
+			return np.reshape(self.frame(time), (4*self.N,))[
+				inc_var + 2*particle + axis]
+
+		self.file.seek(self.frame_offset(time) + self.bytes_per_element*(
+			inc_var + 2*particle + axis))	# set file's current position according to frame, variable, number of particles, and axis
 		return struct.unpack(self.element_type,
 			self.file.read(self.bytes_per_element))[0]		# variable
 
@@ -103,6 +603,10 @@ class Dat:
 		"""
 		Returns array of variable at frame 'time'.
 
+		NOTE: If the file is memory-mapped, the returned array is, whenever
+		      possible (all particles or regularly spaced particle indexes), a
+		      read-only view of the memory-map.
+
 		Parameters
 		----------
 		time : int
@@ -123,16 +627,123 @@ class Dat:
 			Array of variable at frame 'time'.
 		"""
 
-		if particle == (): particle = range(self.N)	# no particular indexes requested
+		if self.memory_map:
+			arr = np.asarray(self.data[int(time), self.index_var[variable]])	# variable at frame 'time' for all particles
+		elif self.compression != None:
+			arr = self.frame(time)[self.index_var[variable]]					# variable at frame 'time' for all particles
+		else:
+			self.file.seek(self.frame_offset(time)
+				+ self.bytes_per_element*self.inc_var[variable])	# set file's current position according to frame and variable
+			arr = np.empty((self.N, 2), dtype=self.dtype)
+			self.file.readinto(arr)								# variable at frame 'time' for all particles
+
+		return self.read_cast(arr[_particles_index(particle)])	# variable at frame 'time' for particles 'particle'
+
+	def variables(self, frames, *particle, variable='position'):
+		"""
+		Returns array of variable at frames 'frames', read in a single pass
+		over the file with frames sorted by offset.
+
+		Parameters
+		----------
+		frames : int array-like or slice
+			Frame indexes.
+		variable : string
+			Name of variable.
+
+		Optional positional arguments
+		-----------------------------
+		particle : int
+			Particle index.
+			When called with particle indexes, function returns array of
+			particles' variable at frames 'frames' in the same order.
+
+		Returns
+		-------
+		arr : (len(frames), *, 2) self.element_type packing format Numpy array
+			Array of variable at frames 'frames', in the order of 'frames'.
+		"""
+
+		if isinstance(frames, slice):
+			frames = np.arange(self.count_frames())[frames]	# frames in slice
+		frames = np.array(frames, dtype=int, ndmin=1)
+		sorted_frames, order = np.unique(frames, return_inverse=True)	# frames sorted by offset in file, and indexes to retrieve input order
+
+		index = _particles_index(particle)	# particles' index
+
+		if self.memory_map:
+			data = self.data[:, self.index_var[variable]]	# view of variable at all frames
+			if isinstance(index, slice):
+				arr = np.asarray(data[sorted_frames, index])	# variable at frames 'sorted_frames'
+			else:
+				arr = np.asarray(data[
+					np.reshape(sorted_frames, (len(sorted_frames), 1)),
+					np.reshape(index, (1, len(index)))])	# variable at frames 'sorted_frames'
+		else:
+			arr = np.empty((len(sorted_frames), self.N, 2), dtype=self.dtype)
+			for frame_index, frame in enumerate(sorted_frames):
+				if self.compression != None:
+					arr[frame_index] = self.frame(frame)[
+						self.index_var[variable]]	# variable at frame 'frame' for all particles
+					continue
+				self.file.seek(self.frame_offset(frame)
+					+ self.bytes_per_element*self.inc_var[variable])	# set file's current position according to frame and variable
+				self.file.readinto(arr[frame_index])					# variable at frame 'frame' for all particles
+			arr = arr[:, index]
+
+		if (order == np.arange(len(frames))).all():
+			return self.read_cast(arr)		# frames were already sorted and unique
+		return self.read_cast(arr[order])
+
+	def positions(self, frames, *particle):
+		"""
+		Returns array of positions at frames 'frames'.
+		(see active_particles.dat.Dat.variables)
+
+		Parameters
+		----------
+		frames : int array-like or slice
+			Frame indexes.
+
+		Optional positional arguments
+		-----------------------------
+		particle : int
+			Particle index.
+			When called with particle indexes, function returns array of
+			particles' position at frames 'frames' in the same order.
+
+		Returns
+		-------
+		arr : (len(frames), *, 2) self.element_type packing format Numpy array
+			Array of positions at frames 'frames'.
+		"""
+
+		return self.variables(frames, *particle, variable='position')
+
+	def velocities(self, frames, *particle):
+		"""
+		Returns array of velocities at frames 'frames'.
+		(see active_particles.dat.Dat.variables)
+
+		Parameters
+		----------
+		frames : int array-like or slice
+			Frame indexes.
+
+		Optional positional arguments
+		-----------------------------
+		particle : int
+			Particle index.
+			When called with particle indexes, function returns array of
+			particles' velocity at frames 'frames' in the same order.
 
-		inc_var = self.inc_var[variable]	# increment in bytes_per_element to accesss variable
+		Returns
+		-------
+		arr : (len(frames), *, 2) self.element_type packing format Numpy array
+			Array of velocities at frames 'frames'.
+		"""
 
-		return np.reshape(list(map(
-			lambda particle: list(map(
-			lambda axis: self.get_value(time, particle, axis, inc_var),
-			range(2))),
-			particle)),
-			(len(particle), 2))	# variable at frame 'time' for particles 'particle'
+		return self.variables(frames, *particle, variable='velocity')
 
 	def position(self, time, *particle):
 		"""
@@ -210,16 +821,222 @@ class Dat:
 			Array of displacement between frames 'time0' and 'time1'.
 		"""
 
+		if self.memory_map:
+			index = _particles_index(particle)	# particles' index
+			return self.read_cast((self.data[int(time1), 0][index]
+				- self.data[int(time0), 0][index]).view(np.ndarray))
+
 		return self.position(time1, *particle)\
 			- self.position(time0, *particle)
 
+def count_dat_frames(file_name, default=None):
+	"""
+	Returns number of complete frames in .dat file with header.
+	(see active_particles.dat.Dat.count_frames)
+
+	Parameters
+	----------
+	file_name : string
+		.dat file name.
+	default : *
+		Value returned if the file does not exist or has no header, i.e. its
+		number of frames cannot be read.
+		DEFAULT: None
+
+	Returns
+	-------
+	frames : int or default
+		Number of frames.
+	"""
+
+	try:
+		with open(file_name, 'rb') as dat_file:
+			if dat_file.read(len(_dat_magic)) != _dat_magic: return default	# file without header
+			return Dat(dat_file, None, memory_map=False).count_frames()
+	except FileNotFoundError: return default
+
+def _encode_chunk(frames, compression):
+	"""
+	Returns compressed chunk of frames.
+
+	Frames are delta-encoded against the previous frame on the unsigned
+	integer representation of their elements, then bytes of elements are
+	shuffled (all first bytes, then all second bytes, ...) and compressed.
+
+	Parameters
+	----------
+	frames : (*, 2, N, 2) Numpy array
+		Frames.
+	compression : string
+		Compression codec. (see active_particles.dat._dat_compressions)
+
+	Returns
+	-------
+	chunk : bytes
+		Compressed chunk.
+	"""
+
+	frames = np.ascontiguousarray(frames)
+	itemsize = frames.dtype.itemsize
+	integers = frames.view('<u%i' % itemsize)		# integer representation of elements
+	deltas = np.concatenate((integers[:1],
+		integers[1:] - integers[:-1]))				# delta-encoded frames (modular arithmetic)
+	shuffled = np.transpose(np.reshape(deltas.view(np.uint8), (-1, itemsize)))	# shuffled bytes
+
+	return _compress(np.ascontiguousarray(shuffled).tobytes(), compression)
+
+def _decode_chunk(chunk, compression, shape, dtype):
+	"""
+	Returns frames of compressed chunk.
+	(see active_particles.dat._encode_chunk)
+
+	Parameters
+	----------
+	chunk : bytes
+		Compressed chunk.
+	compression : string
+		Compression codec. (see active_particles.dat._dat_compressions)
+	shape : tuple
+		Shape of frames array.
+	dtype : Numpy data type
+		Data type of elements.
+
+	Returns
+	-------
+	frames : shape dtype Numpy array
+		Frames.
+	"""
+
+	itemsize = np.dtype(dtype).itemsize
+	shuffled = np.reshape(np.frombuffer(_decompress(chunk, compression),
+		dtype=np.uint8), (itemsize, -1))	# shuffled bytes
+	deltas = np.reshape(np.ascontiguousarray(np.transpose(shuffled)).view(
+		'<u%i' % itemsize), shape)			# delta-encoded frames
+
+	return np.cumsum(deltas, axis=0, dtype=deltas.dtype).view(dtype)
+
+def _compress(data, compression):
+	"""
+	Returns data compressed with codec 'compression'.
+
+	Parameters
+	----------
+	data : bytes
+		Data to compress.
+	compression : string
+		Compression codec. (see active_particles.dat._dat_compressions)
+
+	Returns
+	-------
+	compressed : bytes
+		Compressed data.
+	"""
+
+	if compression == 'zlib':
+		import zlib
+		return zlib.compress(data, 1)
+	if compression == 'zstd':
+		import zstandard
+		return zstandard.ZstdCompressor(level=3).compress(data)
+	if compression == 'blosc':
+		import blosc
+		return blosc.compress(data, typesize=1, shuffle=blosc.NOSHUFFLE,
+			cname='lz4')
+	raise ValueError('Unknown compression codec %s.' % compression)
+
+def _decompress(data, compression):
+	"""
+	Returns data decompressed with codec 'compression'.
+
+	Parameters
+	----------
+	data : bytes
+		Compressed data.
+	compression : string
+		Compression codec. (see active_particles.dat._dat_compressions)
+
+	Returns
+	-------
+	decompressed : bytes
+		Decompressed data.
+	"""
+
+	if compression == 'zlib':
+		import zlib
+		return zlib.decompress(data)
+	if compression == 'zstd':
+		import zstandard
+		return zstandard.ZstdDecompressor().decompress(data)
+	if compression == 'blosc':
+		import blosc
+		return blosc.decompress(data)
+	raise ValueError('Unknown compression codec %s.' % compression)
+
+def _snapshot_nbytes(snapshot):
+	"""
+	Returns memory in bytes of arrays of snapshot.
+
+	Parameters
+	----------
+	snapshot : gsd.hoomd.Snapshot object
+		Snapshot.
+
+	Returns
+	-------
+	nbytes : int
+		Memory in bytes.
+	"""
+
+	return sum(
+		value.nbytes for section in vars(snapshot).values()
+		for value in getattr(section, '__dict__', {}).values()
+		if isinstance(value, np.ndarray))
+
+def _particles_index(particle):
+	"""
+	Returns index to access particles 'particle' along the first axis of an
+	array.
+
+	Parameters
+	----------
+	particle : tuple of int
+		Particles indexes.
+		NOTE: if particle == (), all particles are considered.
+
+	Returns
+	-------
+	index : slice or int Numpy array
+		Slice if particle indexes are non-negative and regularly spaced (so
+		that indexing returns a view), array of indexes otherwise.
+	"""
+
+	if particle == (): return slice(None)	# all particles
+
+	particle = np.array(particle, dtype=int).flatten()
+	if particle.size == 1 and particle[0] >= 0:	# single non-negative index
+		return slice(particle[0], particle[0] + 1)
+	if particle.size == 1: return particle		# single negative index, which slice(-1, 0) would not return
+
+	step = particle[1] - particle[0]
+	if step > 0 and (np.diff(particle) == step).all()\
+		and particle[0] >= 0:				# regularly spaced increasing indexes
+		return slice(particle[0], particle[-1] + 1, step)
+	return particle
+
 class Gsd(HOOMDTrajectory):
 	"""
 	This class adds methods to the gsd.hoomd.HOOMDTrajectory class which reads
 	.gsd trajectory file.
+
+	Accessors read single data chunks from the .gsd file rather than whole
+	snapshots. Decoded snapshots and chunks are kept in a least recently used
+	cache bounded in memory, and quantities which are not stored at every
+	frame (such as diameters and box dimensions when they are not dumped
+	dynamically) are read once per file.
 	"""
 
-	def __init__(self, file, prep_frames=0, dimensions=2):
+	def __init__(self, file, prep_frames=0, dimensions=2,
+		cache_memory=_cache_memory, strain_r_cut=_r_cut):
 		"""
 		Parameters
 		----------
@@ -229,6 +1046,15 @@ class Gsd(HOOMDTrajectory):
 			Number of frames to ignore at beginning of .gsd file. (default: 0)
 		dimensions : int
 			Dimension of space. (default: 2)
+		cache_memory : int
+			Maximum memory in bytes of cached snapshots and chunks.
+			NOTE: if cache_memory <= 0, snapshots are not cached.
+			DEFAULT: active_particles.dat._cache_memory
+		strain_r_cut : float
+			Cut-off radius for neighbours in local affine fits of nonaffine
+			squared displacements and strain tensors.
+			(see active_particles.analysis.strain.AtomicStrain)
+			DEFAULT: active_particles.analysis.strain._r_cut
 		"""
 
 		self.filename = file.name	# file name
@@ -238,7 +1064,15 @@ class Gsd(HOOMDTrajectory):
 		self.prep_frames = prep_frames
 		self.dimensions = dimensions
 
-		self.node = ovito_import_file(self.filename)	# OVITO ObjectNode
+		self.cache_memory = cache_memory
+		self.cache = OrderedDict()	# cached snapshots and chunks and their sizes in bytes, from least to most recently used
+		self.cache_nbytes = 0		# memory in bytes of cached data
+		self.cache_hits = 0			# number of snapshots and chunks read from cache
+		self.cache_misses = 0		# number of snapshots and chunks read from file
+		self.static = {}			# chunks of first frame, for frames at which they are not stored
+
+		self.strain_r_cut = strain_r_cut
+		self.strain_reference = (None, None)	# last reference frame and atomic strain object
 
 	def __getitem__(self, key):
 		"""
@@ -262,68 +1096,320 @@ class Gsd(HOOMDTrajectory):
 				key.step))
 		return super().__getitem__(int(key + self.prep_frames))
 
-	def position(self, time, *particle, **kwargs):
+	def close(self):
+		"""
+		Closes .gsd file.
 		"""
-		Returns array of position at frame 'time'.
 
-		Parameters
-		----------
-		time : int
-			Frame index.
+		self.file.close()
 
-		Optional positional arguments
-		-----------------------------
-		particle : int
-			Particles indexes.
-			When called with particles indexes, function returns array of
-			particles' position at frame 'time' in the same order.
+	def read_frame(self, idx):
+		"""
+		Returns snapshot at frame 'idx' of .gsd file, from cache if it has
+		been decoded recently.
 
-		Optional keyword arguments
-		--------------------------
-		centre : (self.dimensions,) array
-			Define new centre position.
+		NOTE: Cached snapshots are shared between calls, and should not be
+		      modified.
+
+		Parameters
+		----------
+		idx : int
+			Index of frame in .gsd file.
+			NOTE: Preparation frames are not ignored.
 
 		Returns
 		-------
-		positions : float Numpy array
-			Array of positions at frame 'time'.
+		snapshot : gsd.hoomd.Snapshot object
+			Snapshot at frame idx.
 		"""
 
-		positions = self[time].particles.position[:, :self.dimensions]	# positions at frame time
-		if particle != ():												# consider only particles in particles
-			positions = np.array(itemgetter(*particle)(positions))
+		idx = int(idx)
+		if idx in self.cache: return self.cache_get(idx)	# cache hit
 
-		if 'centre' in kwargs:
-			return relative_positions(positions, kwargs['centre'],
-				self.box_size(time))	# positions with centre as centre
-		return positions
+		self.cache_misses += 1
+		snapshot = super().read_frame(idx)
+		self.cache_put(idx, snapshot, _snapshot_nbytes(snapshot))
+		return snapshot
 
-	def velocity(self, time, *particle):
+	def chunk(self, time, name, value):
 		"""
-		Returns array of velocity at frame 'time'.
+		Returns data chunk 'name' at frame 'time' read directly from .gsd file
+		(see gsd.pygsd.GSDFile.read_chunk), without decoding other chunks of
+		the frame.
+
+		Chunks which are not stored at frame 'time' are equal to the ones of
+		the first frame of the .gsd file (gsd does not store chunks equal to
+		the first frame's), which are read once per file. Chunks which are not
+		stored in the first frame either are taken from the snapshot, which
+		holds default values.
+
+		NOTE: Chunks of the first frame are only used after checking that the
+		      chunk is not stored at frame 'time', since any quantity can be
+		      stored again at later frames (e.g., box under shear).
+
+		NOTE: Recently read chunks are cached with snapshots, and should not
+		      be modified.
 
 		Parameters
 		----------
 		time : int
 			Frame index.
-
-		Optional positional arguments
-		-----------------------------
-		particle : int
-			Particles indexes.
-			When called with particles indexes, function returns array of
-			particles' position at frame 'time' in the same order.
+		name : string
+			Name of chunk in .gsd file. (e.g., 'particles/position')
+		value : function
+			Function which returns quantity from snapshot, for chunks which
+			are not stored in the .gsd file.
 
 		Returns
 		-------
-		velocities : float Numpy array
-			Array of velocities at frame 'time'.
+		data : *
+			Quantity at frame 'time'.
 		"""
 
-		velocities = self[time].particles.velocity[:, :self.dimensions]		# velocities at frame time
+		idx = int(time + self.prep_frames)	# index of frame in .gsd file
+		if (idx, name) in self.cache: return self.cache_get((idx, name))	# cache hit
+
+		if self.file.chunk_exists(idx, name):
+			self.cache_misses += 1
+			data = self.file.read_chunk(idx, name)
+			self.cache_put((idx, name), data, data.nbytes)
+			return data
+
+		if name in self.static: return self.static[name]	# quantity equal to the one of the first frame
+		if idx > 0 and self.file.chunk_exists(0, name):		# quantity not stored at this frame but in first frame
+			self.static[name] = self.file.read_chunk(0, name)
+			return self.static[name]
+
+		return value(self[time])
+
+	def cache_get(self, key):
+		"""
+		Returns cached snapshot or chunk, and marks it as most recently used.
+
+		Parameters
+		----------
+		key : int or tuple
+			Frame index in .gsd file for snapshots, or frame index in .gsd
+			file and name for chunks.
+
+		Returns
+		-------
+		data : gsd.hoomd.Snapshot object or Numpy array
+			Cached snapshot or chunk.
+		"""
+
+		self.cache_hits += 1
+		self.cache.move_to_end(key)
+		return self.cache[key][0]
+
+	def cache_put(self, key, data, nbytes):
+		"""
+		Caches snapshot or chunk, and evicts least recently used ones while
+		cached data exceed self.cache_memory bytes.
+
+		Parameters
+		----------
+		key : int or tuple
+			Frame index in .gsd file for snapshots, or frame index in .gsd
+			file and name for chunks.
+		data : gsd.hoomd.Snapshot object or Numpy array
+			Snapshot or chunk.
+		nbytes : int
+			Memory in bytes of data.
+		"""
+
+		if self.cache_memory <= 0: return	# no cache
+
+		self.cache[key] = (data, nbytes)
+		self.cache_nbytes += nbytes
+		while self.cache_nbytes > self.cache_memory and len(self.cache) > 1:	# evict least recently used data
+			self.cache_nbytes -= self.cache.popitem(last=False)[1][1]
+
+	def cache_info(self):
+		"""
+		Returns statistics of snapshots and chunks cache.
+
+		Returns
+		-------
+		info : hash table
+			Statistics with keys
+			'hits' : number of snapshots and chunks read from cache,
+			'misses' : number of snapshots and chunks read from file,
+			'entries' : number of cached snapshots and chunks,
+			'nbytes' : memory in bytes of cached data,
+			'maxbytes' : maximum memory in bytes of cached data.
+		"""
+
+		return {'hits': self.cache_hits, 'misses': self.cache_misses,
+			'entries': len(self.cache), 'nbytes': self.cache_nbytes,
+			'maxbytes': self.cache_memory}
+
+	def clear_cache(self):
+		"""
+		Empties snapshots and chunks cache and resets its statistics.
+		"""
+
+		self.cache.clear()
+		self.cache_nbytes = 0
+		self.cache_hits, self.cache_misses = 0, 0
+
+	def position(self, time, *particle, **kwargs):
+		"""
+		Returns array of position at frame 'time'.
+
+		Parameters
+		----------
+		time : int
+			Frame index.
+
+		Optional positional arguments
+		-----------------------------
+		particle : int
+			Particles indexes.
+			When called with particles indexes, function returns array of
+			particles' position at frame 'time' in the same order.
+
+		Optional keyword arguments
+		--------------------------
+		centre : (self.dimensions,) array
+			Define new centre position.
+
+		Returns
+		-------
+		positions : float Numpy array
+			Array of positions at frame 'time'.
+		"""
+
+		positions = self.chunk(time, 'particles/position',
+			lambda snapshot: snapshot.particles.position)[:, :self.dimensions]	# positions at frame time
+		if particle != ():												# consider only particles in particles
+			positions = np.array(itemgetter(*particle)(positions))
+
+		if 'centre' in kwargs:
+			return relative_positions(positions, kwargs['centre'],
+				self.box_size(time))	# positions with centre as centre
+		return positions
+
+	def velocity(self, time, *particle):
+		"""
+		Returns array of velocity at frame 'time'.
+
+		Parameters
+		----------
+		time : int
+			Frame index.
+
+		Optional positional arguments
+		-----------------------------
+		particle : int
+			Particles indexes.
+			When called with particles indexes, function returns array of
+			particles' position at frame 'time' in the same order.
+
+		Returns
+		-------
+		velocities : float Numpy array
+			Array of velocities at frame 'time'.
+		"""
+
+		velocities = self.chunk(time, 'particles/velocity',
+			lambda snapshot: snapshot.particles.velocity)[:, :self.dimensions]	# velocities at frame time
 		if particle == ():	return velocities								# returns all velocities
 		return np.array(itemgetter(*particle)(velocities))					# velocities at frame time
 
+	def positions(self, frames, *particle):
+		"""
+		Returns array of positions at frames 'frames'.
+
+		Parameters
+		----------
+		frames : int array-like or slice
+			Frame indexes.
+
+		Optional positional arguments
+		-----------------------------
+		particle : int
+			Particle index.
+			When called with particle indexes, function returns array of
+			particles' position at frames 'frames' in the same order.
+
+		Returns
+		-------
+		arr : (len(frames), *, self.dimensions) float Numpy array
+			Array of positions at frames 'frames'.
+		"""
+
+		return self.chunks(frames, 'particles/position',
+			lambda snapshot: snapshot.particles.position, *particle)
+
+	def velocities(self, frames, *particle):
+		"""
+		Returns array of velocities at frames 'frames'.
+
+		Parameters
+		----------
+		frames : int array-like or slice
+			Frame indexes.
+
+		Optional positional arguments
+		-----------------------------
+		particle : int
+			Particle index.
+			When called with particle indexes, function returns array of
+			particles' velocity at frames 'frames' in the same order.
+
+		Returns
+		-------
+		arr : (len(frames), *, self.dimensions) float Numpy array
+			Array of velocities at frames 'frames'.
+		"""
+
+		return self.chunks(frames, 'particles/velocity',
+			lambda snapshot: snapshot.particles.velocity, *particle)
+
+	def chunks(self, frames, name, value, *particle):
+		"""
+		Returns array of spatial data chunk 'name' at frames 'frames'.
+		(see active_particles.dat.Gsd.chunk)
+
+		Parameters
+		----------
+		frames : int array-like or slice
+			Frame indexes.
+		name : string
+			Name of chunk in .gsd file. (e.g., 'particles/position')
+		value : function
+			Function which returns quantity from snapshot, for chunks which
+			are not stored in the .gsd file.
+
+		Optional positional arguments
+		-----------------------------
+		particle : int
+			Particle index.
+			When called with particle indexes, function returns array of
+			particles' values at frames 'frames' in the same order.
+
+		Returns
+		-------
+		arr : (len(frames), *, self.dimensions) float Numpy array
+			Array of chunk at frames 'frames'.
+		"""
+
+		if isinstance(frames, slice):
+			frames = np.arange(len(self) - self.prep_frames)[frames]	# frames in slice
+		frames = np.array(frames, dtype=int, ndmin=1)
+
+		index = _particles_index(particle)	# particles' index
+		arr = None
+		for frame_index, frame in enumerate(frames):
+			data = np.asarray(self.chunk(frame, name, value))[index,
+				:self.dimensions]	# chunk at frame 'frame'
+			if arr is None:
+				arr = np.empty((len(frames),) + data.shape, dtype=data.dtype)
+			arr[frame_index] = data
+		if arr is None: return np.empty((0, 0, self.dimensions))
+		return arr
+
 	def diameter(self, time, *particle):
 		"""
 		Returns array of diameter at frame 'time'.
@@ -346,7 +1432,8 @@ class Gsd(HOOMDTrajectory):
 			Array of diameters at frame 'time'.
 		"""
 
-		diameters = self[time].particles.diameter			# diameters at frame time
+		diameters = self.chunk(time, 'particles/diameter',
+			lambda snapshot: snapshot.particles.diameter)	# diameters at frame time
 		if particle == ():	return diameters				# returns all diameters
 		return np.array(itemgetter(*particle)(diameters))	# diameters at frame time
 
@@ -365,7 +1452,28 @@ class Gsd(HOOMDTrajectory):
 			Length of system box in fist direction.
 		"""
 
-		return self[time].configuration.box[0]
+		return self.chunk(time, 'configuration/box',
+			lambda snapshot: snapshot.configuration.box)[0]
+
+	def box(self, time=0):
+		"""
+		Returns lengths and tilt factor of possibly sheared system box at time
+		'time', with box vectors (Lx, 0) and (xy*Ly, Ly).
+
+		Parameters
+		----------
+		time : int
+			Frame index. (default: 0)
+
+		Returns
+		-------
+		box : (3,) float Numpy array
+			Lengths Lx, Ly and tilt factor xy of system box.
+		"""
+
+		box = np.array(self.chunk(time, 'configuration/box',
+			lambda snapshot: snapshot.configuration.box), dtype=float)	# box dimensions Lx, Ly, Lz, xy, xz, yz
+		return box[[0, 1, 3]]
 
 	def N(self, time=0):
 		"""
@@ -382,7 +1490,8 @@ class Gsd(HOOMDTrajectory):
 			Number of particles.
 		"""
 
-		return self[time].particles.N
+		return int(self.chunk(time, 'particles/N',
+			lambda snapshot: [snapshot.particles.N])[0])
 
 	def is_in_box(self, time, box_size, centre, *particle):
 		"""
@@ -423,14 +1532,18 @@ class Gsd(HOOMDTrajectory):
 		direction, and associates to each box of this grid the averaged value
 		of the (self.N('time'), *)-array 'array' over the indexes corresponding
 		to particles within this box at time 'time'.
+		(see active_particles.dat.Gsd.to_grids)
 
 		NOTE: This function assumes the system box is hypercubic (lenth equal
 		      in all directions).
 
 		Parameters
 		----------
-		time : int
+		time : int or int array-like
 			Frame index.
+			NOTE: if time is array-like, then array is expected to be a
+			      (len(time), self.N(time), *) array-like of values at each
+			      of these frames, and the grids at each frame are returned.
 		array : (self.N(time), *) array-like
 			Array of values to be put on the grid.
 		Ncases : int
@@ -450,39 +1563,122 @@ class Gsd(HOOMDTrajectory):
 		-------
 		grid : (Ncases,)*self.dimensions + (*) Numpy array
 			Averaged grid.
+			NOTE: if time is array-like, grids at each frame are returned in a
+			      (len(time),) + (Ncases,)*self.dimensions + (*) Numpy array.
 		"""
 
-		time = int(time)
+		return self.to_grids(time, array,
+			Ncases=Ncases, box_size=box_size, centre=centre)[0]
 
-		array = np.array(array)
-		if array.shape[0] != self.N(time): raise ValueError(
-			'Array first-direction length different than number of particles.')
+	def to_grids(self, time, *arrays, Ncases=None, box_size=None,
+		centre=None):
+		"""
+		This function maps the hypercubic sub-system of centre 'centre' and
+		length 'box_size' to a hypercubic grid with 'Ncases' boxes in every
+		direction, and associates to each box of this grid the averaged values
+		of the (self.N('time'), *)-arrays 'arrays' over the indexes
+		corresponding to particles within this box at time 'time'.
 
-		if Ncases == None: Ncases = (self.N(time))**(1/self.dimensions)
-		Ncases = int(Ncases)
+		Grid boxes of particles are computed once for all arrays, and sums
+		over grid boxes are computed with numpy.bincount over flattened grid
+		box indexes.
 
-		if box_size == None: box_size = self.box_size(time)
+		NOTE: This function assumes the system box is hypercubic (lenth equal
+		      in all directions).
+
+		Parameters
+		----------
+		time : int or int array-like
+			Frame index.
+			NOTE: if time is array-like, then arrays are expected to be
+			      (len(time), self.N(time), *) array-likes of values at each
+			      of these frames, and the grids at each frame are returned.
+
+		Optional positional arguments
+		-----------------------------
+		arrays : (self.N(time), *) array-like
+			Arrays of values to be put on the grid.
+
+		Optional keyword arguments
+		--------------------------
+		Ncases : int
+			Number of grid boxes in each direction.
+			NOTE: if Ncases==None,
+			      then Ncases = int((self.N(time))**(1/self.dimensions)).
+			DEFAULT: None
+		box_size : float
+			Length of the sub-system to consider.
+			NOTE: if box_size==None, then box_size = self.box_size(time).
+			DEFAULT: None
+		centre : array-like
+			Coordinates of the centre of the sub-system.
+			NOTE: if centre==None, then centre = (0,)*self.dimensions.
+
+		Returns
+		-------
+		grids : list of (Ncases,)*self.dimensions + (*) Numpy array
+			Averaged grids, in the same order as arrays.
+			NOTE: if time is array-like, grids at each frame are returned in
+			      (len(time),) + (Ncases,)*self.dimensions + (*) Numpy arrays.
+		"""
+
+		batch = not(np.isscalar(time))	# several frames
+		times = np.array(time, dtype=int, ndmin=1)
 
 		if centre == None: centre = (0,)*self.dimensions
 		centre = np.array(centre)
 
-		grid = np.zeros((Ncases,)*self.dimensions + array.shape[1:])
-		sumN = np.zeros((Ncases,)*self.dimensions)	# array of the number of particles in each grid box
+		positions = [self.position(t, centre=centre) for t in times]	# positions relative to centre at each frame
+		N = len(positions[0])
 
-		in_box = self.is_in_box(time, box_size, centre)
-		positions = self.position(time, centre=centre)
-		for particle in range(self.N(time)):
-			if in_box[particle]:
-				grid_index = tuple(np.array(
-					((positions[particle] + box_size/2)//(box_size/Ncases))
-					% ((Ncases,)*self.dimensions),
-					dtype=int))
-				grid[grid_index] += array[particle]
-				sumN[grid_index] += 1
-		sumN = np.reshape(sumN,
-			(Ncases,)*self.dimensions + (1,)*len(array.shape[1:]))
+		arrays = [np.array(array) for array in arrays]
+		if not(batch): arrays = [np.reshape(array, (1,) + array.shape)
+			for array in arrays]
+		for array in arrays:
+			if array.shape[:2] != (len(times), N): raise ValueError(
+				'Array first-direction length different than number of particles.')
 
-		return np.divide(grid, sumN, out=np.zeros(grid.shape), where=sumN!=0)
+		if Ncases == None: Ncases = N**(1/self.dimensions)
+		Ncases = int(Ncases)
+		Nboxes = Ncases**self.dimensions	# number of grid boxes per frame
+
+		boxes = np.empty((len(times), N), dtype=int)	# flattened grid box indexes of particles
+		for frame, t in enumerate(times):
+			L = self.box_size(t) if box_size == None else box_size	# length of the sub-system
+			in_box = (np.abs(positions[frame]) <= L/2).all(axis=-1)	# particles in the sub-system (see active_particles.dat.Gsd.is_in_box)
+			grid_index = np.array(
+				((positions[frame] + L/2)//(L/Ncases)) % Ncases,
+				dtype=int)											# grid box indexes
+			boxes[frame] = np.where(in_box,
+				frame*Nboxes + np.ravel_multi_index(
+					tuple(np.transpose(grid_index)), (Ncases,)*self.dimensions),
+				len(times)*Nboxes)	# particles outside of the sub-system are put in an additional discarded box
+		boxes = boxes.flatten()
+
+		sumN = np.bincount(boxes,
+			minlength=len(times)*Nboxes + 1)[:-1]	# number of particles in each grid box
+
+		grids = []
+		for array in arrays:
+			values = np.reshape(array, (len(times)*N, -1))
+			grid = np.zeros((len(times)*Nboxes, values.shape[-1]),
+				dtype=np.result_type(values.dtype, float))
+			for component in range(values.shape[-1]):
+				grid[:, component] = np.bincount(boxes,
+					weights=values[:, component].real,
+					minlength=len(times)*Nboxes + 1)[:-1]
+				if np.iscomplexobj(values):
+					grid[:, component] += 1j*np.bincount(boxes,
+						weights=values[:, component].imag,
+						minlength=len(times)*Nboxes + 1)[:-1]
+			grid = np.divide(grid, np.reshape(sumN, (len(sumN), 1)),
+				out=np.zeros(grid.shape, dtype=grid.dtype),
+				where=np.reshape(sumN, (len(sumN), 1))!=0)
+			grid = np.reshape(grid,
+				(len(times),) + (Ncases,)*self.dimensions + array.shape[2:])
+			grids += [grid if batch else grid[0]]
+
+		return grids
 
 	def to_2Dgrid_gaussian_filter(self, time, array, sigma,
 		Ncases=None, box_size=None, centre=None):
@@ -534,19 +1730,87 @@ class Gsd(HOOMDTrajectory):
 
 		return gridFFT.gaussian_filter(sigma)
 
+	def atomic_strain(self, time0):
+		"""
+		Returns atomic strain object with reference configuration at frame
+		'time0'.
+		(see active_particles.analysis.strain.AtomicStrain)
+
+		NOTE: The atomic strain object of the last reference frame is kept, so
+		      that neighbours are found once for many lag times.
+
+		Parameters
+		----------
+		time0 : int
+			Reference frame index.
+
+		Returns
+		-------
+		atomic_strain : active_particles.analysis.strain.AtomicStrain
+			Atomic strain object.
+		"""
+
+		if self.strain_reference[0] != int(time0):
+			self.strain_reference = (int(time0), AtomicStrain(
+				self.position(time0), self.box(time0),
+				r_cut=self.strain_r_cut))
+		return self.strain_reference[1]
+
+	def strain_quantity(self, quantity, time0, time1, *particle):
+		"""
+		Returns quantity computed by atomic strain object with reference
+		configuration at frame 'time0' and current configuration at frame(s)
+		'time1'.
+		(see active_particles.dat.Gsd.atomic_strain)
+
+		Parameters
+		----------
+		quantity : string
+			Name of active_particles.analysis.strain.AtomicStrain method.
+		time0 : int
+			Initial frame index.
+		time1 : int or int array-like
+			Final frame index.
+			NOTE: if time1 is array-like, quantities at each of these frames
+			      are returned in an array with first axis corresponding to
+			      frames.
+
+		Optional positional arguments
+		-----------------------------
+		particle : int
+			Particles indexes.
+
+		Returns
+		-------
+		values : float Numpy array
+			Quantity between frames 'time0' and 'time1'.
+		"""
+
+		atomic_strain = self.atomic_strain(time0)
+		index = _particles_index(particle)	# particles' index
+
+		if np.isscalar(time1):
+			return getattr(atomic_strain, quantity)(self.position(time1),
+				self.box(time1))[index]
+		return np.array([getattr(atomic_strain, quantity)(
+			self.position(time), self.box(time))[index]
+			for time in time1])
+
 	def d2min(self, time0, time1, *particle):
 		"""
-		Returns nonaffine squared displacement computed by OVITO (see
-		https://ovito.org/manual/particles.modifiers.atomic_strain.html and
-		https://ovito.org/manual/python/modules/ovito_modifiers.html) between
-		frames 'time0' and 'time1'.
+		Returns nonaffine squared displacement between frames 'time0' and
+		'time1', from the local affine fit of particles' neighbourhoods within
+		self.strain_r_cut in frame 'time0'.
+		(see active_particles.analysis.strain.AtomicStrain.d2min)
 
 		Parameters
 		----------
 		time0 : int
 			Initial frame index.
-		time1 : int
+		time1 : int or int array-like
 			Final frame index.
+			NOTE: if time1 is array-like, nonaffine squared displacements at
+			      each of these frames are returned.
 
 		Optional positional arguments
 		-----------------------------
@@ -560,31 +1824,24 @@ class Gsd(HOOMDTrajectory):
 			'time1'.
 		"""
 
-		self.node.modifiers.clear()											# clear modification pipeline
-		self.node.modifiers.append(
-			AtomicStrainModifier(
-				output_nonaffine_squared_displacements=True,
-				reference_frame=self.prep_frames + time0))					# add AtomicStrainModifier modifier to modification pipeline
-		self.node.modifiers[-1].reference.load(self.filename)				# load trajectory file as reference
-		self.node_out = self.node.compute(frame=self.prep_frames + time1)	# compute d2min
-
-		d2min = self.node_out['Nonaffine Squared Displacement'].array	# array of nonaffine squared displacement
-		if particle == (): return d2min									# returns all nonaffine squared displacement
-		return np.array(itemgetter(*particle)(d2min))					# non affine square displacements
+		return self.strain_quantity('d2min', time0, time1, *particle)
 
 	def strain_tensor(self, time0, time1, *particle):
 		"""
-		Returns strain tensors computed by OVITO (see
-		https://ovito.org/manual/particles.modifiers.atomic_strain.html and
-		https://ovito.org/manual/python/modules/ovito_modifiers.html) between
-		frames 'time0' and 'time1'.
+		Returns Green-Lagrangian strain tensors between frames 'time0' and
+		'time1', with components XX, YY, ZZ, XY, XZ, YZ, from the local affine
+		fit of particles' neighbourhoods within self.strain_r_cut in frame
+		'time0'.
+		(see active_particles.analysis.strain.AtomicStrain.strain_tensor)
 
 		Parameters
 		----------
 		time0 : int
 			Initial frame index.
-		time1 : int
+		time1 : int or int array-like
 			Final frame index.
+			NOTE: if time1 is array-like, strain tensors at each of these
+			      frames are returned.
 
 		Optional positional arguments
 		-----------------------------
@@ -597,17 +1854,7 @@ class Gsd(HOOMDTrajectory):
 			Array of strain tensors between frames 'time0' and 'time1'.
 		"""
 
-		self.node.modifiers.clear()											# clear modification pipeline
-		self.node.modifiers.append(
-			AtomicStrainModifier(
-				output_strain_tensors=True,
-				reference_frame=self.prep_frames + time0))					# add AtomicStrainModifier modifier to modification pipeline
-		self.node.modifiers[-1].reference.load(self.filename)				# load trajectory file as reference
-		self.node_out = self.node.compute(frame=self.prep_frames + time1)	# compute d2min
-
-		strain_tensor = self.node_out['Strain Tensor'].array	# array of strain tensors
-		if particle == (): return strain_tensor					# returns all strain tensors
-		return np.array(itemgetter(*particle)(strain_tensor))	# strain tensors
+		return self.strain_quantity('strain_tensor', time0, time1, *particle)
 
 	def xy_strain(self, time0, time1, *particle):
 		"""
@@ -617,7 +1864,7 @@ class Gsd(HOOMDTrajectory):
 		----------
 		time0 : int
 			Initial frame index.
-		time1 : int
+		time1 : int or int array-like
 			Final frame index.
 
 		Optional positional arguments
@@ -631,21 +1878,23 @@ class Gsd(HOOMDTrajectory):
 			Array of xy-strain between frames 'time0' and 'time1'.
 		"""
 
-		return self.strain_tensor(time0, time1, *particle)[:, 3]
+		return self.strain_tensor(time0, time1, *particle)[..., 3]
 
 	def shear_strain(self, time0, time1, *particle):
 		"""
-		Returns shear strain computed by OVITO (see
-		https://ovito.org/manual/particles.modifiers.atomic_strain.html and
-		https://ovito.org/manual/python/modules/ovito_modifiers.html) between
-		frames 'time0' and 'time1'.
+		Returns von Mises shear strain between frames 'time0' and 'time1',
+		from the local affine fit of particles' neighbourhoods within
+		self.strain_r_cut in frame 'time0'.
+		(see active_particles.analysis.strain.AtomicStrain.shear_strain)
 
 		Parameters
 		----------
 		time0 : int
 			Initial frame index.
-		time1 : int
+		time1 : int or int array-like
 			Final frame index.
+			NOTE: if time1 is array-like, shear strains at each of these
+			      frames are returned.
 
 		Optional positional arguments
 		-----------------------------
@@ -654,17 +1903,805 @@ class Gsd(HOOMDTrajectory):
 
 		Returns
 		-------
-		xy_strain : float Numpy array
-			Array of xy-strain between frames 'time0' and 'time1'.
+		shear_strain : float Numpy array
+			Array of shear strain between frames 'time0' and 'time1'.
+		"""
+
+		return self.strain_quantity('shear_strain', time0, time1, *particle)
+
+class GsdUnwrapped:
+	"""
+	This class reads unwrapped trajectories from .gsd files, with the reading
+	methods of active_particles.dat.Dat, so that no separate unwrapped
+	trajectory .dat file is needed.
+
+	Unwrapped positions are computed for all particles and frames at once from
+	wrapped positions, periodic image flags and box dimensions, read as single
+	data chunks from the .gsd file (see active_particles.dat.Gsd.chunk). With
+	box lengths Lx, Ly, Lz and tilt factors xy, xz, yz, the unwrapped position
+	of a particle at wrapped position r with image flags (ix, iy, iz) is
+		r + ix (Lx, 0, 0) + iy (xy Ly, Ly, 0) + iz (xz Lz, yz Lz, Lz).
+
+	NOTE: Velocities are read from the .gsd file.
+	"""
+
+	def __init__(self, file, prep_frames=0, dimensions=2,
+		cache_memory=_cache_memory):
+		"""
+		Parameters
+		----------
+		file : file object or active_particles.dat.Gsd
+			Trajectory file (.gsd), or wrapped trajectory object whose cached
+			chunks are then shared.
+			NOTE: If file is a wrapped trajectory object, other parameters are
+			      ignored.
+		prep_frames : int
+			Number of frames to ignore at beginning of .gsd file. (default: 0)
+		dimensions : int
+			Dimension of space. (default: 2)
+		cache_memory : int
+			Maximum memory in bytes of cached snapshots and chunks.
+			DEFAULT: active_particles.dat._cache_memory
+		"""
+
+		self.w_traj = file if isinstance(file, Gsd) else Gsd(file,
+			prep_frames=prep_frames, dimensions=dimensions,
+			cache_memory=cache_memory)	# wrapped trajectory object
+
+		self.filename = self.w_traj.filename	# file name
+		self.N = self.w_traj.N()				# number of particles
+		self.dimensions = self.w_traj.dimensions
+
+	def __enter__(self):
+		"""
+		Returns self.
+		"""
+
+		return self
+
+	def __exit__(self, exc_type, exc_value, traceback):
+		"""
+		Nothing is buffered, so nothing has to be done when exiting.
 		"""
 
-		self.node.modifiers.clear()											# clear modification pipeline
-		self.node.modifiers.append(
-			AtomicStrainModifier(
-				reference_frame=self.prep_frames + time0))					# add AtomicStrainModifier modifier to modification pipeline
-		self.node.modifiers[-1].reference.load(self.filename)				# load trajectory file as reference
-		self.node_out = self.node.compute(frame=self.prep_frames + time1)	# compute d2min
+		pass
+
+	def close(self):
+		"""
+		Closes .gsd file of wrapped trajectory object.
+		"""
+
+		self.w_traj.close()
+
+	def count_frames(self):
+		"""
+		Returns number of frames following preparation frames in .gsd file.
+
+		Returns
+		-------
+		frames : int
+			Number of frames.
+		"""
+
+		return len(self.w_traj) - self.w_traj.prep_frames
+
+	def lattice(self, frames):
+		"""
+		Returns lattice vectors of system box at frames 'frames'.
+
+		Parameters
+		----------
+		frames : int Numpy array
+			Frame indexes.
+
+		Returns
+		-------
+		lattice : (len(frames), self.dimensions, self.dimensions) float Numpy array
+			Lattice vectors, lattice[:, i] being the box vector along which
+			image flags along axis i count.
+		"""
+
+		boxes = np.array([self.w_traj.chunk(time, 'configuration/box',
+			lambda snapshot: snapshot.configuration.box) for time in frames],
+			dtype=float).reshape((len(frames), 6))	# box dimensions Lx, Ly, Lz, xy, xz, yz
+		Lx, Ly, Lz, xy, xz, yz = boxes.T
+
+		lattice = np.zeros((len(frames), 3, 3))
+		lattice[:, 0, 0] = Lx
+		lattice[:, 1, 0], lattice[:, 1, 1] = xy*Ly, Ly
+		lattice[:, 2, 0], lattice[:, 2, 1], lattice[:, 2, 2] = xz*Lz, yz*Lz, Lz
+		return lattice[:, :self.dimensions, :self.dimensions]
+
+	def variables(self, frames, *particle, variable='position'):
+		"""
+		Returns array of variable at frames 'frames'.
+
+		Parameters
+		----------
+		frames : int array-like or slice
+			Frame indexes.
+		variable : string
+			Name of variable: 'position' for unwrapped positions, or
+			'velocity'.
+
+		Optional positional arguments
+		-----------------------------
+		particle : int
+			Particle index.
+			When called with particle indexes, function returns array of
+			particles' variable at frames 'frames' in the same order.
+
+		Returns
+		-------
+		arr : (len(frames), *, self.dimensions) float Numpy array
+			Array of variable at frames 'frames'.
+		"""
+
+		if isinstance(frames, slice):
+			frames = np.arange(self.count_frames())[frames]	# frames in slice
+		frames = np.array(frames, dtype=int, ndmin=1)
+
+		if variable == 'velocity':
+			return np.asarray(self.w_traj.velocities(frames, *particle),
+				dtype=float)
+
+		positions = np.array(self.w_traj.positions(frames, *particle),
+			dtype=float)	# wrapped positions
+		images = self.w_traj.chunks(frames, 'particles/image',
+			lambda snapshot: snapshot.particles.image, *particle)	# periodic image flags
+		return positions + np.matmul(images, self.lattice(frames))
+
+	def variable(self, time, *particle, variable='position'):
+		"""
+		Returns array of variable at frame 'time'.
+		(see active_particles.dat.GsdUnwrapped.variables)
+
+		Parameters
+		----------
+		time : int
+			Frame index.
+		variable : string
+			Name of variable: 'position' for unwrapped positions, or
+			'velocity'.
+
+		Optional positional arguments
+		-----------------------------
+		particle : int
+			Particle index.
+			When called with particle indexes, function returns array of
+			particles' variable at frame 'time' in the same order.
+
+		Returns
+		-------
+		arr : float Numpy array
+			Array of variable at frame 'time'.
+		"""
+
+		return self.variables(time, *particle, variable=variable)[0]
+
+	def positions(self, frames, *particle):
+		"""
+		Returns array of unwrapped positions at frames 'frames'.
+		(see active_particles.dat.GsdUnwrapped.variables)
+
+		Parameters
+		----------
+		frames : int array-like or slice
+			Frame indexes.
+
+		Optional positional arguments
+		-----------------------------
+		particle : int
+			Particle index.
+			When called with particle indexes, function returns array of
+			particles' position at frames 'frames' in the same order.
+
+		Returns
+		-------
+		arr : (len(frames), *, self.dimensions) float Numpy array
+			Array of unwrapped positions at frames 'frames'.
+		"""
+
+		return self.variables(frames, *particle, variable='position')
+
+	def velocities(self, frames, *particle):
+		"""
+		Returns array of velocities at frames 'frames'.
+		(see active_particles.dat.GsdUnwrapped.variables)
+
+		Parameters
+		----------
+		frames : int array-like or slice
+			Frame indexes.
+
+		Optional positional arguments
+		-----------------------------
+		particle : int
+			Particle index.
+			When called with particle indexes, function returns array of
+			particles' velocity at frames 'frames' in the same order.
+
+		Returns
+		-------
+		arr : (len(frames), *, self.dimensions) float Numpy array
+			Array of velocities at frames 'frames'.
+		"""
+
+		return self.variables(frames, *particle, variable='velocity')
+
+	def position(self, time, *particle):
+		"""
+		Returns array of unwrapped position at frame 'time'.
+		(see active_particles.dat.GsdUnwrapped.variable)
+
+		Parameters
+		----------
+		time : int
+			Frame index.
+
+		Optional positional arguments
+		-----------------------------
+		particle : int
+			Particle index.
+			When called with particle indexes, function returns array of
+			particles' position at frame 'time' in the same order.
+
+		Returns
+		-------
+		arr : float Numpy array
+			Array of unwrapped position at frame 'time'.
+		"""
+
+		return self.variable(time, *particle, variable='position')
+
+	def velocity(self, time, *particle):
+		"""
+		Returns array of velocity at frame 'time'.
+		(see active_particles.dat.GsdUnwrapped.variable)
+
+		Parameters
+		----------
+		time : int
+			Frame index.
+
+		Optional positional arguments
+		-----------------------------
+		particle : int
+			Particle index.
+			When called with particle indexes, function returns array of
+			particles' velocity at frame 'time' in the same order.
+
+		Returns
+		-------
+		arr : float Numpy array
+			Array of velocity at frame 'time'.
+		"""
+
+		return self.variable(time, *particle, variable='velocity')
+
+	def displacement(self, time0, time1, *particle):
+		"""
+		Returns array of displacement between times 'time0' and 'time1'.
+		(see active_particles.dat.GsdUnwrapped.positions)
+
+		Parameters
+		----------
+		time0 : int
+			Initial frame index.
+		time1 : int
+			Final frame index.
+
+		Optional positional arguments
+		-----------------------------
+		particle : int
+			Particle index.
+			When called with particle indexes, function returns array of
+			particles' displacement between frames 'time0' and 'time1' in the
+			same order.
+
+		Returns
+		-------
+		arr : float Numpy array
+			Array of displacement between frames 'time0' and 'time1'.
+		"""
+
+		positions = self.positions([time0, time1], *particle)
+		return positions[1] - positions[0]
+
+class Store:
+	"""
+	Chunked trajectory store, saved as a HDF5 file (requires h5py package) or
+	as a Zarr directory (requires zarr package) when its name ends with
+	'.zarr'.
+
+	The store holds, for all frames following preparation frames, the
+	datasets:
+	'wrapped' : (frames, N, dimensions) wrapped positions,
+	'unwrapped' : (frames, N, dimensions) unwrapped positions,
+	'velocity' : (frames, N, dimensions) velocities,
+	'diameter' : (frames, N) diameters,
+	'box_size' : (frames,) lengths of system box in first direction,
+	'box' : (frames, 3) lengths Lx, Ly and tilt factor xy of system box,
+	chunked in both frames and particles, so that slabs of consecutive frames
+	and particles are read without decoding whole snapshots.
+	(see active_particles.dat.store_trajectories)
+
+	This class exposes the reading methods of both
+	active_particles.dat.Gsd and active_particles.dat.Dat, with positions
+	either wrapped or unwrapped.
+	"""
+
+	def __init__(self, store_file, unwrapped=False, mode='r',
+		strain_r_cut=_r_cut):
+		"""
+		Parameters
+		----------
+		store_file : string
+			Store file name.
+		unwrapped : bool
+			Positions read with position and positions methods are unwrapped.
+			NOTE: Displacements are always computed from unwrapped positions.
+			DEFAULT: False
+		mode : string
+			Opening mode of the store.
+			DEFAULT: 'r'
+		strain_r_cut : float
+			Cut-off radius for neighbours in local affine fits of nonaffine
+			squared displacements and strain tensors.
+			(see active_particles.analysis.strain.AtomicStrain)
+			DEFAULT: active_particles.analysis.strain._r_cut
+		"""
+
+		self.filename = store_file	# store file name
+		self.store = _open_store(store_file, mode)	# HDF5 file or Zarr group
+
+		self.N = int(self.store.attrs['N'])						# number of particles
+		self.dimensions = int(self.store.attrs['dimensions'])	# dimension of space
+		self.unwrapped = unwrapped
+		self.position_dataset = 'unwrapped' if unwrapped else 'wrapped'	# name of positions dataset
+
+		self.strain_r_cut = strain_r_cut
+		self.strain_reference = (None, None)	# last reference frame and atomic strain object
+
+	def __enter__(self):
+		"""
+		Returns self.
+		"""
+
+		return self
+
+	def __exit__(self, exc_type, exc_value, traceback):
+		"""
+		Closes store.
+		"""
+
+		self.close()
+
+	def __len__(self):
+		"""
+		Returns number of frames in store.
+		"""
+
+		return self.store['box_size'].shape[0]
+
+	def close(self):
+		"""
+		Closes HDF5 file.
+		"""
+
+		if hasattr(self.store, 'close'): self.store.close()
+
+	def count_frames(self):
+		"""
+		Returns number of frames in store.
+		(see active_particles.dat.Dat.count_frames)
+
+		Returns
+		-------
+		frames : int
+			Number of frames.
+		"""
+
+		return len(self)
+
+	def read(self, dataset, frames, *particle):
+		"""
+		Returns array of dataset 'dataset' at frames 'frames'.
+
+		Frames are read by runs of consecutive frames, and particles as the
+		smallest range containing all particles, so that only chunks
+		containing these frames and particles are decoded.
+
+		Parameters
+		----------
+		dataset : string
+			Name of dataset.
+		frames : int array-like or slice
+			Frame indexes.
+
+		Optional positional arguments
+		-----------------------------
+		particle : int
+			Particle index.
+			When called with particle indexes, function returns array of
+			particles' values at frames 'frames' in the same order.
+
+		Returns
+		-------
+		arr : (len(frames), *) Numpy array
+			Array of dataset at frames 'frames', in the order of 'frames'.
+		"""
+
+		data = self.store[dataset]
+
+		if isinstance(frames, slice):
+			frames = np.arange(len(self))[frames]	# frames in slice
+		frames = np.array(frames, dtype=int, ndmin=1) % len(self)
+		sorted_frames, order = np.unique(frames, return_inverse=True)	# sorted frames, and indexes to retrieve input order
+		runs = np.split(sorted_frames,
+			np.flatnonzero(np.diff(sorted_frames) != 1) + 1)			# runs of consecutive frames
+
+		index = _particles_index(particle)	# particles' index
+		if isinstance(index, slice):
+			start, stop, step = index.indices(self.N)
+			particles, index = slice(start, stop), slice(None, None, step)
+		else:
+			index = index % self.N
+			particles = slice(np.min(index), np.max(index) + 1)
+			index = index - particles.start	# particles' index in read range
+
+		arr = np.concatenate([
+			np.asarray(data[run[0]:run[-1] + 1, particles])[:, index]
+			for run in runs])
+
+		if (order == np.arange(len(frames))).all(): return arr	# frames were already sorted and unique
+		return arr[np.reshape(order, (len(frames),))]
+
+	def position(self, time, *particle, **kwargs):
+		"""
+		Returns array of position at frame 'time'.
+
+		Parameters
+		----------
+		time : int
+			Frame index.
+
+		Optional positional arguments
+		-----------------------------
+		particle : int
+			Particles indexes.
+			When called with particles indexes, function returns array of
+			particles' position at frame 'time' in the same order.
+
+		Optional keyword arguments
+		--------------------------
+		centre : (self.dimensions,) array
+			Define new centre position.
+
+		Returns
+		-------
+		positions : float Numpy array
+			Array of positions at frame 'time'.
+		"""
+
+		positions = self.read(self.position_dataset, time, *particle)[0]	# positions at frame time
+
+		if 'centre' in kwargs:
+			return relative_positions(positions, kwargs['centre'],
+				self.box_size(time))	# positions with centre as centre
+		return positions
+
+	def positions(self, frames, *particle):
+		"""
+		Returns array of positions at frames 'frames'.
+		(see active_particles.dat.Store.read)
+
+		Parameters
+		----------
+		frames : int array-like or slice
+			Frame indexes.
+
+		Optional positional arguments
+		-----------------------------
+		particle : int
+			Particle index.
+			When called with particle indexes, function returns array of
+			particles' position at frames 'frames' in the same order.
+
+		Returns
+		-------
+		arr : (len(frames), *, self.dimensions) float Numpy array
+			Array of positions at frames 'frames'.
+		"""
+
+		return self.read(self.position_dataset, frames, *particle)
+
+	def velocity(self, time, *particle):
+		"""
+		Returns array of velocity at frame 'time'.
+
+		Parameters
+		----------
+		time : int
+			Frame index.
+
+		Optional positional arguments
+		-----------------------------
+		particle : int
+			Particles indexes.
+			When called with particles indexes, function returns array of
+			particles' velocity at frame 'time' in the same order.
+
+		Returns
+		-------
+		velocities : float Numpy array
+			Array of velocities at frame 'time'.
+		"""
+
+		return self.read('velocity', time, *particle)[0]
+
+	def velocities(self, frames, *particle):
+		"""
+		Returns array of velocities at frames 'frames'.
+		(see active_particles.dat.Store.read)
+
+		Parameters
+		----------
+		frames : int array-like or slice
+			Frame indexes.
+
+		Optional positional arguments
+		-----------------------------
+		particle : int
+			Particle index.
+			When called with particle indexes, function returns array of
+			particles' velocity at frames 'frames' in the same order.
+
+		Returns
+		-------
+		arr : (len(frames), *, self.dimensions) float Numpy array
+			Array of velocities at frames 'frames'.
+		"""
+
+		return self.read('velocity', frames, *particle)
+
+	def displacement(self, time0, time1, *particle):
+		"""
+		Returns array of displacement between times 'time0' and 'time1',
+		computed from unwrapped positions.
+
+		Parameters
+		----------
+		time0 : int
+			Initial frame index.
+		time1 : int
+			Final frame index.
+
+		Optional positional arguments
+		-----------------------------
+		particle : int
+			Particle index.
+			When called with particle indexes, function returns array of
+			particles' displacement between frames 'time0' and 'time1' in the
+			same order.
+
+		Returns
+		-------
+		arr : float Numpy array
+			Array of displacement between frames 'time0' and 'time1'.
+		"""
+
+		positions = self.read('unwrapped', [time0, time1], *particle)	# unwrapped positions at frames time0 and time1
+		return positions[1] - positions[0]
+
+	def diameter(self, time, *particle):
+		"""
+		Returns array of diameter at frame 'time'.
+
+		Parameters
+		----------
+		time : int
+			Frame index.
+
+		Optional positional arguments
+		-----------------------------
+		particle : int
+			Particles indexes.
+			When called with particles indexes, function returns array of
+			particles' diameters at frame 'time' in the same order.
+
+		Returns
+		-------
+		diameters : float Numpy array
+			Array of diameters at frame 'time'.
+		"""
+
+		return self.read('diameter', time, *particle)[0]
+
+	def box_size(self, time=0):
+		"""
+		Returns length of system box in first direction at time 'time'.
+
+		Parameters
+		----------
+		time : int
+			Frame index. (default: 0)
+
+		Returns
+		-------
+		L : float
+			Length of system box in fist direction.
+		"""
+
+		return float(self.store['box_size'][int(time)])
+
+	def box(self, time=0):
+		"""
+		Returns lengths and tilt factor of possibly sheared system box at time
+		'time'.
+		(see active_particles.dat.Gsd.box)
+
+		NOTE: Boxes of stores without 'box' dataset are considered square.
+
+		Parameters
+		----------
+		time : int
+			Frame index. (default: 0)
+
+		Returns
+		-------
+		box : (3,) float Numpy array
+			Lengths Lx, Ly and tilt factor xy of system box.
+		"""
+
+		if not('box' in self.store):	# store without box tilt
+			L = self.box_size(time)
+			return np.array([L, L, 0.])
+		return np.array(self.store['box'][int(time)], dtype=float)
+
+	is_in_box = Gsd.is_in_box
+	to_grid = Gsd.to_grid
+	to_grids = Gsd.to_grids
+	to_2Dgrid_gaussian_filter = Gsd.to_2Dgrid_gaussian_filter
+	atomic_strain = Gsd.atomic_strain
+	strain_quantity = Gsd.strain_quantity
+	d2min = Gsd.d2min
+	strain_tensor = Gsd.strain_tensor
+	xy_strain = Gsd.xy_strain
+	shear_strain = Gsd.shear_strain
+
+def store_trajectories(store_file, wrap_file, unwrap_file, N=None,
+	prep_frames=0, element_type='d', frame_chunk=_store_frame_chunk,
+	particle_chunk=_store_particle_chunk):
+	"""
+	Imports wrapped (.gsd) and unwrapped (.dat) trajectory files into a
+	chunked trajectory store.
+	(see active_particles.dat.Store)
+
+	Trajectories are read and written by blocks of frame_chunk frames.
+
+	NOTE: Velocities are read from the unwrapped trajectory file.
+
+	Parameters
+	----------
+	store_file : string
+		Store file name.
+		NOTE: Store is saved as a Zarr directory if store_file ends with
+		      '.zarr', and as a HDF5 file otherwise.
+	wrap_file : file object
+		Wrapped trajectory file. (.gsd)
+	unwrap_file : file object or None
+		Unwrapped trajectory file. (.dat)
+		NOTE: if unwrap_file == None, unwrapped positions and velocities are
+		      read from the wrapped trajectory file.
+		      (see active_particles.dat.GsdUnwrapped)
+	N : int
+		Number of particles.
+		NOTE: if N == None, N is read from the unwrapped trajectory file
+		      header.
+		DEFAULT: None
+	prep_frames : int
+		Number of preparation frames in wrapped trajectory file.
+		DEFAULT: 0
+	element_type : packing format
+		Data type of stored positions, velocities, diameters and box sizes.
+		DEFAULT: double float
+	frame_chunk : int
+		Number of frames per chunk.
+		DEFAULT: active_particles.dat._store_frame_chunk
+	particle_chunk : int
+		Number of particles per chunk.
+		DEFAULT: active_particles.dat._store_particle_chunk
+	"""
+
+	w_traj = Gsd(wrap_file, prep_frames=prep_frames)	# wrapped trajectory object
+	u_traj = (Dat(unwrap_file, N) if unwrap_file != None
+		else GsdUnwrapped(w_traj))						# unwrapped trajectory object
+
+	N, dimensions = u_traj.N, w_traj.dimensions
+	frames = min(len(w_traj) - prep_frames, u_traj.count_frames())	# number of frames in both trajectories
+	chunks = (max(1, min(frame_chunk, frames)),
+		max(1, min(particle_chunk, N)))								# chunk shape in frames and particles
+
+	store = _open_store(store_file, 'w')
+	store.attrs['N'] = N
+	store.attrs['dimensions'] = dimensions
+	datasets = {name: _create_dataset(store, name, shape, chunks, element_type)
+		for name, shape in (
+			('wrapped', (frames, N, dimensions)),
+			('unwrapped', (frames, N, dimensions)),
+			('velocity', (frames, N, dimensions)),
+			('diameter', (frames, N)))}
+	datasets['box_size'] = _create_dataset(store, 'box_size', (frames,),
+		chunks[:1], element_type)
+	datasets['box'] = _create_dataset(store, 'box', (frames, 3),
+		chunks[:1], element_type)
+
+	for start in range(0, frames, chunks[0]):
+		block = range(start, min(start + chunks[0], frames))	# frames of block
+		datasets['wrapped'][block[0]:block[-1] + 1] = np.array(
+			[w_traj.position(time) for time in block])
+		datasets['diameter'][block[0]:block[-1] + 1] = np.array(
+			[w_traj.diameter(time) for time in block])
+		datasets['box_size'][block[0]:block[-1] + 1] = np.array(
+			[w_traj.box_size(time) for time in block])
+		datasets['box'][block[0]:block[-1] + 1] = np.array(
+			[w_traj.box(time) for time in block])
+		datasets['unwrapped'][block[0]:block[-1] + 1] =\
+			u_traj.positions(block)[..., :dimensions]
+		datasets['velocity'][block[0]:block[-1] + 1] =\
+			u_traj.velocities(block)[..., :dimensions]
+
+	if hasattr(store, 'close'): store.close()
+
+def _open_store(store_file, mode):
+	"""
+	Returns HDF5 file or Zarr group of store.
+
+	Parameters
+	----------
+	store_file : string
+		Store file name.
+		NOTE: Store is a Zarr directory if store_file ends with '.zarr', and a
+		      HDF5 file otherwise.
+	mode : string
+		Opening mode.
+
+	Returns
+	-------
+	store : h5py.File or zarr.Group
+		Store.
+	"""
+
+	if store_file.rstrip('/').endswith('.zarr'):
+		import zarr
+		return zarr.open_group(store_file, mode=mode)
+	import h5py
+	return h5py.File(store_file, mode)
+
+def _create_dataset(store, name, shape, chunks, dtype):
+	"""
+	Creates chunked dataset in store.
+
+	Parameters
+	----------
+	store : h5py.File or zarr.Group
+		Store.
+	name : string
+		Name of dataset.
+	shape : tuple
+		Shape of dataset.
+	chunks : tuple
+		Shape of chunks along first axes of dataset.
+	dtype : Numpy data type
+		Data type of dataset.
+
+	Returns
+	-------
+	dataset : h5py.Dataset or zarr.Array
+		Dataset.
+	"""
 
-		xy_strain = self.node_out['Shear Strain'].array		# array of strain tensors
-		if particle == (): return xy_strain					# returns all strain tensors
-		return np.array(itemgetter(*particle)(xy_strain))	# strain tensors
+	create = getattr(store, 'create_array', store.create_dataset)	# zarr >= 3 or h5py and zarr < 3
+	return create(name, shape=shape, dtype=np.dtype(dtype),
+		chunks=tuple(chunks) + tuple(shape[len(chunks):]))
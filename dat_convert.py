@@ -0,0 +1,77 @@
+"""
+Converts .dat trajectory file to .dat file with header, with chosen element
+data type and compression.
+(see active_particles.dat.Dat)
+
+Script is called according to the following scheme:
+$ python dat_convert.py [INPUT FILE] [OUTPUT FILE]
+
+Environment parameters
+----------------------
+N : int
+    Number of particles.
+    NOTE: N is required for input files without header (version 1) and is
+          otherwise read from the input file header. If N is not given for an
+          input file without header, it is read from the parameters file
+          active_particles.naming.parameters_file in the input file directory.
+ELEMENT_TYPE : packing format
+    Packing format of elements in output file.
+    DEFAULT: element packing format of input file
+COMPRESSION : string
+    Compression codec of output file: 'zlib', 'zstd' (requires zstandard
+    package) or 'blosc' (requires blosc package).
+    NOTE: Output file is not compressed if COMPRESSION is not set.
+    DEFAULT: None
+CHUNK_FRAMES : int
+    Number of frames per compressed chunk in output file, and number of
+    frames buffered before writing to uncompressed output file.
+    DEFAULT: active_particles.dat._chunk_frames
+"""
+
+import sys
+import pickle
+from active_particles.init import get_env
+from active_particles.naming import parameters_file
+from active_particles.dat import Dat, _dat_magic, _chunk_frames
+from os.path import join as joinpath, dirname, abspath
+
+
+try:
+    input_file, output_file = sys.argv[1], sys.argv[2]
+except IndexError:  # sys.argv[1] or sys.argv[2] does not exist
+    print('Input and output file names are required.')
+    sys.exit()
+
+try:
+    with open(input_file, 'rb') as input_dat:
+        has_header = input_dat.read(len(_dat_magic)) == _dat_magic
+except FileNotFoundError:   # input file not found
+    print('Input file %s not found.' % input_file)
+    sys.exit()
+
+N = get_env('N', vartype=int)   # number of particles
+if N == None and not(has_header):
+    try:
+        with open(joinpath(dirname(abspath(input_file)), parameters_file),
+            'rb') as param_file:
+            N = pickle.load(param_file)['N']
+    except FileNotFoundError:   # parameters file not found
+        print('Number of particles N is required for file without header.')
+        sys.exit()
+
+with open(input_file, 'rb') as input_dat:
+    input_traj = Dat(input_dat, N, read_type=None)  # input trajectory
+    element_type = get_env('ELEMENT_TYPE', default=input_traj.element_type,
+        vartype=str)                                # output elements packing format
+    compression = get_env('COMPRESSION', vartype=str)   # output compression codec
+    chunk_frames = get_env('CHUNK_FRAMES', default=_chunk_frames,
+        vartype=int)                                    # number of frames per compressed chunk
+
+    with open(output_file, 'wb') as output_dat, Dat(output_dat,
+        input_traj.N, element_type=element_type, version=2,
+        compression=compression, chunk_frames=chunk_frames,
+        buffer_frames=chunk_frames) as output_traj:
+        for time in range(input_traj.count_frames()):
+            output_traj.dump(
+                input_traj.variable(time, variable='position'),
+                input_traj.variable(time, variable='velocity'))
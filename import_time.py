@@ -0,0 +1,89 @@
+"""
+Measures time to import active_particles modules in fresh Python interpreters,
+and fails if it exceeds a time budget.
+
+Heavy backends (matplotlib, scipy submodules, kernel density estimation
+packages, ...) are loaded lazily (see active_particles.init.lazy_import), so
+that importing active_particles.dat should not import them.
+
+Script is called according to the following scheme:
+$ python import_time.py [MODULE NAME 1] ... [MODULE NAME n]
+
+Modules default to active_particles.dat if none is given. Exit status is 1 if
+the median import time of any module exceeds the budget, and 0 otherwise.
+
+Environment parameters
+----------------------
+IMPORT_TIME_BUDGET : float
+    Maximum median import time in seconds.
+    DEFAULT: active_particles.import_time._budget
+REPEATS : int
+    Number of fresh interpreters in which to time each import.
+    DEFAULT: active_particles.import_time._repeats
+"""
+
+import sys
+import subprocess
+import numpy as np
+from active_particles.init import get_env
+
+# DEFAULT VARIABLES
+
+_budget = 0.5   # default maximum median import time in seconds
+_repeats = 5    # default number of fresh interpreters per module
+
+_heavy = ('matplotlib', 'scipy.interpolate', 'scipy.spatial', 'scipy.optimize',
+    'KDEpy', 'statsmodels', 'fastkde')  # heavy backends which should be loaded lazily
+
+_timer = """
+import sys, time
+t0 = time.perf_counter()
+import %s
+print(time.perf_counter() - t0)
+print(' '.join(module for module in %s if module in sys.modules))
+"""     # code to run in fresh interpreter to time import and list heavy backends loaded
+
+def import_time(module):
+    """
+    Returns time to import module in a fresh Python interpreter, and heavy
+    backends loaded by this import.
+
+    Parameters
+    ----------
+    module : string
+        Module name.
+
+    Returns
+    -------
+    time : float
+        Import time in seconds.
+    loaded : list of string
+        Heavy backends loaded.
+    """
+
+    output = subprocess.run([sys.executable, '-c', _timer % (module, _heavy)],
+        stdout=subprocess.PIPE, check=True, universal_newlines=True
+        ).stdout.split('\n')
+    return float(output[0]), output[1].split()
+
+if __name__ == '__main__':  # executing as script
+
+    modules = sys.argv[1:] or ['active_particles.dat']  # modules to time
+
+    budget = get_env('IMPORT_TIME_BUDGET', default=_budget, vartype=float)   # maximum median import time
+    repeats = get_env('REPEATS', default=_repeats, vartype=int)              # number of fresh interpreters per module
+
+    exceeded = False    # budget exceeded by any module
+    for module in modules:
+        times, loaded = [], set()
+        for repeat in range(repeats):
+            time, heavy = import_time(module)
+            times += [time]
+            loaded |= set(heavy)
+        median = np.median(times)
+        exceeded = exceeded or median > budget
+        print('%s: %.3f s (budget: %.3f s)%s%s' % (module, median, budget,
+            ' EXCEEDED' if median > budget else '',
+            (' loaded: %s' % ' '.join(sorted(loaded))) if loaded else ''))
+
+    sys.exit(int(exceeded))
@@ -13,6 +13,8 @@ import sys
 
 import atexit
 
+import importlib
+
 import pickle
 
 from collections import OrderedDict
@@ -126,6 +128,68 @@ def get_env_list(var_name, delimiter=':', default=None, vartype=str):
         envvar[var_name].split(delimiter)
         ))
 
+def get_env_times(var_name, tot_frames, delimiter=':'):
+    """
+    Returns sorted list of lag times from environment variable, which can be
+    a list of lag times delimited with delimiter
+        (e.g., '1:2:5:10'),
+    or a specification of lag times linearly or logarithmically spaced
+        'lin:[minimum lag time]:[maximum lag time]:[number of lag times]'
+        (e.g., 'lin:10:100:10'),
+        'log:[minimum lag time]:[maximum lag time]:[number of lag times]'
+        (e.g., 'log:1:1000:20').
+    NOTE: Lag times dt <= 0 are interpreted as tot_frames + dt.
+    NOTE: Linearly or logarithmically spaced lag times are rounded to the
+    nearest integers.
+    NOTE: Lag times have to be between 1 and tot_frames - 1, so that
+    displacements are computed within the tot_frames frames.
+    NOTE: Returns empty list if the environment variable does not exist or is
+    an empty string.
+
+    Parameters
+    ----------
+    var_name : string
+        Name of environment variable.
+    tot_frames : int
+        Number of frames to which lag times dt <= 0 are relative.
+    delimiter : string
+        Pattern which delimits values in environment variable.
+        (default: ':')
+
+    Returns
+    -------
+    lag_times : list of int
+        Sorted lag times without duplicates.
+
+    Raises
+    ------
+    ValueError
+        If a lag time is not between 1 and tot_frames - 1.
+    """
+
+    values = get_env_list(var_name, delimiter=delimiter)
+    if values == []: return []
+
+    relative = lambda dt: tot_frames + dt if dt <= 0 else dt   # lag time relative to tot_frames if dt <= 0
+
+    if values[0] in ('lin', 'log'):
+        dt_min, dt_max = map(lambda dt: relative(int(dt)), values[1:3])
+        number = int(values[3])
+        if values[0] == 'lin':
+            lag_times = np.linspace(dt_min, dt_max, number)
+        else:
+            lag_times = np.exp(np.linspace(np.log(dt_min), np.log(dt_max),
+                number))
+        lag_times = np.round(lag_times).astype(int)
+    else: lag_times = list(map(lambda dt: relative(int(dt)), values))
+
+    lag_times = sorted(set(map(int, lag_times)))
+    out_of_range = [dt for dt in lag_times if dt < 1 or dt >= tot_frames]
+    if out_of_range: raise ValueError(
+        '%s: lag times %s are not between 1 and %i (number of frames - 1).'
+        % (var_name, out_of_range, tot_frames - 1))
+    return lag_times
+
 class StdOut:
     """
     Enables to set output stream to file and revert this setting.
@@ -328,3 +392,93 @@ def linframes(init_frame, tot_frames, max_frames):
         int,
         np.linspace(init_frame, tot_frames - 1, max_frames, dtype=int)
         ))))
+
+_before_import = {} # functions to call before importing lazily imported modules
+
+class LazyImport:
+    """
+    Proxy of a module, or of an attribute of a module, which is only imported
+    on first use.
+    (see active_particles.init.lazy_import)
+    """
+
+    def __init__(self, module, attribute=None):
+        """
+        Parameters
+        ----------
+        module : string
+            Module name.
+        attribute : string
+            Name of attribute of module.
+            NOTE: if attribute == None, proxy of the module itself.
+            DEFAULT: None
+        """
+
+        self.__dict__['_module'] = module
+        self.__dict__['_attribute'] = attribute
+
+    def _load(self):
+        """
+        Imports module, calling functions registered to be called before its
+        import, and returns module or attribute.
+
+        Returns
+        -------
+        object : module or *
+            Module or attribute of module.
+        """
+
+        if not(self._module in sys.modules):
+            for function in _before_import.pop(self._module, []): function()
+        module = importlib.import_module(self._module)
+        if self._attribute == None: return module
+        return getattr(module, self._attribute)
+
+    def __getattr__(self, name):
+        return getattr(self._load(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self._load(), name, value)
+
+    def __call__(self, *args, **kwargs):
+        return self._load()(*args, **kwargs)
+
+def lazy_import(module, attribute=None, before_import=None):
+    """
+    Returns proxy of module 'module', or of its attribute 'attribute', which
+    imports module on first use, so that heavy dependencies are only loaded
+    by code which actually needs them.
+
+    Parameters
+    ----------
+    module : string
+        Module name.
+    attribute : string
+        Name of attribute of module.
+        NOTE: if attribute == None, proxy of the module itself is returned.
+        DEFAULT: None
+    before_import : function
+        Function to call before module is imported, by any proxy.
+        (e.g., to select matplotlib backend before importing
+        matplotlib.pyplot)
+        DEFAULT: None
+
+    Returns
+    -------
+    proxy : active_particles.init.LazyImport
+        Proxy of module or attribute.
+    """
+
+    if before_import != None:
+        _before_import.setdefault(module, []).append(before_import)
+    return LazyImport(module, attribute=attribute)
+
+def mpl_backend():
+    """
+    Selects non-interactive matplotlib backend Agg if environment variable
+    SHOW is not set to True, to avoid crash when launching without display.
+    """
+
+    if not(get_env('SHOW', default=False, vartype=bool)):
+        import matplotlib
+        matplotlib.use('Agg')
@@ -8,15 +8,19 @@ import math
 
 from operator import itemgetter
 
-from scipy import interpolate
+from active_particles.init import lazy_import
+
+interpolate = lazy_import('scipy.interpolate')
 
 from copy import deepcopy
 
 from itertools import product
-from functools import partial
+from functools import partial, lru_cache
 
 from multiprocessing import Pool
 
+_radius_map_cache_size = 16 # maximum number of radius maps cached by radial averaging functions
+
 def relative_positions(positions, point, box_size):
     """
     Returns relative positions to point in box of extent
@@ -75,36 +79,27 @@ def g2Dto1D(g2D, L):
 
     Parameters
     ----------
-    g2D : 2D array
+    g2D : (*, n0, n1) array-like
         2D grid.
         NOTE: g2D[0, 0] is considered the r=0 point on the grid, and we
         consider periodic boundaries.
+        NOTE: a batch of 2D grids, along first dimensions, is averaged in a
+        single call.
     L : float or float array
         Length of the box represented by the grid in one dimension or all
         dimensions.
 
     Returns
     -------
-    g1D : Numpy array
+    g1D : (*, number of radii, 2) Numpy array
         Array of (r, g1D(r)) with g1D(r) the averaged 2D grid at radius r.
     """
 
-    g2D = np.array(g2D)
-    dL = np.array(L)/np.array(g2D.shape)    # boxes separation in each direction
-    r_max = np.min(L)/2                     # maximum radius to be calculated in number of boxes
-
-    g1D_dic = DictList()    # hash table of radii and values at radii
+    g2D = np.asarray(g2D)
+    radii, cells, starts, counts = _radius_map(g2D.shape[-2:],
+        tuple(np.array(L, dtype=float).flatten()))
 
-    for i in range(g2D.shape[0]):
-        for j in range(g2D.shape[1]):
-            radius = np.sqrt(np.sum((np.array((i, j))*dL)**2))  # radius corresponding to coordinates [i, j], [-i, j], [i, -j], [-i, -j]
-            if radius <= r_max:
-                g1D_dic[radius] += [g2D[i, j], g2D[-i, j], g2D[i, -j],
-                    g2D[-i, -j]]
-
-    return np.array(list(map(
-        lambda radius: [radius, np.mean(g1D_dic[radius])],
-        sorted(g1D_dic))))
+    return _radial_average(_fold(g2D), radii, cells, starts, 4*counts)
 
 def g2Dto1Dsquare(g2D, L):
     """
@@ -112,35 +107,27 @@ def g2Dto1Dsquare(g2D, L):
 
     Parameters
     ----------
-    g2D : 2D array
+    g2D : (*, n, n) array-like
         Square 2D grid.
         NOTE: g2D[0, 0] is considered the r=0 point on the grid, and we
         consider periodid boundaries.
+        NOTE: a batch of square 2D grids, along first dimensions, is averaged
+        in a single call.
     L : float
         Length of the box represented by the grid in one dimension.
 
     Returns
     -------
-    g1D : Numpy array
+    g1D : (*, number of radii, 2) Numpy array
         Array of (r, g1D(r)) with g1D(r) the averaged 2D grid at radius r.
     """
 
-    g2D = np.array(g2D)
-    dL = L/g2D.shape[0]             # boxes separation in each direction
-    sq_r_max = (g2D.shape[0]/2)**2  # maximum radius to be calculated in number of boxes
-
-    g1D_dic = DictList()    # hash table of radii and values at radii
+    g2D = np.asarray(g2D)
+    sqradii, cells, starts, counts = _sqradius_map(g2D.shape[-2:])
+    dL = L/g2D.shape[-2]    # boxes separation in each direction
 
-    for i in range(g2D.shape[0]):
-        for j in range(g2D.shape[1]):
-            sqradius = i**2 + j**2  # radius corresponding to coordinates [i, j], [-i, j], [i, -j], [-i, -j]
-            if sqradius <= sq_r_max:
-                g1D_dic[sqradius] += [g2D[i, j], g2D[-i, j], g2D[i, -j],
-                    g2D[-i, -j]]
-
-    return np.array(list(map(
-        lambda sqradius: [dL*np.sqrt(sqradius), np.mean(g1D_dic[sqradius])],
-        sorted(g1D_dic))))
+    return _radial_average(_fold(g2D), dL*np.sqrt(sqradii), cells, starts,
+        4*counts)
 
 def g2Dto1Dgrid(g2D, grid, average_grid=False):
     """
@@ -149,43 +136,219 @@ def g2Dto1Dgrid(g2D, grid, average_grid=False):
 
     Parameters
     ----------
-    g2D : 2D array
+    g2D : (*, n0, n1) array-like
         Square 2D grid.
-    grid : 2D array
+        NOTE: a batch of square 2D grids, along first dimensions, is averaged
+        in a single call.
+    grid : (n0, n1) array-like
         Array of radii.
     average_grid : bool
         Return g2D grid with cylindrically averaged values.
 
     Returns
     -------
-    g1D : Numpy array
+    g1D : (*, number of radii, 2) Numpy array
         Array of (r, g1D(r)) with g1D(r) the averaged 2D grid at radius r.
-    g2D_cylindrical [average_grid] : Numpy array
+    g2D_cylindrical [average_grid] : (*, n0, n1) Numpy array
         Cylindrically averaged g2D.
     """
 
-    g2D = np.array(g2D)
-    grid = np.array(grid)
-
-    g1D_dic = DictList()    # hash table of radii and values at radii
-
-    for i in range(g2D.shape[0]):
-        for j in range(g2D.shape[1]):
-            g1D_dic[grid[i, j]] += [g2D[i, j]]
+    g2D = np.asarray(g2D)
+    grid = np.ascontiguousarray(grid)
+    radii, cells, starts, counts, inverse = _grid_map(grid.shape,
+        grid.dtype.str, grid.tobytes())
 
-    g1D = np.array(list(map(
-        lambda radius: [radius, np.mean(g1D_dic[radius])],
-        sorted(g1D_dic))))
+    g1D = _radial_average(g2D, radii, cells, starts, counts)
 
     if not(average_grid): return g1D
 
-    g2D_cylindrical = np.zeros(grid.shape)
-    for radius, mean_g in zip(*np.transpose(g1D)):
-        for i, j in zip(*np.where(grid == radius)):
-            g2D_cylindrical[i, j] = mean_g
+    g2D_cylindrical = g1D[..., 1][..., inverse].reshape(
+        g1D.shape[:-2] + grid.shape)    # mean values at radii of grid cells
 
     return g1D, g2D_cylindrical
 
+@lru_cache(maxsize=_radius_map_cache_size)
+def _radius_map(shape, L):
+    """
+    Returns radii, and indexes of cells of grids with periodic boundaries
+    grouped by radius, for active_particles.maths.g2Dto1D.
+
+    Parameters
+    ----------
+    shape : (int, int) tuple
+        Shape of grids.
+    L : float tuple
+        Length of the box represented by grids in one dimension or all
+        dimensions.
+
+    Returns
+    -------
+    radii : float Numpy array
+        Sorted radii.
+    cells : int Numpy array
+        Indexes of flattened grid cells with radius lower than half the box
+        length, sorted by radius.
+    starts : int Numpy array
+        Offsets of radii in cells.
+    counts : int Numpy array
+        Number of cells at each radius.
+    """
+
+    dL = np.array(L)/np.array(shape)   # boxes separation in each direction
+    r_max = np.min(L)/2                 # maximum radius to be calculated
+
+    i, j = np.meshgrid(range(shape[0]), range(shape[1]), indexing='ij')
+    radius = np.sqrt((i*dL[0])**2 + (j*dL[1])**2)  # radius corresponding to coordinates [i, j], [-i, j], [i, -j], [-i, -j]
+
+    return _bins(radius, radius <= r_max)[:4]
+
+@lru_cache(maxsize=_radius_map_cache_size)
+def _sqradius_map(shape):
+    """
+    Returns square radii in number of boxes, and indexes of cells of square
+    grids with periodic boundaries grouped by radius, for
+    active_particles.maths.g2Dto1Dsquare.
+
+    Parameters
+    ----------
+    shape : (int, int) tuple
+        Shape of grids.
+
+    Returns
+    -------
+    sqradii : int Numpy array
+        Sorted square radii.
+    cells : int Numpy array
+        Indexes of flattened grid cells with radius lower than half the number
+        of boxes in one direction, sorted by radius.
+    starts : int Numpy array
+        Offsets of radii in cells.
+    counts : int Numpy array
+        Number of cells at each radius.
+    """
+
+    sq_r_max = (shape[0]/2)**2  # maximum radius to be calculated in number of boxes
+
+    i, j = np.meshgrid(range(shape[0]), range(shape[1]), indexing='ij')
+    sqradius = i**2 + j**2  # radius corresponding to coordinates [i, j], [-i, j], [i, -j], [-i, -j]
+
+    return _bins(sqradius, sqradius <= sq_r_max)[:4]
+
+@lru_cache(maxsize=_radius_map_cache_size)
+def _grid_map(shape, dtype, data):
+    """
+    Returns radii, and indexes of cells of grids grouped by radius, for
+    active_particles.maths.g2Dto1Dgrid.
+
+    Parameters
+    ----------
+    shape : int tuple
+        Shape of grid of radii.
+    dtype : string
+        Data type of grid of radii.
+    data : bytes
+        Grid of radii in C order.
+
+    Returns
+    -------
+    radii : Numpy array
+        Sorted radii.
+    cells : int Numpy array
+        Indexes of flattened grid cells, sorted by radius.
+    starts : int Numpy array
+        Offsets of radii in cells.
+    counts : int Numpy array
+        Number of cells at each radius.
+    inverse : int Numpy array
+        Indexes of radii of flattened grid cells.
+    """
+
+    grid = np.frombuffer(data, dtype=dtype).reshape(shape)
+    return _bins(grid, np.ones(shape, dtype=bool))
+
+def _bins(radius, mask):
+    """
+    Groups grid cells by radius.
+
+    Parameters
+    ----------
+    radius : 2D Numpy array
+        Radii of grid cells.
+    mask : 2D bool Numpy array
+        Grid cells to consider.
+
+    Returns
+    -------
+    radii : Numpy array
+        Sorted radii.
+    cells : int Numpy array
+        Indexes of flattened considered grid cells, sorted by radius.
+    starts : int Numpy array
+        Offsets of radii in cells.
+    counts : int Numpy array
+        Number of considered cells at each radius.
+    inverse : int Numpy array
+        Indexes of radii of flattened considered grid cells.
+    """
+
+    radii, inverse, counts = np.unique(radius[mask], return_inverse=True,
+        return_counts=True)
+    inverse = inverse.flatten()
+    cells = np.flatnonzero(mask)[np.argsort(inverse, kind='stable')]
+    starts = np.cumsum(counts) - counts
+
+    maps = (radii, cells, starts, counts, inverse)
+    for array in maps: array.setflags(write=False)  # cached maps are shared
+    return maps
+
+def _fold(g2D):
+    """
+    Returns sums of values of grids with periodic boundaries at coordinates
+    [i, j], [-i, j], [i, -j] and [-i, -j].
+
+    Parameters
+    ----------
+    g2D : (*, n0, n1) Numpy array
+        Grids.
+
+    Returns
+    -------
+    folded : (*, n0, n1) Numpy array
+        Folded grids.
+    """
+
+    minus_i = -np.arange(g2D.shape[-2])%g2D.shape[-2]
+    minus_j = -np.arange(g2D.shape[-1])%g2D.shape[-1]
+    return (g2D + g2D[..., minus_i, :] + g2D[..., :, minus_j]
+        + g2D[..., minus_i, :][..., :, minus_j])
+
+def _radial_average(g2D, radii, cells, starts, counts):
+    """
+    Returns averages of grids over cells at each radius.
+
+    Parameters
+    ----------
+    g2D : (*, n0, n1) Numpy array
+        Grids.
+    radii : Numpy array
+        Radii.
+    cells : int Numpy array
+        Indexes of flattened grid cells, sorted by radius.
+    starts : int Numpy array
+        Offsets of radii in cells.
+    counts : int Numpy array
+        Number of values at each radius.
+
+    Returns
+    -------
+    g1D : (*, number of radii, 2) Numpy array
+        Array of (r, g1D(r)) with g1D(r) the averaged grid at radius r.
+    """
+
+    values = g2D.reshape(g2D.shape[:-2] + (-1,))[..., cells]
+    means = np.add.reduceat(values, starts, axis=-1)/counts
+    return np.stack((np.broadcast_to(radii, means.shape), means), axis=-1)
+
 def normalise1D(*vector):
     """
     Returs 1D vector of unitary norm with same direction.
@@ -871,8 +1034,10 @@ def gaussian_smooth_1D(X, Y, sigma, *x):
     ----------
     X : array-like
         Input x-coordinates.
-    Y : array-like
+    Y : (*, len(X)) array-like
         Input y-coordinates.
+        NOTE: batches of y-coordinates, along first dimensions, are smoothed
+        in a single call.
     sigma : float
         Smoothing length scale.
         NOTE: if sigma == 0 or None, a linear interpolation is performed.
@@ -882,7 +1047,7 @@ def gaussian_smooth_1D(X, Y, sigma, *x):
 
     Returns
     -------
-    smoothedY : array-like
+    smoothedY : (*, len(x)) array-like
         Smoothed y-coordinates.
     """
 
@@ -896,15 +1061,10 @@ def gaussian_smooth_1D(X, Y, sigma, *x):
         return interpolate.interp1d(X, Y,
             kind='linear', fill_value='extrapolate')(x)
 
-    smoothing_function = lambda x: np.exp(-(x/sigma)**2)
-    smoothedY = np.empty(len(x))
-
-    for index in range(len(x)):
-        smoothing_coefficients = list(map(smoothing_function, X - x[index]))
-        smoothedY[index] =\
-            np.sum(Y*smoothing_coefficients)/np.sum(smoothing_coefficients)
+    smoothing_coefficients = np.exp(-((X - x[:, np.newaxis])/sigma)**2)    # smoothing coefficients of input x-coordinates for every output x-coordinate
 
-    return smoothedY
+    return (np.sum(Y[..., np.newaxis, :]*smoothing_coefficients, axis=-1)
+        /np.sum(smoothing_coefficients, axis=-1))
 
 def gaussian_smooth_2D(X, Y, Z, sigma, *xy):
     """
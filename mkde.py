@@ -8,7 +8,9 @@ import numpy as np
 
 import random
 
-import scipy.optimize as scop
+from active_particles.init import lazy_import
+
+scop = lazy_import('scipy.optimize')
 
 import ctypes
 
@@ -18,9 +20,10 @@ import subprocess
 
 # from multiprocessing import Pool
 
-from KDEpy import FFTKDE
+FFTKDE = lazy_import('KDEpy', 'FFTKDE')
 
-from statsmodels.nonparametric.kernel_density import KDEMultivariate
+KDEMultivariate = lazy_import('statsmodels.nonparametric.kernel_density',
+    'KDEMultivariate')
 
 # C EXTENSION
 
@@ -39,10 +42,23 @@ def compile():
         '-std=c99', '-fPIC', _c_ext_c_path],
         cwd=_dir_path)
 
-if (not(os.path.isfile(_c_ext_so_path))                                     # C extention shared object does not exist
-    or os.path.getctime(_c_ext_c_path) > os.path.getctime(_c_ext_so_path)   # C extension source .c file is more recent than shared object
-    or os.path.getctime(_c_ext_h_path) > os.path.getctime(_c_ext_so_path)): # C extension source .h file is more recent than shared object
-    compile()                                                               # compile C extension
+def c_ext():
+    """
+    Returns C extension shared library, compiling C extension first if it has
+    not been compiled since last modification of its sources.
+
+    Returns
+    -------
+    cmkde : ctypes.CDLL
+        C extension shared library.
+    """
+
+    if (not(os.path.isfile(_c_ext_so_path))                                     # C extention shared object does not exist
+        or os.path.getctime(_c_ext_c_path) > os.path.getctime(_c_ext_so_path)   # C extension source .c file is more recent than shared object
+        or os.path.getctime(_c_ext_h_path) > os.path.getctime(_c_ext_so_path)): # C extension source .h file is more recent than shared object
+        compile()                                                               # compile C extension
+
+    return ctypes.CDLL(_c_ext_so_path)
 
 class _MKDECExt:
     """
@@ -62,7 +78,7 @@ class _MKDECExt:
 
         # C EXTENSION
 
-        self.cmkde = ctypes.CDLL(_c_ext_so_path)    # C extension shared library
+        self.cmkde = c_ext()    # C extension shared library
 
         # DATA FOR COMMUNICATION WITH C EXTENSION
 
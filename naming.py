@@ -26,6 +26,7 @@ parameters_file = 'param.p'                     # simulation parameters file
 log_file = 'log-output.log'                     # simulation log output file
 wrapped_trajectory_file = 'trajectory.gsd'      # wrapped trajectory file (with periodic boundary conditions)
 unwrapped_trajectory_file = 'trajectory.dat'    # unwrapped trajectory file (without periodic boundary conditions)
+store_file = 'trajectory.h5'                    # chunked trajectory store (see active_particles.dat.Store)
 
 # GLOSSARY
 
@@ -433,17 +434,49 @@ class Ccc(_ShearStrainVorticity):
 
         super().__init__('Ccc', mode=mode)  # initialise with superclass
 
-class Cuu(_CorFile):
+class _DisplacementVariable(_CorFile):
+    """
+    Naming displacement variables correlation files.
+    """
+
+    def __init__(self, name, mode='grid'):
+        """
+        Architecture of file name.
+
+        Parameters
+        ----------
+        name : string
+            Generic name.
+        mode : string
+            Computation mode (default: grid).
+        """
+
+        self.mode = mode
+        if self.mode == 'pairs':    # calculation from pairs of particles
+            name += 'pairs'
+            ext_parameters = OrderedDict([('r_max', '_RMAX'),
+            ('Nbins', '_NBIN')])
+        else:                       # calculation from coarse-grained displacements
+            ext_parameters = OrderedDict()
+
+        super().__init__(name, ext_parameters=ext_parameters)   # initialise with superclass
+
+class Cuu(_DisplacementVariable):
     """
     Naming displacement correlation files.
     """
 
-    def __init__(self):
+    def __init__(self, mode='grid'):
         """
         Architecture of file name.
+
+        Parameters
+        ----------
+        mode : string
+            Computation mode (default: grid).
         """
 
-        super().__init__('Cuu')  # initialise with superclass
+        super().__init__('Cuu', mode=mode)  # initialise with superclass
 
 class Cnn(_CorFile):
     """
@@ -457,42 +490,57 @@ class Cnn(_CorFile):
 
         super().__init__('Cnn')  # initialise with superclass
 
-class Cww(_CorFile):
+class Cww(_DisplacementVariable):
     """
     Naming displacement relative to centre of mass displacement correlation
     files.
     """
 
-    def __init__(self):
+    def __init__(self, mode='grid'):
         """
         Architecture of file name.
+
+        Parameters
+        ----------
+        mode : string
+            Computation mode (default: grid).
         """
 
-        super().__init__('Cww')  # initialise with superclass
+        super().__init__('Cww', mode=mode)  # initialise with superclass
 
-class Cdd(_CorFile):
+class Cdd(_DisplacementVariable):
     """
     Naming displacement norm correlation files.
     """
 
-    def __init__(self):
+    def __init__(self, mode='grid'):
         """
         Architecture of file name.
+
+        Parameters
+        ----------
+        mode : string
+            Computation mode (default: grid).
         """
 
-        super().__init__('Cdd')  # initialise with superclass
+        super().__init__('Cdd', mode=mode)  # initialise with superclass
 
-class Cee(_CorFile):
+class Cee(_DisplacementVariable):
     """
     Naming displacement direction correlation files.
     """
 
-    def __init__(self):
+    def __init__(self, mode='grid'):
         """
         Architecture of file name.
+
+        Parameters
+        ----------
+        mode : string
+            Computation mode (default: grid).
         """
 
-        super().__init__('Cee')  # initialise with superclass
+        super().__init__('Cee', mode=mode)  # initialise with superclass
 
 class Ctt(_CorFile):
     """
@@ -326,10 +326,11 @@ if __name__ == '__main__':  # executing as script
         dt_list = np.array(list(map(
             lambda file: naming_Css.get_data(file, 'dt'), files))).flatten()    # list of lag times corresponding to files
 
-        for file, dt in zip(files, dt_list):
+        Css2D = []  # list of strain correlation grids
+        for file in files:
             with open(joinpath(data_dir, file), 'rb') as Css_dump_file:
-                _, Css2D = pickle.load(Css_dump_file)
-            C44[dt] = toC44.get_C44(Css2D)
+                Css2D += [pickle.load(Css_dump_file)[1]]
+        C44 = dict(zip(dt_list, toC44.get_C44(Css2D)))  # C44 of all lag times computed in a single batch
 
     elif mode == 'fourier':
 
@@ -341,13 +342,13 @@ if __name__ == '__main__':  # executing as script
 
         wave_vectors = wave_vectors_2D(Ncases, Ncases, d=box_size/Ncases)   # wave vectors at which Fourier transform was calculated
 
-        for file, dt in zip(files, dt_list):
+        Css2D = []  # list of strain correlation grids
+        for file in files:
             with open(joinpath(data_dir, file), 'rb') as Css_dump_file:
                 FFTsgridsqnorm = pickle.load(Css_dump_file)
-            C44[dt] = toC44.get_C44(
-                StrainCorrelations(wave_vectors, FFTsgridsqnorm)
-                .strain_correlations(r_cut=r_cut_fourier),
-                smooth=smooth)
+            Css2D += [StrainCorrelations(wave_vectors, FFTsgridsqnorm)
+                .strain_correlations(r_cut=r_cut_fourier)]
+        C44 = dict(zip(dt_list, toC44.get_C44(Css2D, smooth=smooth)))  # C44 of all lag times computed in a single batch
 
     elif mode == 'cmsd':
 
@@ -370,15 +371,16 @@ if __name__ == '__main__':  # executing as script
 
         wave_vectors = wave_vectors_2D(Ncases, Ncases, d=box_size/Ncases)   # wave vectors at which Fourier transform was calculated
 
-        for (file_Ctt, file_Cll), dt in zip(files, dt_list):
+        Css2D = []  # list of strain correlation grids
+        for file_Ctt, file_Cll in files:
             with open(joinpath(data_dir, file_Ctt), 'rb') as Ctt_dump_file,\
                 open(joinpath(data_dir, file_Cll), 'rb') as Cll_dump_file:
                 _, k_cross_FFTugrid2D_sqnorm, _ = pickle.load(Ctt_dump_file)
                 _, k_dot_FFTugrid2D_sqnorm, _ = pickle.load(Cll_dump_file)
-            C44[dt] = toC44.get_C44(
-                StrainCorrelationsCMSD(wave_vectors,
-                    k_cross_FFTugrid2D_sqnorm, k_dot_FFTugrid2D_sqnorm)
-                .strain_correlations(r_cut=av_p_sep*r_cut_fourier))
+            Css2D += [StrainCorrelationsCMSD(wave_vectors,
+                k_cross_FFTugrid2D_sqnorm, k_dot_FFTugrid2D_sqnorm)
+                .strain_correlations(r_cut=av_p_sep*r_cut_fourier)]
+        C44 = dict(zip(dt_list, toC44.get_C44(Css2D)))  # C44 of all lag times computed in a single batch
 
     dt_list = [dt for dt in sorted(dt_list)
         if (dt_min == None or dt >= dt_min)
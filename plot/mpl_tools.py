@@ -4,13 +4,16 @@ Module mpl_tools provides objects to be used in matplotlib plots.
 
 import numpy as np
 
-import matplotlib.pyplot as plt
-from mpl_toolkits.axes_grid1 import make_axes_locatable
-from matplotlib.widgets import Slider
-import matplotlib.colors as colors
-import matplotlib.cm as cmx
-import matplotlib as mpl
-cmap = plt.cm.jet
+from active_particles.init import lazy_import
+
+plt = lazy_import('matplotlib.pyplot')
+make_axes_locatable = lazy_import('mpl_toolkits.axes_grid1',
+    'make_axes_locatable')
+Slider = lazy_import('matplotlib.widgets', 'Slider')
+colors = lazy_import('matplotlib.colors')
+cmx = lazy_import('matplotlib.cm')
+mpl = lazy_import('matplotlib')
+cmap = 'jet'    # colormap
 
 from active_particles.maths import Grid
 
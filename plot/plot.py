@@ -4,14 +4,17 @@ Module plot provides useful functions for plots.
 
 from collections import OrderedDict
 
-import matplotlib as mpl
-import matplotlib.pyplot as plt
-import matplotlib.cm as cmx
-import matplotlib.colors as colors
+from active_particles.init import lazy_import
+
+mpl = lazy_import('matplotlib')
+plt = lazy_import('matplotlib.pyplot')
+cmx = lazy_import('matplotlib.cm')
+colors = lazy_import('matplotlib.colors')
 
 # DEFAULT VARIABLES
 
-_markers = mpl.markers.MarkerStyle.filled_markers   # default markers list
+_markers = ('o', 'v', '^', '<', '>', '8', 's', 'p', '*', 'h', 'H', 'D', 'd',
+    'P', 'X')   # default markers list (matplotlib.markers.MarkerStyle.filled_markers)
 _linestyles = (
     (0, ()),                    # solid
     (0, (5, 1)),                # densely dashed
@@ -6,9 +6,9 @@ https://yketa.github.io/UBC_2018_Wiki/#Self-consistent%20density%20estimation)
 
 import numpy as np
 
-from scipy.interpolate import griddata
+from active_particles.init import lazy_import
 
-from fastkde import fastKDE
+fastKDE = lazy_import('fastkde.fastKDE')
 
 from multiprocessing import Pool
 
@@ -163,6 +163,8 @@ class PDF:
             Interpolated probability density function at coordinates.
         """
 
+        from scipy.interpolate import griddata  # picklable function for worker processes
+
         pdf_flat, extended_axes_flat = self._flat()
 
         with Pool(processes=processes) as pool: # pool of worker processes
@@ -16,6 +16,9 @@ export PYTHONPATH=$PYTHONPATH:${AP_DIR}/..  # for python to find active_particle
 
 # COMMANDS
 alias ap_param="$AP_PYTHON ${AP_DIR}/param.py"
+alias ap_dat_convert="$AP_PYTHON ${AP_DIR}/dat_convert.py"
+alias ap_store_import="$AP_PYTHON ${AP_DIR}/store_import.py"
+alias ap_import_time="$AP_PYTHON ${AP_DIR}/import_time.py"
 alias ap_launch="bash ${AP_DIR}/launch/launch.sh"
 
 # SCRIPTS (defined as variables so they can be used with ap_launch)
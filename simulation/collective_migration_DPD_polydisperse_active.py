@@ -10,11 +10,15 @@ import hoomd
 import hoomd.md
 
 import gsd
+import gsd.fl
 
 import numpy as np
 
 import pickle
-import struct
+
+from math import ceil
+
+from active_particles.dat import Dat
 
 hoomd.context.initialize(''); # initialise hoomd
 
@@ -54,14 +58,51 @@ time_step = float(eval(os.environ['TIME_STEP'])) if 'TIME_STEP' in os.environ el
 N_steps = int(eval(os.environ['N_STEPS'])) if 'N_STEPS' in os.environ else int(1e4) # number of integration steps
 
 period_dump = int(eval(os.environ['PERIOD_DUMP'])) if 'PERIOD_DUMP' in os.environ else 100 # period of dumping to gsd file
+buffer_frames = int(eval(os.environ['BUFFER_FRAMES'])) if 'BUFFER_FRAMES' in os.environ else 10 # number of frames held in memory before writing to dat file
 
 init_gsd = os.environ['INITIALISATION_GSD'] if 'INITIALISATION_GSD' in os.environ else '' # initialisation gsd file
 init_frame = int(eval(os.environ['INITIALISATION_FRAME'])) if 'INITIALISATION_FRAME' in os.environ else 0 # initialisation frame in the gsd file
+resume = 'INITIALISATION_GSD' in os.environ and os.path.isfile(name_trajectory + '.dat') # resume simulation by appending to existing trajectory files
+
+# RESUMPTION
+
+def truncate_gsd(filename, frames):
+	# rewrites gsd file with its first frames only, copying chunks as they are stored
+
+	with gsd.fl.open(name=filename, mode='rb') as old_file, gsd.fl.open(name=filename + '.tmp', mode='wb', application=old_file.application, schema=old_file.schema, schema_version=old_file.schema_version) as new_file:
+		names = old_file.find_matching_chunk_names('') # names of all chunks in file
+		for frame in range(frames):
+			for name in names:
+				if old_file.chunk_exists(frame, name): new_file.write_chunk(name, old_file.read_chunk(frame, name))
+			new_file.end_frame()
+	os.replace(filename + '.tmp', filename)
+
+if resume: # the simulation restarts from the last frame saved in both the gsd and dat files, and both files are trimmed to this frame
+	if os.path.realpath(init_gsd) != os.path.realpath(name_trajectory + '.gsd'):
+		raise ValueError('Resumed simulation has to be initialised from its own gsd file %s.gsd.' % name_trajectory)
+	with open(name_par, 'rb') as par_file: # parameters of first segment
+		parameters = pickle.load(par_file)
+	N, period_dump, prep_steps = parameters[0], parameters[15], parameters[16]
+	prep_frames = ceil(prep_steps/period_dump) # number of preparation frames in gsd file
+
+	with open(name_trajectory + '.dat', 'rb') as dat_file:
+		dat_frames = Dat(dat_file, N).count_frames() # number of complete frames in dat file
+	with gsd.fl.open(name=init_gsd, mode='rb') as gsd_file:
+		gsd_frames = gsd_file.nframes # number of frames in gsd file
+	common_frames = min(dat_frames, gsd_frames - prep_frames) # number of frames of actual dynamics saved in both files
+	if common_frames < 1:
+		raise ValueError('No frame of actual dynamics is saved in both %s.gsd (%i frames, %i preparation frames) and %s.dat (%i frames).' % (name_trajectory, gsd_frames, prep_frames, name_trajectory, dat_frames))
+
+	last_frame = prep_frames + common_frames - 1 # gsd frame of last common frame
+	if 'INITIALISATION_FRAME' in os.environ and init_frame % gsd_frames != last_frame:
+		raise ValueError('INITIALISATION_FRAME=%i is not the last frame saved in both trajectory files (gsd frame %i).' % (init_frame, last_frame))
+	init_frame = last_frame
 
 # BOX PARAMETRISATION
 
 if 'INITIALISATION_GSD' in os.environ:
 	system = hoomd.init.read_gsd(filename=init_gsd, frame=init_frame) # initialisation from gsd file
+	if resume: truncate_gsd(init_gsd, init_frame) # the initial frame is dumped again when running
 	snapshot = system.take_snapshot(all=True)
 	N_sizes = len(snapshot.particles.types) # number of different sizes
 else:
@@ -83,13 +124,6 @@ hoomd.analyze.log(filename=name_log, quantities=['potential_energy', 'temperatur
 hoomd.dump.gsd(filename=name_trajectory + '.gsd', period=period_dump, group=all, overwrite=False if 'INITIALISATION_GSD' in os.environ else True, dynamic=['momentum', 'attribute']) # trajectory gsd file
 if 'NAME_XML' in os.environ: hoomd.deprecated.dump.xml(filename=name_xml, period=period_dump, group=all)
 
-def dump_trajectory(dump_file, N, positions, velocities):
-	# writes data to binary trajectory file
-	for data in [positions, velocities]:
-		for particle in range(N):
-			for coord in range(2):
-					dump_file.write(struct.pack('d', data[particle, coord]))
-
 snaps = [[None, hoomd.data.make_snapshot(N=N, box=hoomd.data.boxdim(L=box_size))], None] # list of system snapshots ([[time, time + period_dump], time + period_dump + 1])
 
 increments = np.zeros((N, 3)) # increments of space to cancel wrapping due to periodic boundary conditions
@@ -119,8 +153,9 @@ if not('INITIALISATION_GSD' in os.environ):	# don't fire if starting from initia
 
 # PARAMETERS FILE
 
-with open(name_par, 'wb') as par_file: # parameters saving file
-	pickle.dump([N, a, pdi, N_sizes, density, box_size, kT, mu, k, vzero, dr, damp_bro, shear_rate, time_step, N_steps, period_dump, prep_steps], par_file)
+if not(resume): # parameters of resumed simulation are those of its first segment
+	with open(name_par, 'wb') as par_file: # parameters saving file
+		pickle.dump([N, a, pdi, N_sizes, density, box_size, kT, mu, k, vzero, dr, damp_bro, shear_rate, time_step, N_steps, period_dump, prep_steps], par_file)
 
 # INTEGRATION MODE
 
@@ -156,12 +191,18 @@ def run(dump_file, snaps, increments, N, L, dt, period_dump):
 	# updating increments
 	increments = inc(increments, snaps, L)
 	# dump
-	dump_trajectory(dump_file, N, positions(snaps, increments), velocities(snaps, dt))
+	dump_file.dump(positions(snaps, increments), velocities(snaps, dt))
 	# additional run
 	hoomd.run(period_dump - 1)
 
 	return snaps, increments
 
-with open(name_trajectory + '.dat', 'wb') as output_trajectory: # trajectory data file
-	for runs in range(int(N_steps//period_dump)):
+with open(name_trajectory + '.dat', 'r+b' if resume else 'wb') as dat_file, Dat(dat_file, N, buffer_frames=buffer_frames, resume=resume) as output_trajectory: # trajectory data file (buffered frames are written when exiting, incomplete trailing frames of resumed file are truncated)
+	frames = 0 # number of frames already saved
+	if resume: # continuing from last common frame, already saved
+		frames = output_trajectory.truncate(common_frames)
+		snaps[0][1] = system.take_snapshot(all=True) # reference for increments of next frame
+		increments[:, :2] = box_size*np.round((output_trajectory.position(frames - 1) - snaps[0][1].particles.position[:, :2])/box_size) # increments continuing unwrapped positions of last saved frame
+		hoomd.run(period_dump) # run to next frame
+	for runs in range(frames, int(N_steps//period_dump)):
 		snaps, increments = run(output_trajectory, snaps, increments, N, box_size, time_step, period_dump)
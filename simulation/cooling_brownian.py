@@ -10,7 +10,8 @@ import hoomd.md
 import numpy as np
 
 import pickle
-import struct
+
+from active_particles.dat import Dat
 
 hoomd.context.initialize(''); # initialise hoomd
 
@@ -51,6 +52,7 @@ damp_bro = float(eval(os.environ['DAMPING_BROWNIAN'])) if 'DAMPING_BROWNIAN' in
 time_step = float(eval(os.environ['TIME_STEP'])) if 'TIME_STEP' in os.environ else 1e-2 # integration time step
 
 period_dump = int(eval(os.environ['PERIOD_DUMP'])) if 'PERIOD_DUMP' in os.environ else 100 # period of dumping to gsd file
+buffer_frames = int(eval(os.environ['BUFFER_FRAMES'])) if 'BUFFER_FRAMES' in os.environ else 10 # number of frames held in memory before writing to dat file
 
 init_gsd = os.environ['INITALISATION_GSD'] if 'INITALISATION_GSD' in os.environ else '' # initialisation gsd file
 init_frame = int(eval(os.environ['INITIALISATION_FRAME'])) if 'INITIALISATION_FRAME' in os.environ else 0 # initialisation frame in the gsd file
@@ -85,13 +87,6 @@ hoomd.analyze.log(filename=name_log, quantities=['potential_energy', 'temperatur
 hoomd.dump.gsd(filename=name_trajectory + '.gsd', period=period_dump, group=all, overwrite=False if 'INITIALISATION_GSD' in os.environ else True, dynamic=['momentum', 'attribute']) # trajectory gsd file
 if 'NAME_XML' in os.environ: hoomd.deprecated.dump.xml(filename=name_xml, period=period_dump, group=all)
 
-def dump_trajectory(dump_file, N, positions, velocities):
-	# writes data to binary trajectory file
-	for data in [positions, velocities]:
-		for particle in range(N):
-			for coord in range(2):
-					dump_file.write(struct.pack('d', data[particle, coord]))
-
 snaps = [[None, hoomd.data.make_snapshot(N=N, box=hoomd.data.boxdim(L=box_size))], None] # list of system snapshots ([[time, time + period_dump], time + period_dump + 1])
 
 increments = np.zeros((N, 3)) # increments of space to cancel wrapping due to periodic boundary conditions
@@ -166,12 +161,12 @@ def run(dump_file, snaps, increments, N, L, dt, period_dump):
 	# updating increments
 	increments = inc(increments, snaps, L)
 	# dump
-	dump_trajectory(dump_file, N, positions(snaps, increments), velocities(snaps, dt))
+	dump_file.dump(positions(snaps, increments), velocities(snaps, dt))
 	# additional run
 	hoomd.run(period_dump - 1)
 
 	return snaps, increments
 
-with open(name_trajectory + '.dat', 'wb') as output_trajectory: # trajectory data file
+with open(name_trajectory + '.dat', 'wb') as dat_file, Dat(dat_file, N, buffer_frames=buffer_frames) as output_trajectory: # trajectory data file (buffered frames are written when exiting)
 	for runs in range(int((abs(kT1 - kT0)/(cool_rate * time_step))//period_dump)):
 		snaps, increments = run(output_trajectory, snaps, increments, N, box_size, time_step, period_dump)
@@ -0,0 +1,89 @@
+"""
+Imports wrapped (.gsd) and unwrapped (.dat) trajectory files of a simulation
+into a chunked trajectory store.
+(see active_particles.dat.Store and active_particles.dat.store_trajectories)
+
+Script is called according to the following scheme:
+$ python store_import.py
+
+Environment parameters
+----------------------
+DATA_DIRECTORY : string
+    Data directory.
+    DEFAULT: current working directory
+PARAMETERS_FILE : string
+    Simulation parameters file.
+    DEFAULT: DATA_DIRECTORY/active_particles.naming.parameters_file
+WRAPPED_FILE : string
+    Wrapped trajectory file. (.gsd)
+    DEFAULT: DATA_DIRECTORY/active_particles.naming.wrapped_trajectory_file
+UNWRAPPED_FILE : string
+    Unwrapped trajectory file. (.dat or .gsd)
+    NOTE: .dat files defined with active_particles.dat
+    NOTE: If UNWRAPPED_FILE is a .gsd file, unwrapped positions and velocities
+          are computed from the wrapped trajectory file.
+          (see active_particles.dat.GsdUnwrapped)
+    DEFAULT: DATA_DIRECTORY/active_particles.naming.unwrapped_trajectory_file
+STORE_FILE : string
+    Chunked trajectory store file.
+    NOTE: Store is saved as a Zarr directory if STORE_FILE ends with '.zarr',
+          and as a HDF5 file otherwise.
+    DEFAULT: DATA_DIRECTORY/active_particles.naming.store_file
+ELEMENT_TYPE : packing format
+    Data type of stored values.
+    DEFAULT: double float
+FRAME_CHUNK : int
+    Number of frames per chunk.
+    DEFAULT: active_particles.dat._store_frame_chunk
+PARTICLE_CHUNK : int
+    Number of particles per chunk.
+    DEFAULT: active_particles.dat._store_particle_chunk
+"""
+
+import active_particles.naming as naming
+
+from active_particles.init import get_env
+from active_particles.dat import store_trajectories,\
+    _store_frame_chunk, _store_particle_chunk
+
+from os import getcwd
+from os.path import join as joinpath
+
+from math import ceil
+
+import pickle
+
+from datetime import datetime
+
+
+data_dir = get_env('DATA_DIRECTORY', default=getcwd())  # data directory
+
+parameters_file = get_env('PARAMETERS_FILE',
+    default=joinpath(data_dir, naming.parameters_file))   # simulation parameters file
+with open(parameters_file, 'rb') as param_file:
+    parameters = pickle.load(param_file)                    # parameters hash table
+
+prep_frames = ceil(parameters['prep_steps']/parameters['period_dump'])  # number of preparation frames (FIRE energy minimisation)
+
+wrap_file_name = get_env('WRAPPED_FILE',
+    default=joinpath(data_dir, naming.wrapped_trajectory_file))     # wrapped trajectory file (.gsd)
+unwrap_file_name = get_env('UNWRAPPED_FILE',
+    default=joinpath(data_dir, naming.unwrapped_trajectory_file))   # unwrapped trajectory file (.dat or .gsd)
+store_file_name = get_env('STORE_FILE',
+    default=joinpath(data_dir, naming.store_file))                  # chunked trajectory store file
+
+startTime = datetime.now()
+
+with open(wrap_file_name, 'rb') as wrap_file:
+    unwrap_file = (None if unwrap_file_name.endswith('.gsd')
+        else open(unwrap_file_name, 'rb'))                          # unwrapped trajectory file, or None to compute unwrapped positions from wrapped trajectory file
+    store_trajectories(store_file_name, wrap_file, unwrap_file,
+        N=parameters['N'], prep_frames=prep_frames,
+        element_type=get_env('ELEMENT_TYPE', default='d', vartype=str),
+        frame_chunk=get_env('FRAME_CHUNK', default=_store_frame_chunk,
+            vartype=int),
+        particle_chunk=get_env('PARTICLE_CHUNK',
+            default=_store_particle_chunk, vartype=int))
+    if unwrap_file != None: unwrap_file.close()
+
+print('Execution time: %s' % (datetime.now() - startTime))